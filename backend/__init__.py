@@ -5,6 +5,7 @@ from dotenv import load_dotenv, find_dotenv
 CONFIG_NAME_MAPPER = {
     "development": "config.DevelopmentConfig",
     "test": "config.TestConfig",
+    "benchmark": "config.BenchmarkConfig",
     "production": "config.ProductionConfig"
 }
 
@@ -27,9 +28,36 @@ def create_app(flask_env=None):
     except KeyError:
         raise SystemExit(
             "Invalid flask_config. Create_app argument or set FLASK_ENV environment "
-            "variable must be one of the following options: development, test or production."
+            "variable must be one of the following options: development, test, benchmark or production."
         )
 
+    from backend.dao.es import ES
+    ES.init_app(app)
+
+    from backend.dao.memory import MemoryEngine
+    MemoryEngine.init_app(app)
+
+    from backend.util.fanout import FanOut
+    FanOut.init_app(app)
+
+    from backend.util.cache import ServiceCache
+    ServiceCache.init_app(app)
+
+    from backend.util.response.serializer import Serializer
+    Serializer.init_app(app)
+
+    from backend.util.profiler import Profiler
+    Profiler.init_app(app)
+
+    from backend.util.compression import Compression
+    Compression.init_app(app)
+
+    from backend.util.slowlog import SlowLog
+    SlowLog.init_app(app)
+
+    from backend.util.metrics import Metrics
+    Metrics.init_app(app)
+
     from backend.controller.api import bpapi
     app.register_blueprint(bpapi, url_prefix="/api")
 
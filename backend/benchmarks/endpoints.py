@@ -0,0 +1,61 @@
+import time
+from typing import List, Tuple
+
+from backend import create_app
+from .fake_es import FakeConnection, SyntheticCatalog
+
+
+def requests(catalog: SyntheticCatalog) -> List[Tuple[str, str, str, dict]]:
+    """A request per route, as (name, method, path, json), with ids that exist in the catalog."""
+    sessionid = catalog.sessions[0][0]
+    brand, kind = catalog.brands[0], catalog.kinds[0]
+    item_list = [{"item_id": catalog.product(n * (catalog.size // 10))[0], "amount": n + 1} for n in range(10)]
+    return [
+        ("start", "GET", "/api/start", None),
+        ("gender", "POST", "/api/gender/Women", {}),
+        ("session", "POST", "/api/session/%s" % sessionid, {}),
+        ("session_products", "POST", "/api/session/%s/1" % sessionid, {"pagesize": 20}),
+        ("brand", "POST", "/api/brand/%s/" % brand, {}),
+        ("brand_products", "POST", "/api/brand/%s/1" % brand, {"pagesize": 20}),
+        ("kind", "POST", "/api/kind/%s/" % kind, {}),
+        ("kind_products", "POST", "/api/kind/%s/1" % kind, {"pagesize": 20}),
+        ("search", "POST", "/api/search/dress", {}),
+        ("search_products", "POST", "/api/search/dress/1", {"pagesize": 20}),
+        ("product", "GET", "/api/product/%s" % item_list[-1]["item_id"], None),
+        ("product_list", "POST", "/api/product/list", {"item_list": item_list}),
+        ("product_total", "POST", "/api/product/total", {"item_list": item_list})
+    ]
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    return latencies[int(round(fraction * (len(latencies) - 1)))]
+
+
+def run(sizes=(1000, 100000, 1000000), number=200, warmup=20) -> List[dict]:
+    """Time every route through the Flask test client, answered by FakeConnection, once per catalog size."""
+    app = create_app(flask_env="benchmark")
+    client = app.test_client()
+    results = []
+    for size in sizes:
+        catalog = FakeConnection.load(size)
+        for name, method, path, data in requests(catalog):
+            for _ in range(warmup):
+                response = client.open(path, method=method, json=data)
+                if response.status_code != 200:
+                    raise RuntimeError("%s %s answered %s: %s" % (method, path, response.status_code, response.get_data()))
+
+            latencies = []
+            for _ in range(number):
+                start = time.perf_counter()
+                client.open(path, method=method, json=data)
+                latencies.append(time.perf_counter() - start)
+
+            latencies.sort()
+            results.append({
+                "size": size,
+                "name": name,
+                "throughput": len(latencies) / sum(latencies),
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000
+            })
+    return results
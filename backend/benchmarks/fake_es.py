@@ -0,0 +1,218 @@
+from random import Random
+from typing import List, Tuple
+
+from backend.model import Price
+from backend.dao.local import LocalConnection, param_list
+
+
+WORDS = ("cotton", "dress", "slim", "fit", "jacket", "wash", "cold", "water", "machine", "soft",
+         "denim", "leather", "summer", "winter", "classic", "blue", "black", "white", "casual", "stretch")
+
+
+def clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(value, high))
+
+
+def text(rng: Random, length=200) -> str:
+    """Random words up to about length characters, as long as the texts of a scraped product."""
+    words, total = [], 0
+    while total < length:
+        words.append(rng.choice(WORDS))
+        total += len(words[-1]) + 1
+    return " ".join(words).capitalize() + "."
+
+
+def image_url(rng: Random) -> str:
+    return "https://example.com/images/%d/%d.jpg" % (rng.randrange(10 ** 6), rng.randrange(10 ** 6))
+
+
+def find(body, key: str) -> List:
+    """Every value stored under key anywhere in the request body."""
+    found = []
+    if isinstance(body, dict):
+        for name, value in body.items():
+            if name == key:
+                found.append(value)
+            found.extend(find(value, key))
+    elif isinstance(body, list):
+        for value in body:
+            found.extend(find(value, key))
+    return found
+
+
+class SyntheticCatalog(object):
+    """
+    A catalog of size products that only keeps a sample of them in memory:
+        Product n is the sample product n % sample with the id "product<n>", so any page, cursor or id
+        lookup can be answered. Brands, kinds and sessions grow with size, and every bucket and total
+        is computed from size, making the responses as large as a real catalog of that size.
+    """
+
+    def __init__(self, size: int, sample=500) -> None:
+        self.size = size
+        self.brands = ["Brand %d" % i for i in range(clamp(size // 100, 10, 2000))]
+        self.kinds = ["Kind %d" % i for i in range(clamp(size // 1000, 5, 300))]
+        rng = Random(size)
+        self.sessions = []
+        for i in range(clamp(size // 500, 10, 200)):
+            session = {"gender": ("Men", "Women")[i % 2], "image": image_url(rng), "name": "SESSION %d" % i,
+                       "pos": i, "storename": "WillBuyer"}
+            self.sessions.append(("session%d" % i, session))
+
+        self.products = []
+        for i in range(min(size, sample)):
+            sessionid, session = self.sessions[i % len(self.sessions)]
+            outlet, retail = round(rng.uniform(50.0, 100.0), 2), round(rng.uniform(150.0, 200.0), 2)
+            self.products.append({
+                "about": text(rng),
+                "brand": self.brands[i % len(self.brands)],
+                "care": text(rng),
+                "code": "%013d" % rng.randrange(10 ** 13),
+                "details": [text(rng), text(rng)],
+                "gender": session["gender"],
+                "images": [image_url(rng), image_url(rng)],
+                "kind": self.kinds[i % len(self.kinds)],
+                "link": text(rng),
+                "name": "Product Name %d" % i,
+                "price": {"outlet": outlet, "retail": retail, "discount": Price.compute_discount(outlet, retail)},
+                "sessionid": sessionid,
+                "sessionname": session["name"],
+                "storename": "WillBuyer"
+            })
+
+        self.minprice = min(source["price"]["outlet"] for source in self.products)
+        self.maxprice = max(source["price"]["outlet"] for source in self.products)
+
+    def product(self, n: int) -> Tuple[str, dict]:
+        return "product%d" % n, self.products[n % len(self.products)]
+
+    def product_by_id(self, id_: str):
+        try:
+            n = int(id_[len("product"):]) if id_.startswith("product") else -1
+        except ValueError:
+            n = -1
+        return self.product(n)[1] if 0 <= n < self.size else None
+
+    def session_by_id(self, id_: str):
+        for sessionid, session in self.sessions:
+            if sessionid == id_:
+                return session
+        return None
+
+    def buckets(self, keys: List[str]) -> List[dict]:
+        return [{"key": key, "doc_count": self.size // len(keys) + (i < self.size % len(keys))} for i, key in enumerate(keys)]
+
+
+class FakeConnection(LocalConnection):
+    """
+    Elasticsearch connection that answers from a SyntheticCatalog instead of the network:
+        Set it as ES_CONNECTION_CLASS and load a catalog with FakeConnection.load(size). Searches
+        are not interpreted, only shaped: hits follow from, size, _source, script_fields and sort,
+        and every aggregation is filled from the catalog.
+    """
+
+    catalog = None
+
+    @classmethod
+    def load(cls, size: int) -> SyntheticCatalog:
+        cls.catalog = SyntheticCatalog(size)
+        return cls.catalog
+
+    def search(self, doc_type: str, body: dict) -> dict:
+        if doc_type == "sessions":
+            hits = self.session_hits(body)
+            total = len(hits)
+        else:
+            hits = self.product_hits(body)
+            total = self.catalog.size
+
+        response = {"took": 1, "timed_out": False, "hits": {"total": total, "max_score": 1.0, "hits": hits}}
+        if "aggs" in body:
+            response["aggregations"] = self.aggregations(body["aggs"], body)
+        return response
+
+    def product_hits(self, body: dict) -> List[dict]:
+        start = body.get("from", 0)
+        if "search_after" in body:
+            start = int(body["search_after"][-1].split("#product")[-1]) + 1
+        end = min(start + body.get("size", 10), self.catalog.size)
+
+        hits = []
+        for n in range(start, end):
+            id_, source = self.catalog.product(n)
+            hit = {"_index": "store", "_type": "products", "_id": id_, "_score": 1.0, "_source": self.project(source, body.get("_source"))}
+            if "script_fields" in body:
+                hit["fields"] = {"images": [source["images"][0]]}
+            if "sort" in body:
+                hit["sort"] = [1.0, "products#%s" % id_]
+            hits.append(hit)
+        return hits
+
+    def session_hits(self, body: dict) -> List[dict]:
+        ids = [term["_id"] for term in find(body, "term") if "_id" in term]
+        genders = [term["gender"] for term in find(body, "term") if "gender" in term]
+        hits = []
+        for sessionid, session in self.catalog.sessions:
+            if (not ids or sessionid in ids) and (not genders or session["gender"].lower() in genders):
+                hits.append({"_index": "store", "_type": "sessions", "_id": sessionid, "_score": 1.0, "_source": session})
+        return hits[:body.get("size", 10)]
+
+    def aggregations(self, aggs: dict, body: dict) -> dict:
+        results = {}
+        for name, agg in aggs.items():
+            if "filter" in agg:
+                result = {"doc_count": self.catalog.size}
+            elif "terms" in agg:
+                field = agg["terms"]["field"]
+                if field == "brand.keyword":
+                    result = {"buckets": self.catalog.buckets(self.catalog.brands)}
+                elif field == "kind.keyword":
+                    result = {"buckets": self.catalog.buckets(self.catalog.kinds)}
+                else:
+                    sessionids = [id_ for terms in find(body["query"], "terms") for id_ in terms.get(field, [])]
+                    result = {"buckets": self.catalog.buckets(sessionids) if sessionids else []}
+                result.update({"doc_count_error_upper_bound": 0, "sum_other_doc_count": 0})
+            elif "min" in agg:
+                result = {"value": self.catalog.minprice}
+            elif "max" in agg:
+                result = {"value": self.catalog.maxprice}
+            else:
+                raise ValueError("Unsupported aggregation %s" % agg)
+
+            if "aggs" in agg:
+                result.update(self.aggregations(agg["aggs"], body))
+            results[name] = result
+        return results
+
+    def mget(self, doc_type: str, body: dict, params: dict) -> dict:
+        ids = body["ids"] if "ids" in body else [doc["_id"] for doc in body["docs"]]
+        includes = param_list(params, "_source_include")
+        docs = []
+        for id_ in ids:
+            source = self.catalog.product_by_id(id_)
+            if source is None:
+                docs.append({"_index": "store", "_type": doc_type, "_id": id_, "found": False})
+            else:
+                docs.append({"_index": "store", "_type": doc_type, "_id": id_, "_version": 1, "found": True,
+                             "_source": self.project(source, includes or None)})
+        return {"docs": docs}
+
+    def get(self, doc_type: str, id_: str, params: dict) -> Tuple[int, dict]:
+        if doc_type == "catalog":
+            source = {"version": 1}
+        elif doc_type == "sessions":
+            source = self.catalog.session_by_id(id_)
+        else:
+            source = self.catalog.product_by_id(id_)
+
+        if source is None:
+            return 404, {"_index": "store", "_type": doc_type, "_id": id_, "found": False}
+        excludes = param_list(params, "_source_exclude")
+        source = {field: value for field, value in source.items() if field not in excludes}
+        return 200, {"_index": "store", "_type": doc_type, "_id": id_, "_version": 1, "found": True, "_source": source}
+
+    @staticmethod
+    def project(source: dict, fields) -> dict:
+        if not isinstance(fields, list):
+            return source
+        return {field: value for field, value in source.items() if field in fields}
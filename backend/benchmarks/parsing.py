@@ -0,0 +1,37 @@
+import timeit
+from typing import List
+
+from backend.util.request.request_data import RequestData
+from backend.util.request.search_products_request import SearchProductsSchema
+from backend.util.request.product_list_request import ProductListSchema
+
+
+def payloads(amount: int) -> dict:
+    return {
+        "SearchProductsRequest": (
+            SearchProductsSchema,
+            {"pagesize": 20, "pricerange": {"min": 10.0, "max": 200.0}, "cursor": "WzEuMCwicHJvZHVjdCMxIl0="},
+            True
+        ),
+        "ProductListRequest": (
+            ProductListSchema,
+            {"item_list": [{"item_id": "product%d" % i, "amount": i + 1} for i in range(amount)]},
+            False
+        )
+    }
+
+
+def run(amount=100, number=1000) -> List[dict]:
+    """Time a new Schema per request against a module-level one returning RequestData."""
+    results = []
+    for name, (schema_class, data, deep) in payloads(amount).items():
+        schema = schema_class()
+        per_request_time = timeit.timeit(lambda: schema_class().load(data), number=number) / number
+        reused_time = timeit.timeit(lambda: RequestData(schema.load(data), deep=deep), number=number) / number
+        results.append({
+            "name": name,
+            "per_request_ms": per_request_time * 1000,
+            "reused_ms": reused_time * 1000,
+            "speedup": per_request_time / reused_time
+        })
+    return results
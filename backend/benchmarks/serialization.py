@@ -0,0 +1,56 @@
+import timeit
+from typing import List
+
+from backend.util.response.serializer import Serializer
+from backend.util.response.search_products_results import SearchProductsResultsSchema
+from backend.util.response.gender_results import GenderResultsSchema
+
+
+def product_list(amount: int) -> List[dict]:
+    return [
+        {
+            "id": "product%d" % i,
+            "name": "Product name %d" % i,
+            "image": "https://images.example.com/product%d/1.jpg" % i,
+            "price": {"outlet": 10.55 + i, "retail": 20.9 + i, "symbol": "£"},
+            "discount": 49.52
+        } for i in range(amount)
+    ]
+
+
+def payloads(amount: int) -> dict:
+    products = product_list(amount)
+    return {
+        "SearchProductsResults": (
+            SearchProductsResultsSchema,
+            {"products": products, "next": "WzEuMCwicHJvZHVjdCMxIl0="}
+        ),
+        "GenderResults": (
+            GenderResultsSchema,
+            {
+                "discounts": products,
+                "sessions": [
+                    {"id": "session%d" % i, "name": "Session %d" % i, "gender": "Women", "image": "image", "total": 100}
+                    for i in range(10)
+                ],
+                "brands": [{"brand": "Brand %d" % i, "amount": i} for i in range(50)],
+                "kinds": [{"kind": "Kind %d" % i, "amount": i} for i in range(50)]
+            }
+        )
+    }
+
+
+def run(amount=100, number=200) -> List[dict]:
+    """Time schema.load against the precompiled Serializer for the heaviest response payloads."""
+    results = []
+    for name, (schema_class, data) in payloads(amount).items():
+        serializer = Serializer(schema_class)
+        schema_time = timeit.timeit(lambda: schema_class().load(data), number=number) / number
+        serializer_time = timeit.timeit(lambda: serializer.dump(data), number=number) / number
+        results.append({
+            "name": name,
+            "schema_ms": schema_time * 1000,
+            "serializer_ms": serializer_time * 1000,
+            "speedup": schema_time / serializer_time
+        })
+    return results
@@ -2,8 +2,9 @@ from flask import request, current_app
 from flask_restplus import abort
 from functools import wraps
 
-from backend.service import JWTService
+from backend.service import JWTService, CatalogService
 from backend.errors.access_error import AccessError
+from backend.util.compression import Compression
 from .error_handler import ErrorHandler
 
 
@@ -26,3 +27,30 @@ def auth_required():
                 abort(401, error="Unauthorized")
         return decorated_view
     return decorator
+
+
+def conditional():
+    def decorator(func):
+        @wraps(func)
+        def decorated_view(*args, **kwargs):
+            try:
+                etag = CatalogService().etag(request.method, request.path, request.get_data())
+            except Exception as error:
+                return ErrorHandler(error).handle_error()
+
+            for tag in Compression.etags(etag):
+                if tag in request.if_none_match:
+                    response = current_app.response_class(status=304)
+                    response.set_etag(tag)
+                    return response
+
+            response = Compression.cached_response(etag)
+            if response is not None:
+                return response
+
+            response = func(*args, **kwargs)
+            if isinstance(response, current_app.response_class) and response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return decorated_view
+    return decorator
@@ -35,19 +35,9 @@ class BrandController(Resource):
         """Brand information."""
         try:
             in_data = SearchRequest.parse_json()
-            total = self.__productservice.get_total(brand=brand, **in_data)
-            brands = self.__productservice.select_brands(brand=brand, **in_data)
-            kinds = self.__productservice.select_kinds(brand=brand, **in_data)
-            pricerange = self.__productservice.select_pricerange(brand=brand)
-
-            jsonsend = SearchResultsResponse.marshall_json(
-                {
-                    "total": total,
-                    "brands": brands,
-                    "kinds": kinds,
-                    "pricerange": pricerange
-                }
-            )
+            facets = self.__productservice.select_facets(brand=brand, **in_data)
+
+            jsonsend = SearchResultsResponse.marshall_json(facets)
             return jsonsend
         except Exception as error:
             return ErrorHandler(error).handle_error()
@@ -23,7 +23,7 @@ class BrandProductsController(Resource):
     @auth_required()
     @brandProductsNS.doc(security=["token"])
     @brandProductsNS.param("brand", description="The desired brand", _in="path", required=True)
-    @brandProductsNS.param("page", description="The search page.", _in="path", required=True)
+    @brandProductsNS.param("page", description="The search page, ignored when a cursor is sent.", _in="path", required=True)
     @brandProductsNS.param("payload", description="Optional", _in="body", required=False)
     @brandProductsNS.expect(REQUESTMODEL)
     @brandProductsNS.response(200, "Success", RESPONSEMODEL)
@@ -36,13 +36,14 @@ class BrandProductsController(Resource):
         """Brand products paginated"""
         try:
             in_data = SearchProductsRequest.parse_json()
-            products = self.__productservice.select(brand=brand, page=page, **in_data)
+            products = self.__productservice.select(brand=brand, page=page, projection="first_image", **in_data)
 
-            jsonsend = SearchProductsResultsResponse.marshall_json(
-                {
-                    "products": [p.get_dict_min() for p in products]
-                }
-            )
+            data_out = {"products": [p.get_dict_min() for p in products]}
+            next_cursor = ProductService.next_cursor(products, **in_data)
+            if next_cursor is not None:
+                data_out["next"] = next_cursor
+
+            jsonsend = SearchProductsResultsResponse.marshall_json(data_out)
             return jsonsend
         except Exception as error:
             return ErrorHandler(error).handle_error()
@@ -4,7 +4,8 @@ from backend.service import ProductService, SessionService
 from backend.util.request.gender_request import GenderRequest
 from backend.util.response.gender_results import GenderResultsResponse
 from backend.util.response.error import ErrorResponse
-from backend.controller import ErrorHandler, auth_required
+from backend.dao.batch import SearchBatch
+from backend.controller import ErrorHandler, auth_required, conditional
 
 
 genderNS = Namespace("Gender", description="Gender related operations.")
@@ -22,11 +23,13 @@ class GenderController(Resource):
         self.__sessionservice = SessionService()
 
     @auth_required()
+    @conditional()
     @genderNS.doc(security=["token"])
     @genderNS.param("gender", description="The desired gender", _in="path", required=True)
     @genderNS.param("payload", description="Optional", _in="body", required=False)
     @genderNS.expect(REQUESTMODEL)
     @genderNS.response(200, "Success", RESPONSEMODEL)
+    @genderNS.response(304, "Not Modified, the ETag sent in If-None-Match is current", {})
     @genderNS.response(204, "No Content", {})
     @genderNS.response(400, "Bad Request", ERRORMODEL)
     @genderNS.response(401, "Unauthorized", ERRORMODEL)
@@ -36,10 +39,12 @@ class GenderController(Resource):
         """Gender information."""
         try:
             in_data = GenderRequest.parse_json()
-            discounts = self.__productservice.super_discounts(gender=gender, **in_data)
-            sessions = self.__sessionservice.select(gender=gender)
-            brands = self.__productservice.select_brands(gender=gender)
-            kinds = self.__productservice.select_kinds(gender=gender)
+            batch = SearchBatch()
+            batch.submit(self.__productservice.super_discounts, gender=gender, projection="first_image", **in_data)
+            batch.submit_eager(self.__sessionservice.select, gender=gender)
+            batch.submit(self.__productservice.select_brands, gender=gender)
+            batch.submit(self.__productservice.select_kinds, gender=gender)
+            discounts, sessions, brands, kinds = batch.join()
 
             jsonsend = GenderResultsResponse.marshall_json(
                 {
@@ -35,19 +35,9 @@ class KindController(Resource):
         """Kind information."""
         try:
             in_data = SearchRequest.parse_json()
-            total = self.__productservice.get_total(kind=kind, **in_data)
-            brands = self.__productservice.select_brands(kind=kind, **in_data)
-            kinds = self.__productservice.select_kinds(kind=kind, **in_data)
-            pricerange = self.__productservice.select_pricerange(kind=kind)
-
-            jsonsend = SearchResultsResponse.marshall_json(
-                {
-                    "total": total,
-                    "brands": brands,
-                    "kinds": kinds,
-                    "pricerange": pricerange
-                }
-            )
+            facets = self.__productservice.select_facets(kind=kind, **in_data)
+
+            jsonsend = SearchResultsResponse.marshall_json(facets)
             return jsonsend
         except Exception as error:
             return ErrorHandler(error).handle_error()
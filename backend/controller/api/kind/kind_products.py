@@ -23,7 +23,7 @@ class KindProductsController(Resource):
     @auth_required()
     @kindProductsNS.doc(security=["token"])
     @kindProductsNS.param("kind", description="The desired kind", _in="path", required=True)
-    @kindProductsNS.param("page", description="The search page.", _in="path", required=True)
+    @kindProductsNS.param("page", description="The search page, ignored when a cursor is sent.", _in="path", required=True)
     @kindProductsNS.param("payload", description="Optional", _in="body", required=False)
     @kindProductsNS.expect(REQUESTMODEL)
     @kindProductsNS.response(200, "Success", RESPONSEMODEL)
@@ -36,13 +36,14 @@ class KindProductsController(Resource):
         """Kind products paginated"""
         try:
             in_data = SearchProductsRequest.parse_json()
-            products = self.__productservice.select(kind=kind, page=page, **in_data)
+            products = self.__productservice.select(kind=kind, page=page, projection="first_image", **in_data)
 
-            jsonsend = SearchProductsResultsResponse.marshall_json(
-                {
-                    "products": [p.get_dict_min() for p in products]
-                }
-            )
+            data_out = {"products": [p.get_dict_min() for p in products]}
+            next_cursor = ProductService.next_cursor(products, **in_data)
+            if next_cursor is not None:
+                data_out["next"] = next_cursor
+
+            jsonsend = SearchProductsResultsResponse.marshall_json(data_out)
             return jsonsend
         except Exception as error:
             return ErrorHandler(error).handle_error()
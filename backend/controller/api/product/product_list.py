@@ -33,7 +33,7 @@ class ProductListController(Resource):
         """Product information list with total price."""
         try:
             in_data = ProductListRequest.parse_json()
-            products, total = self.__productservice.select_by_item_list(**in_data)
+            products, total = self.__productservice.select_by_item_list(projection="min", **in_data)
             jsonsend = ProductsListResponse.marshall_json(
                 {
                     "products": [p.get_dict_min() for p in products],
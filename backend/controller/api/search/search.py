@@ -35,19 +35,9 @@ class SearchController(Resource):
         """Search information."""
         try:
             in_data = SearchRequest.parse_json()
-            total = self.__productservice.get_total(query=query, **in_data)
-            brands = self.__productservice.select_brands(query=query, **in_data)
-            kinds = self.__productservice.select_kinds(query=query, **in_data)
-            pricerange = self.__productservice.select_pricerange(query=query)
-
-            jsonsend = SearchResultsResponse.marshall_json(
-                {
-                    "total": total,
-                    "brands": brands,
-                    "kinds": kinds,
-                    "pricerange": pricerange
-                }
-            )
+            facets = self.__productservice.select_facets(query=query, **in_data)
+
+            jsonsend = SearchResultsResponse.marshall_json(facets)
             return jsonsend
         except Exception as error:
             return ErrorHandler(error).handle_error()
@@ -4,7 +4,8 @@ from backend.service import ProductService, SessionService
 from backend.util.request.search_request import SearchRequest
 from backend.util.response.session_results import SessionResultsResponse
 from backend.util.response.error import ErrorResponse
-from backend.controller import ErrorHandler, auth_required
+from backend.dao.batch import SearchBatch
+from backend.controller import ErrorHandler, auth_required, conditional
 
 
 sessionNS = Namespace("Session", description="Session related operations.")
@@ -22,11 +23,13 @@ class SessionController(Resource):
         self.__sessionservice = SessionService()
 
     @auth_required()
+    @conditional()
     @sessionNS.doc(security=["token"])
     @sessionNS.param("sessionid", description="The desired session ID", _in="path", required=True)
     @sessionNS.param("payload", description="Optional", _in="body", required=False)
     @sessionNS.expect(REQUESTMODEL)
     @sessionNS.response(200, "Success", RESPONSEMODEL)
+    @sessionNS.response(304, "Not Modified, the ETag sent in If-None-Match is current", {})
     @sessionNS.response(204, "No products found", ERRORMODEL)
     @sessionNS.response(400, "Bad Request", ERRORMODEL)
     @sessionNS.response(401, "Unauthorized", ERRORMODEL)
@@ -37,20 +40,17 @@ class SessionController(Resource):
         """Session information."""
         try:
             in_data = SearchRequest.parse_json()
-            session = self.__sessionservice.select_by_id(sessionid)
-            sessions = self.__sessionservice.select(gender=session.gender)
-            total = self.__productservice.get_total(sessionid=sessionid, **in_data)
-            brands = self.__productservice.select_brands(sessionid=sessionid, **in_data)
-            kinds = self.__productservice.select_kinds(sessionid=sessionid, **in_data)
-            pricerange = self.__productservice.select_pricerange(sessionid=sessionid)
+            batch = SearchBatch()
+            batch.submit(self.__sessionservice.select_by_id, sessionid)
+            batch.submit(self.__productservice.select_facets, sessionid=sessionid, **in_data)
+            session, facets = batch.join()
+            batch.submit_eager(self.__sessionservice.select, gender=session.gender)
+            sessions, = batch.join()
 
             jsonsend = SessionResultsResponse.marshall_json(
                 {
                     "sessions": sessions,
-                    "total": total,
-                    "brands": brands,
-                    "kinds": kinds,
-                    "pricerange": pricerange
+                    **facets
                 }
             )
             return jsonsend
@@ -23,7 +23,7 @@ class SessionProductsController(Resource):
     @auth_required()
     @sessionProductsNS.doc(security=["token"])
     @sessionProductsNS.param("sessionid", description="The desired session ID", _in="path", required=True)
-    @sessionProductsNS.param("page", description="The search page.", _in="path", required=True)
+    @sessionProductsNS.param("page", description="The search page, ignored when a cursor is sent.", _in="path", required=True)
     @sessionProductsNS.param("payload", description="Optional", _in="body", required=False)
     @sessionProductsNS.expect(REQUESTMODEL)
     @sessionProductsNS.response(200, "Success", RESPONSEMODEL)
@@ -36,13 +36,14 @@ class SessionProductsController(Resource):
         """Session products paginated"""
         try:
             in_data = SearchProductsRequest.parse_json()
-            products = self.__productservice.select(sessionid=sessionid, page=page, **in_data)
+            products = self.__productservice.select(sessionid=sessionid, page=page, projection="first_image", **in_data)
 
-            jsonsend = SearchProductsResultsResponse.marshall_json(
-                {
-                    "products": [p.get_dict_min() for p in products]
-                }
-            )
+            data_out = {"products": [p.get_dict_min() for p in products]}
+            next_cursor = ProductService.next_cursor(products, **in_data)
+            if next_cursor is not None:
+                data_out["next"] = next_cursor
+
+            jsonsend = SearchProductsResultsResponse.marshall_json(data_out)
             return jsonsend
         except Exception as error:
             return ErrorHandler(error).handle_error()
@@ -10,6 +10,7 @@ from elasticsearch_dsl.exceptions import ElasticsearchDslException
 from backend.errors.no_content_error import NoContentError
 from backend.errors.request_error import RequestError
 from backend.errors.not_found_error import NotFoundError
+from backend.errors.gateway_timeout_error import GatewayTimeoutError
 
 
 class ErrorHandler(object):
@@ -25,7 +26,8 @@ class ErrorHandler(object):
             MarshmallowError: self.__handle_MarshmallowError,
             NotFoundError: self.__handle_NotFoundError,
             ElasticsearchException: self.__handle_ElasticsearchException,
-            ElasticsearchDslException: self.__handle_ElasticsearchException
+            ElasticsearchDslException: self.__handle_ElasticsearchException,
+            GatewayTimeoutError: self.__handle_ElasticsearchException
         }
 
         for errtype, errhandler in errors.items():
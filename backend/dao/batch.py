@@ -0,0 +1,194 @@
+import time
+from inspect import signature
+from functools import partial, update_wrapper
+from typing import Callable, List, Tuple
+from elasticsearch_dsl import Search, MultiSearch
+
+from backend.util.fanout import FanOut
+from backend.util.cache import ServiceCache, MISSING, normalize
+from backend.util.singleflight import SingleFlight
+from backend.util.metrics import ES_LATENCY, es_timer
+from backend.util.slowlog import SlowLog
+from .es import ES
+
+
+class DeferredSearch(object):
+    """
+    A Search that has been built but not sent yet:
+        search: The elasticsearch_dsl Search to be executed
+        parse: Function that turns the Search Response into the service method result
+        name: Qualified name of the service method that built it
+        key: Cache key, made of the name and the normalized method arguments
+    The catalog version is looked up before the cache is read, so a new catalog clears the
+    results cached for the previous one even when no conditional endpoint asked for it.
+    """
+
+    def __init__(self, search: Search, parse: Callable, name=None, key=None) -> None:
+        self.search = search
+        self.parse = parse
+        self.name = name
+        self.key = key
+
+    def cached(self):
+        if self.key is None or not ServiceCache.enabled():
+            return MISSING
+        from backend.service.catalog_service import CatalogService
+        CatalogService().version()
+        return ServiceCache.get(self.key)
+
+    def resolve(self, response):
+        result = self.parse(response)
+        ServiceCache.set(self.key, result)
+        return result
+
+    def execute(self):
+        result = self.cached()
+        if result is MISSING:
+            result = SingleFlight.do(self.key, lambda: self.resolve(self.__execute()))
+        return result
+
+    def __execute(self):
+        start = time.perf_counter()
+        with es_timer(self.name, "search"):
+            response = self.search.execute()
+        SlowLog.observe(self.name, self.search, response, (time.perf_counter() - start) * 1000)
+        return response
+
+
+class DeferrableMethod(object):
+    def __init__(self, build: Callable, instance) -> None:
+        self.__build = build
+        self.__instance = instance
+        self.__signature = signature(build)
+        update_wrapper(self, build)
+
+    def __call__(self, *args, **kwargs):
+        return self.defer(*args, **kwargs).execute()
+
+    def defer(self, *args, **kwargs) -> DeferredSearch:
+        deferred = self.__build(self.__instance, *args, **kwargs)
+        deferred.name = self.__build.__qualname__
+        deferred.key = self.key(*args, **kwargs)
+        return deferred
+
+    def key(self, *args, **kwargs) -> tuple:
+        arguments = self.__signature.bind(self.__instance, *args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(arguments.arguments)
+        arguments.pop("self", None)
+        return (self.__build.__qualname__, normalize(arguments))
+
+
+class deferrable(object):
+    """
+    Decorates a service method that returns a DeferredSearch. Calling the method executes the
+    search right away and returns the parsed result, while method.defer(...) only builds it,
+    so it can be sent with others in a SearchBatch.
+    """
+
+    def __init__(self, build: Callable) -> None:
+        self.__build = build
+        update_wrapper(self, build)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return DeferrableMethod(self.__build, instance)
+
+
+class SearchBatch(object):
+    """
+    Collects service calls and sends all deferrable ones as a single _msearch request:
+        The _msearch request runs on the FanOut pool, alongside the calls that are not deferrable
+        and those given to submit_eager, each with the FanOut deadline, so a slow call raises
+        GatewayTimeoutError. Results are returned positionally by join, and the first failing call,
+        in submission order, has its exception re-raised unchanged. Identical batches running at
+        the same time share one _msearch request through SingleFlight.
+    """
+
+    def __init__(self, timeout=None) -> None:
+        self.__timeout = timeout
+        self.__calls = []
+
+    def submit(self, method: Callable, *args, **kwargs) -> None:
+        if isinstance(method, DeferrableMethod):
+            try:
+                self.__calls.append(method.defer(*args, **kwargs))
+            except Exception as error:
+                self.__calls.append(partial(self.__fail, error))
+        else:
+            self.__calls.append(partial(method, *args, **kwargs))
+
+    def submit_eager(self, method: Callable, *args, **kwargs) -> None:
+        """Run a deferrable call on its own, for methods whose parse sends another search, like SessionService.select."""
+        self.__calls.append(partial(method, *args, **kwargs))
+
+    def join(self) -> List:
+        cached = [call.cached() if isinstance(call, DeferredSearch) else MISSING for call in self.__calls]
+        missing = [call for call, result in zip(self.__calls, cached)
+                   if isinstance(call, DeferredSearch) and result is MISSING]
+        eager_list = [call for call in self.__calls if not isinstance(call, DeferredSearch)]
+
+        if missing or eager_list:
+            fanout = FanOut(timeout=self.__timeout)
+            fanout.submit(self.__coalesce, missing)
+            for call in eager_list:
+                fanout.submit(self.__capture, call)
+            responses, *eager_outcomes = fanout.join()
+        else:
+            responses, eager_outcomes = [], []
+
+        responses = iter(responses)
+        eager_outcomes = iter(eager_outcomes)
+        results = []
+        for call, result in zip(self.__calls, cached):
+            if result is not MISSING:
+                results.append(result)
+            elif isinstance(call, DeferredSearch):
+                results.append(call.resolve(next(responses)))
+            else:
+                result, error = next(eager_outcomes)
+                if error is not None:
+                    raise error
+                results.append(result)
+        self.__calls = []
+        return results
+
+    def __fail(self, error: Exception) -> None:
+        raise error
+
+    def __capture(self, call: Callable) -> Tuple:
+        try:
+            return call(), None
+        except Exception as error:
+            return None, error
+
+    def __coalesce(self, missing: List[DeferredSearch]) -> List:
+        keys = tuple(deferred.key for deferred in missing)
+        key = ("SearchBatch", keys) if keys and None not in keys else None
+        return SingleFlight.do(key, lambda: self.__timed_msearch(missing))
+
+    def __timed_msearch(self, missing: List[DeferredSearch]) -> List:
+        start = time.perf_counter()
+        request_type = "msearch" if len(missing) > 1 else "search"
+        try:
+            responses = self.__msearch([deferred.search for deferred in missing])
+        finally:
+            elapsed = time.perf_counter() - start
+            for deferred in missing:
+                ES_LATENCY.labels(deferred.name, request_type).observe(elapsed)
+
+        for deferred, response in zip(missing, responses):
+            SlowLog.observe(deferred.name, deferred.search, response, elapsed * 1000, request_type)
+        return responses
+
+    def __msearch(self, searches: List[Search]) -> List:
+        if not searches:
+            return []
+        elif len(searches) == 1:
+            return [searches[0].execute()]
+
+        ms = MultiSearch(using=ES().connection)
+        for s in searches:
+            ms = ms.add(s)
+        return ms.execute()
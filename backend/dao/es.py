@@ -1,17 +1,207 @@
 import os
-from elasticsearch import Elasticsearch
+import json
+from datetime import datetime
+from threading import Lock
+from typing import Callable, List, Tuple
+from elasticsearch import Elasticsearch, ElasticsearchException
+from elasticsearch.helpers import scan, reindex
+from werkzeug.utils import import_string
 
-from ..model import Product, Session
+from ..model import Product, Session, Catalog
+
+
+ALIAS = Product._doc_type.index
 
 
 class ES(object):
-    def __init__(self) -> None:
-        self.__conn = None
+    """
+    Process-wide registry of Elasticsearch clients:
+        Every ES instance shares one pooled client per URL, so keep-alive connections are reused
+        between requests. The registry is dropped when the process id changes, making each
+        forked worker (e.g. gunicorn -w 4) build its own client instead of sharing the parent's sockets.
+    """
+
+    __lock = Lock()
+    __clients = {}
+    __pid = None
+    __settings = {}
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        settings = {
+            "maxsize": app.config["ES_MAXSIZE"],
+            "timeout": app.config["ES_TIMEOUT"],
+            "max_retries": app.config["ES_MAX_RETRIES"],
+            "retry_on_timeout": app.config["ES_RETRY_ON_TIMEOUT"]
+        }
+        if app.config["ES_CONNECTION_CLASS"] is not None:
+            settings["connection_class"] = import_string(app.config["ES_CONNECTION_CLASS"])
+        with cls.__lock:
+            if settings != cls.__settings:
+                cls.__settings = settings
+                cls.__clients = {}
+
+    @classmethod
+    def get_client(cls, url) -> Elasticsearch:
+        with cls.__lock:
+            if cls.__pid != os.getpid():
+                cls.__pid = os.getpid()
+                cls.__clients = {}
+
+            client = cls.__clients.get(url)
+            if client is None:
+                client = Elasticsearch(url, **cls.__settings)
+                cls.__clients[url] = client
+            return client
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls.__lock:
+            cls.__clients = {}
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """Connections in use and pool capacity, summed over every client of this process."""
+        with cls.__lock:
+            clients = list(cls.__clients.values()) if cls.__pid == os.getpid() else []
+
+        stats = {"in_use": 0, "maxsize": 0}
+        for client in clients:
+            for connection in client.transport.connection_pool.connections:
+                pool = getattr(connection, "pool", None)
+                if pool is not None:
+                    stats["maxsize"] += pool.pool.maxsize
+                    stats["in_use"] += pool.pool.maxsize - pool.pool.qsize()
+        return stats
 
     @property
-    def connection(self):
-        if(self.__conn is None):
-            self.__conn = Elasticsearch(os.getenv("ES_URL"))
-            Session.init(using=self.__conn)
-            Product.init(using=self.__conn)
-        return self.__conn
+    def connection(self) -> Elasticsearch:
+        return ES.get_client(os.getenv("ES_URL"))
+
+    def init_index(self) -> None:
+        """
+        Create a store-<timestamp> index behind the store alias, or validate the mappings of the
+        current one. Run once per deploy, never on a request.
+        """
+        if not self.connection.indices.exists(index=ALIAS):
+            self.connection.indices.put_alias(index=self.create_index(), name=ALIAS)
+        for doc_class in (Session, Product, Catalog):
+            doc_class.init(using=self.connection)
+
+    def create_index(self, bulk=False) -> str:
+        """
+        Create an empty store-<timestamp> index with the mappings and return its name. An index for
+        a bulk load has no replicas and no refresh, both restored by publish_index.
+        """
+        name = "%s-%s" % (ALIAS, datetime.utcnow().strftime("%Y%m%d%H%M%S%f"))
+        body = {"settings": {"index": {"number_of_replicas": 0, "refresh_interval": "-1"}}} if bulk else {}
+        self.connection.indices.create(index=name, body=body)
+        for doc_class in (Session, Product, Catalog):
+            doc_class.init(index=name, using=self.connection)
+        return name
+
+    def aliased_indices(self) -> List[str]:
+        """The indices behind the store alias. A store index created before the alias is returned too."""
+        if self.connection.indices.exists_alias(name=ALIAS):
+            return sorted(self.connection.indices.get_alias(name=ALIAS))
+        elif self.connection.indices.exists(index=ALIAS):
+            return [ALIAS]
+        return []
+
+    def publish_index(self, name: str, delete_previous=False) -> List[str]:
+        """
+        Point the store alias to the name index and return the indices it pointed to:
+            The index gets the replicas of the current one and its default refresh back, and is
+            refreshed and allocated before the alias moves, in a single update_aliases request. Its
+            catalog version follows the current one, so cached responses and ETags expire. An index
+            that is not at least yellow in time raises, leaving the alias untouched. A store index
+            created before the alias is removed by a remove_index action of that same request.
+        """
+        previous = self.aliased_indices()
+        replicas = None
+        if previous:
+            settings = self.connection.indices.get_settings(index=previous[0], name="index.number_of_replicas")
+            replicas = settings[previous[0]]["settings"]["index"]["number_of_replicas"]
+
+        catalog = self.connection.get(index=ALIAS, doc_type=Catalog._doc_type.name, id=Catalog.ID, ignore=404) if previous else {}
+        version = catalog["_source"]["version"] + 1 if catalog.get("found") else 1
+        self.connection.index(index=name, doc_type=Catalog._doc_type.name, id=Catalog.ID, body={"version": version})
+
+        self.connection.indices.put_settings(index=name, body={"index": {"number_of_replicas": replicas, "refresh_interval": None}})
+        self.connection.indices.refresh(index=name)
+        health = self.connection.cluster.health(index=name, wait_for_status="yellow", timeout="60s", request_timeout=90, ignore=408)
+        if health["timed_out"] or health["status"] == "red":
+            raise ElasticsearchException("Index %s is %s, the alias is left untouched" % (name, health["status"]))
+
+        actions = [{"remove_index": {"index": index}} if index == ALIAS else {"remove": {"index": index, "alias": ALIAS}} for index in previous]
+        self.connection.indices.update_aliases(body={"actions": actions + [{"add": {"index": name, "alias": ALIAS}}]})
+
+        if delete_previous:
+            for index in previous:
+                if index != ALIAS:
+                    self.connection.indices.delete(index=index, ignore=404)
+        return previous
+
+    def rebuild_index(self, load: Callable = None, copy_types=(), delete_previous=False) -> Tuple[str, List[str]]:
+        """
+        Build a new index in the background and publish it. load(name) fills it, after the documents
+        of copy_types are copied from the current catalog, and the whole catalog is copied when load is
+        None. A failed build, load raising included, is deleted and the alias is left untouched.
+        Returns the new index name and the indices the alias pointed to.
+        """
+        name = self.create_index(bulk=True)
+        try:
+            if load is None:
+                reindex(self.connection, ALIAS, name)
+            else:
+                if copy_types and self.aliased_indices():
+                    reindex(self.connection, ALIAS, name, query={"query": {"terms": {"_type": list(copy_types)}}})
+                load(name)
+        except BaseException:
+            self.connection.indices.delete(index=name, ignore=404)
+            raise
+        return name, self.publish_index(name, delete_previous=delete_previous)
+
+    def export_snapshot(self, path: str) -> int:
+        """Write every product, session and the catalog version as JSON lines, for MemoryEngine. Returns the amount written."""
+        amount = 0
+        with open(path, "w", encoding="utf-8") as snapshot:
+            for hit in scan(self.connection, index=ALIAS, query={"query": {"match_all": {}}}):
+                snapshot.write(json.dumps({"_type": hit["_type"], "_id": hit["_id"], "_source": hit["_source"]}, ensure_ascii=False))
+                snapshot.write("\n")
+                amount += 1
+        return amount
+
+    def backfill_discount(self) -> int:
+        """Store price.discount on the products indexed before the field existed. Returns the amount updated."""
+        response = self.connection.update_by_query(
+            index=Product._doc_type.index,
+            doc_type=Product._doc_type.name,
+            body={
+                "query": {"bool": {"must_not": {"exists": {"field": "price.discount"}}}},
+                "script": {
+                    "lang": "painless",
+                    "inline": "def p = ctx._source.price; "
+                              "p.discount = p.retail > 0 ? Math.round((1.0 - (double) p.outlet / (double) p.retail) * 10000.0) / 100.0 : 0.0"
+                }
+            },
+            conflicts="proceed",
+            refresh=True
+        )
+        return response["updated"]
+
+    def bump_catalog_version(self) -> int:
+        """Increase the catalog version after the catalog changes, so cached responses and ETags expire. Returns the new version."""
+        response = self.connection.update(
+            index=Catalog._doc_type.index,
+            doc_type=Catalog._doc_type.name,
+            id=Catalog.ID,
+            body={
+                "script": {"lang": "painless", "inline": "ctx._source.version += 1"},
+                "upsert": {"version": 1}
+            },
+            retry_on_conflict=5,
+            refresh=True,
+            _source=True
+        )
+        return response["get"]["_source"]["version"]
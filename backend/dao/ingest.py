@@ -0,0 +1,106 @@
+import json
+import time
+import logging
+from typing import Iterable, Iterator
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import parallel_bulk
+from elasticsearch_dsl.exceptions import ValidationException
+
+from ..model import Product, Session
+
+
+class Ingestion(object):
+    """
+    Streams newline delimited crawler output into the store index through parallel_bulk:
+        Each line is a document, or a {"_type", "_id", "_source"} hit as written by export-snapshot.
+        The catalog hit of a snapshot is skipped, as the catalog version is bumped or carried forward
+        after every load. Plain documents are of doc_type, and get their id from Elasticsearch. Every
+        document is validated by its DocType and cleaned, so Product gets price.discount. Invalid
+        lines and rejected documents are logged and counted, never loaded. Index refresh is disabled
+        while loading and restored afterwards. Lines are read, validated and sent chunk by chunk, so
+        memory stays the same whatever the size of the input.
+    """
+
+    DOC_TYPES = {"products": Product, "sessions": Session}
+    SKIPPED_TYPES = {"catalog"}
+
+    def __init__(self, es: Elasticsearch, index=None, doc_type="products", chunk_size=500, thread_count=4) -> None:
+        if doc_type not in self.DOC_TYPES:
+            raise ValueError("Invalid doc_type '%s', must be one of %s" % (doc_type, sorted(self.DOC_TYPES)))
+
+        self.es = es
+        self.index = index or Product._doc_type.index
+        self.doc_type = doc_type
+        self.chunk_size = chunk_size
+        self.thread_count = thread_count
+        self.invalid = 0
+        self.logger = logging.getLogger("willstores.ingest")
+
+    def actions(self, lines: Iterable[str]) -> Iterator[dict]:
+        """Bulk index actions of the valid lines. The others are logged and counted in invalid."""
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                data = json.loads(line)
+                if data.get("_type") in self.SKIPPED_TYPES:
+                    continue
+                yield self.action(data)
+            except (ValueError, KeyError, TypeError, AttributeError, ValidationException) as error:
+                self.invalid += 1
+                self.logger.warning("Line %d skipped: %s", number, error)
+
+    def action(self, data: dict) -> dict:
+        if "_source" in data:
+            doc_class = self.DOC_TYPES.get(data.get("_type", self.doc_type))
+            if doc_class is None:
+                raise ValueError("Invalid _type '%s'" % data["_type"])
+            source = data["_source"]
+            meta = {"id": data["_id"]} if data.get("_id") else {}
+        else:
+            doc_class, source, meta = self.DOC_TYPES[self.doc_type], data, {}
+
+        doc = doc_class(meta=meta, **source)
+        doc.full_clean()
+        action = doc.to_dict(include_meta=True)
+        action["_index"] = self.index
+        return action
+
+    def run(self, lines: Iterable[str]) -> dict:
+        """Load every line and refresh the index. Returns the amount indexed, failed and invalid, and the time it took."""
+        self.invalid = 0
+        indexed, failed = 0, 0
+        start = time.perf_counter()
+        refresh_interval = self.__refresh_interval()
+        self.__set_refresh_interval("-1")
+        try:
+            for ok, item in parallel_bulk(self.es, self.actions(lines), thread_count=self.thread_count,
+                                          chunk_size=self.chunk_size, raise_on_error=False):
+                if ok:
+                    indexed += 1
+                else:
+                    failed += 1
+                    self.logger.warning("Document rejected: %s", item)
+        finally:
+            self.__set_refresh_interval(refresh_interval)
+            self.es.indices.refresh(index=self.index)
+
+        seconds = time.perf_counter() - start
+        return {
+            "indexed": indexed,
+            "failed": failed,
+            "invalid": self.invalid,
+            "seconds": seconds,
+            "docs_per_second": indexed / seconds if seconds > 0 else 0.0
+        }
+
+    def __refresh_interval(self):
+        settings = self.es.indices.get_settings(index=self.index, name="index.refresh_interval")
+        for index_settings in settings.values():
+            if isinstance(index_settings, dict):
+                return index_settings.get("settings", {}).get("index", {}).get("refresh_interval")
+        return None
+
+    def __set_refresh_interval(self, refresh_interval) -> None:
+        self.es.indices.put_settings(index=self.index, body={"index": {"refresh_interval": refresh_interval}})
@@ -0,0 +1,674 @@
+import re
+import json
+import math
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import chain
+from threading import Lock
+from typing import Callable, Iterable, List, Optional, Tuple
+from werkzeug.utils import import_string
+
+from backend.util.cache import TTLCache, MISSING
+from .local import LocalConnection, param_list
+
+
+TOKEN = re.compile(r"\w+")
+
+K1 = 1.2
+B = 0.75
+
+SCORE_SORTS = [[("_score", "desc"), ("_uid", "asc")], [("_score", "desc"), ("_id", "asc")]]
+
+
+def analyze(text) -> Tuple[str, ...]:
+    """Tokens of a text field, close to what the standard analyzer makes of it."""
+    if text is None:
+        return ()
+    if isinstance(text, list):
+        return tuple(token for item in text for token in analyze(item))
+    return tuple(TOKEN.findall(str(text).lower()))
+
+
+def contains_phrase(tokens: Tuple[str, ...], phrase: Tuple[str, ...]) -> bool:
+    if not phrase:
+        return False
+    return any(tokens[i:i + len(phrase)] == phrase for i in range(len(tokens) - len(phrase) + 1))
+
+
+def bm25(tf: int, df: int, doc_count: int, length: int, avg_length: float) -> float:
+    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+    return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+
+
+def lookup(source: dict, path: str):
+    for name in path.split("."):
+        if not isinstance(source, dict):
+            return None
+        source = source.get(name)
+    return source
+
+
+def project(source: dict, includes=None, excludes=None) -> dict:
+    if includes:
+        source = {field: value for field, value in source.items() if field in includes}
+    if excludes:
+        source = {field: value for field, value in source.items() if field not in excludes}
+    return source
+
+
+class KeywordColumn(object):
+    """Dictionary encoded field: a code per document, the distinct values, their tokens and a posting list per value."""
+
+    def __init__(self) -> None:
+        self.codes = array("I")
+        self.values = []
+        self.tokens = []
+        self.postings = []
+        self.__index = {}
+
+    def append(self, doc: int, value) -> None:
+        if isinstance(value, list):
+            value = " ".join(str(item) for item in value)
+        code = self.__index.get(value)
+        if code is None:
+            code = self.__index[value] = len(self.values)
+            self.values.append(value)
+            self.tokens.append(analyze(value))
+            self.postings.append(array("I"))
+        self.codes.append(code)
+        self.postings[code].append(doc)
+
+    def count(self, code: int) -> int:
+        return len(self.postings[code])
+
+    def exact(self, values: Iterable) -> set:
+        return {self.__index[value] for value in values if value in self.__index}
+
+    def matching(self, matches: Callable) -> set:
+        return {code for code, tokens in enumerate(self.tokens) if matches(tokens)}
+
+    def scores(self, token: str) -> dict:
+        """BM25 score of token on each value holding it."""
+        doc_count = len(self.codes)
+        avg_length = sum(len(tokens) * self.count(code) for code, tokens in enumerate(self.tokens)) / doc_count or 1.0
+        holders = [code for code, tokens in enumerate(self.tokens) if token in tokens]
+        df = sum(self.count(code) for code in holders)
+        return {code: bm25(self.tokens[code].count(token), df, doc_count, len(self.tokens[code]), avg_length) for code in holders}
+
+
+class NumberColumn(object):
+    """Float per document, NaN when missing, and the documents sorted by value for range lookups."""
+
+    def __init__(self) -> None:
+        self.values = array("d")
+        self.order = array("I")
+        self.sorted_values = array("d")
+
+    def append(self, value) -> None:
+        self.values.append(float(value) if value is not None else math.nan)
+
+    def seal(self) -> None:
+        self.order = array("I", sorted((doc for doc, value in enumerate(self.values) if not math.isnan(value)),
+                                       key=self.values.__getitem__))
+        self.sorted_values = array("d", (self.values[doc] for doc in self.order))
+
+    def bounds(self, condition: dict) -> Tuple[int, int]:
+        low, high = 0, len(self.order)
+        if "gte" in condition:
+            low = bisect_left(self.sorted_values, float(condition["gte"]))
+        elif "gt" in condition:
+            low = bisect_right(self.sorted_values, float(condition["gt"]))
+        if "lte" in condition:
+            high = bisect_right(self.sorted_values, float(condition["lte"]))
+        elif "lt" in condition:
+            high = bisect_left(self.sorted_values, float(condition["lt"]))
+        return low, max(low, high)
+
+
+class TextColumn(object):
+    """
+    Inverted index of a text field: documents and term frequencies per token, and each document length.
+    The index never changes once loaded, so the scores of the most searched tokens are kept.
+    """
+
+    def __init__(self) -> None:
+        self.lengths = array("I")
+        self.postings = {}
+        self.__scores = TTLCache(64, name="memory")
+
+    def append(self, doc: int, value) -> None:
+        tokens = analyze(value)
+        self.lengths.append(len(tokens))
+        for token, tf in Counter(tokens).items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = (array("I"), array("I"))
+            posting[0].append(doc)
+            posting[1].append(tf)
+
+    def scores(self, token: str) -> dict:
+        """BM25 score of token on each document holding it."""
+        scores = self.__scores.get(token)
+        if scores is MISSING:
+            docs, tfs = self.postings.get(token, ((), ()))
+            doc_count = len(self.lengths)
+            avg_length = sum(self.lengths) / doc_count or 1.0
+            by_shape = {}
+            for tf, length in set(zip(tfs, map(self.lengths.__getitem__, docs))):
+                by_shape[(tf, length)] = bm25(tf, len(docs), doc_count, length, avg_length)
+            scores = dict(zip(docs, map(by_shape.__getitem__, zip(tfs, map(self.lengths.__getitem__, docs)))))
+            self.__scores.set(token, scores, math.inf)
+        return scores
+
+
+class Clause(object):
+    """
+    A leaf of the query, seen as a document filter:
+        estimate: Upper bound of the documents it matches
+        candidates: Function listing those documents
+        keep: Function keeping only the matching documents of a list
+    """
+
+    def __init__(self, estimate: int, candidates: Callable, keep: Callable) -> None:
+        self.estimate = estimate
+        self.candidates = candidates
+        self.keep = keep
+
+
+class MemoryIndex(object):
+    """
+    A doc type of the catalog held in compact columns:
+        keywords: Fields stored dictionary encoded, used by term, terms, match_phrase and terms aggregations
+        numbers: Dotted fields stored as floats, used by range, min, max and sort
+        texts: Fields stored as an inverted index, used by multi_match
+    Sources are kept as compact JSON and only decoded for the hits returned.
+    """
+
+    def __init__(self, doc_type: str, keywords=(), numbers=(), texts=()) -> None:
+        self.doc_type = doc_type
+        self.ids = []
+        self.sources = []
+        self.keywords = {field: KeywordColumn() for field in keywords}
+        self.numbers = {field: NumberColumn() for field in numbers}
+        self.texts = {field: TextColumn() for field in texts}
+        self.uid_rank = array("I")
+        self.__docs = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, id_: str, source: dict) -> None:
+        if id_ in self.__docs:
+            raise ValueError("Duplicated %s id '%s'" % (self.doc_type, id_))
+        doc = self.__docs[id_] = len(self.ids)
+        self.ids.append(id_)
+        self.sources.append(json.dumps(source, ensure_ascii=False, separators=(",", ":")))
+        for field, column in self.keywords.items():
+            column.append(doc, source.get(field))
+        for field, column in self.numbers.items():
+            column.append(lookup(source, field))
+        for field, column in self.texts.items():
+            column.append(doc, source.get(field))
+
+    def seal(self) -> None:
+        for column in self.numbers.values():
+            column.seal()
+        self.uid_rank = array("I", bytes(4 * len(self)))
+        for rank, doc in enumerate(sorted(range(len(self)), key=self.ids.__getitem__)):
+            self.uid_rank[doc] = rank
+
+    def doc(self, id_: str) -> Optional[int]:
+        return self.__docs.get(id_)
+
+    def source(self, doc: int) -> dict:
+        return json.loads(self.sources[doc])
+
+    def search(self, body: dict) -> dict:
+        scores = Counter()
+        docs = self.match(body.get("query"), scores=scores)
+        max_score = (max(map(scores.__getitem__, docs)) if scores else 0.0) if docs else None
+        response = {"took": 0, "timed_out": False, "hits": {"total": len(docs), "max_score": max_score, "hits": self.hits(docs, scores, body)}}
+        if body.get("aggs") or body.get("aggregations"):
+            response["aggregations"] = self.aggregations(body.get("aggs") or body.get("aggregations"), docs)
+        return response
+
+    def match(self, query: Optional[dict], docs=None, scores=None) -> List[int]:
+        clauses = []
+        self.__compile(query, clauses, scores)
+        if not clauses:
+            return list(range(len(self))) if docs is None else docs
+
+        clauses.sort(key=lambda clause: clause.estimate)
+        if docs is None:
+            docs, clauses = clauses[0].candidates(), clauses[1:]
+        for clause in clauses:
+            docs = clause.keep(docs)
+        return docs
+
+    def __compile(self, query: Optional[dict], clauses: List[Clause], scores: Optional[Counter]) -> None:
+        if not query:
+            return
+        (kind, spec), = query.items()
+        if kind == "match_all":
+            return
+        elif kind == "bool":
+            unsupported = set(spec) - {"must", "filter"}
+            if unsupported:
+                raise ValueError("Unsupported bool clauses %s" % sorted(unsupported))
+            for clause in self.__list(spec.get("must")):
+                self.__compile(clause, clauses, scores)
+            for clause in self.__list(spec.get("filter")):
+                self.__compile(clause, clauses, None)
+        elif kind == "range":
+            (field, condition), = spec.items()
+            clause = self.__range(field, condition)
+            if clause is not None:
+                clauses.append(clause)
+        elif kind == "multi_match":
+            clauses.append(self.__multi_match(spec, scores))
+        elif kind in ("term", "terms", "match_phrase"):
+            (field, value), = spec.items()
+            if isinstance(value, dict):
+                value = value.get("value", value.get("query"))
+            if field == "_id":
+                clauses.append(self.__ids([value] if kind == "term" else value))
+            else:
+                clauses.append(self.__keyword(kind, field, value))
+        else:
+            raise ValueError("Unsupported query '%s'" % kind)
+
+    @staticmethod
+    def __list(value) -> list:
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+    def __ids(self, ids: List[str]) -> Clause:
+        matched = {self.doc(id_) for id_ in ids} - {None}
+        return Clause(len(matched), lambda: list(matched), lambda docs: [doc for doc in docs if doc in matched])
+
+    def __keyword(self, kind: str, field: str, value) -> Clause:
+        name, _, subfield = field.partition(".")
+        column = self.keywords.get(name)
+        if column is None or subfield not in ("", "keyword"):
+            raise ValueError("Unsupported %s field '%s'" % (kind, field))
+
+        if subfield == "keyword":
+            if kind == "match_phrase":
+                raise ValueError("Unsupported match_phrase field '%s'" % field)
+            allowed = column.exact([value] if kind == "term" else value)
+        elif kind == "term":
+            allowed = column.matching(lambda tokens: str(value) in tokens)
+        elif kind == "terms":
+            allowed = column.matching(lambda tokens: any(str(item) in tokens for item in value))
+        else:
+            phrase = analyze(value)
+            allowed = column.matching(lambda tokens: contains_phrase(tokens, phrase))
+
+        codes = column.codes
+        return Clause(
+            sum(column.count(code) for code in allowed),
+            lambda: list(chain.from_iterable(column.postings[code] for code in allowed)),
+            lambda docs: [doc for doc in docs if codes[doc] in allowed]
+        )
+
+    def __range(self, field: str, condition: dict) -> Optional[Clause]:
+        """The range as a Clause, or None when every document is in it, as for the price query on a clean catalog."""
+        column = self.numbers.get(field)
+        if column is None:
+            raise ValueError("Unsupported range field '%s'" % field)
+
+        low, high = column.bounds(condition)
+        if high - low == len(self):
+            return None
+        lowest = column.sorted_values[low] if low < high else math.inf
+        highest = column.sorted_values[high - 1] if low < high else -math.inf
+        values = column.values
+        return Clause(
+            high - low,
+            lambda: column.order[low:high].tolist(),
+            lambda docs: [doc for doc in docs if lowest <= values[doc] <= highest]
+        )
+
+    def __multi_match(self, spec: dict, scores: Optional[Counter]) -> Clause:
+        if spec.get("type", "best_fields") != "most_fields":
+            raise ValueError("Unsupported multi_match type '%s'" % spec.get("type"))
+
+        matched = Counter()
+        for field in spec["fields"]:
+            for token in analyze(spec["query"]):
+                if field in self.texts:
+                    self.__add_scores(matched, self.texts[field].scores(token))
+                elif field in self.keywords:
+                    column = self.keywords[field]
+                    for code, score in column.scores(token).items():
+                        self.__add_scores(matched, dict.fromkeys(column.postings[code], score))
+                else:
+                    raise ValueError("Unsupported multi_match field '%s'" % field)
+
+        if scores is not None:
+            scores.update(matched)
+        return Clause(len(matched), lambda: list(matched), lambda docs: [doc for doc in docs if doc in matched])
+
+    @staticmethod
+    def __add_scores(matched: Counter, scores: dict) -> None:
+        if not matched:
+            matched.update(scores)
+        else:
+            for doc, score in scores.items():
+                matched[doc] += score
+
+    def hits(self, docs: List[int], scores: Counter, body: dict) -> List[dict]:
+        start, size = body.get("from", 0), body.get("size", 10)
+        if size <= 0:
+            return []
+
+        sort = self.__sort(body.get("sort"))
+        if "search_after" in body:
+            key = self.__sort_key(sort, scores)
+            after = self.__after_key(sort, body["search_after"])
+            docs = [doc for doc in docs if key(doc)[:-1] > after]
+
+        if sort is None or sort in SCORE_SORTS:
+            page = self.__top_by_score(docs, scores, start + size, sort is not None)[start:]
+        elif len(sort) == 1 and sort[0][0] in self.numbers and "search_after" not in body:
+            page = self.__top_by_column(sort[0], docs, start + size)[start:]
+        else:
+            page = heapq.nsmallest(start + size, docs, key=self.__sort_key(sort, scores))[start:]
+
+        tracks_score = sort is None or any(field == "_score" for field, _ in sort)
+        includes, excludes = self.__source_filter(body.get("_source"))
+        hits = []
+        for doc in page:
+            source = self.source(doc)
+            hit = {"_index": "store", "_type": self.doc_type, "_id": self.ids[doc], "_score": float(scores[doc]) if tracks_score else None}
+            if includes is not False:
+                hit["_source"] = project(source, includes, excludes)
+            if "script_fields" in body:
+                hit["fields"] = self.__script_fields(source, body["script_fields"])
+            if sort is not None:
+                hit["sort"] = [self.__sort_value(doc, field, scores) for field, _ in sort]
+            hits.append(hit)
+        return hits
+
+    @staticmethod
+    def __sort(sort) -> Optional[List[Tuple[str, str]]]:
+        if sort is None:
+            return None
+        fields = []
+        for item in sort if isinstance(sort, list) else [sort]:
+            if isinstance(item, str):
+                fields.append((item, "desc" if item == "_score" else "asc"))
+            else:
+                (field, order), = item.items()
+                fields.append((field, order.get("order", "asc") if isinstance(order, dict) else order))
+        return fields
+
+    def __top_by_score(self, docs: List[int], scores: Counter, amount: int, by_uid: bool) -> List[int]:
+        """Best scored documents, ties broken by uid or by document order, ranked with builtin keys only."""
+        if not docs:
+            return []
+        if scores:
+            threshold = scores[heapq.nlargest(amount, docs, key=scores.__getitem__)[-1]]
+            docs = [doc for doc in docs if scores[doc] >= threshold]
+        tied = sorted(docs, key=self.uid_rank.__getitem__ if by_uid else None)
+        if scores:
+            tied.sort(key=scores.__getitem__, reverse=True)
+        return tied[:amount]
+
+    def __top_by_column(self, sort: Tuple[str, str], docs: List[int], amount: int) -> List[int]:
+        """Walk the documents sorted by the field until amount of them matched, instead of sorting the matches."""
+        field, order = sort
+        column = self.numbers[field]
+        matched = None if len(docs) == len(self) else set(docs)
+        ranked = column.order if order == "asc" else self.__descending(column)
+        top = []
+        for doc in ranked:
+            if len(top) == amount:
+                return top
+            if matched is None or doc in matched:
+                top.append(doc)
+
+        missing = [doc for doc in docs if math.isnan(column.values[doc])]
+        return top + sorted(missing)[:amount - len(top)]
+
+    @staticmethod
+    def __descending(column: NumberColumn) -> Iterable[int]:
+        """Documents by decreasing value, keeping equal values in increasing document order, as Lucene breaks ties."""
+        end = len(column.order)
+        while end > 0:
+            start = bisect_left(column.sorted_values, column.sorted_values[end - 1], 0, end)
+            yield from column.order[start:end]
+            end = start
+
+    def __sort_key(self, sort, scores: Counter) -> Callable:
+        if sort is None:
+            return lambda doc: (-scores[doc], doc)
+
+        parts = [self.__sort_part(field, order, scores) for field, order in sort]
+        if len(parts) == 1:
+            first, = parts
+            return lambda doc: (first(doc), doc)
+        elif len(parts) == 2:
+            first, second = parts
+            return lambda doc: (first(doc), second(doc), doc)
+        return lambda doc: tuple(part(doc) for part in parts) + (doc,)
+
+    def __sort_part(self, field: str, order: str, scores: Counter) -> Callable:
+        if field in ("_uid", "_id"):
+            if order != "asc":
+                raise ValueError("Unsupported %s sort order '%s'" % (field, order))
+            ids, prefix = self.ids, "%s#" % self.doc_type if field == "_uid" else ""
+            return lambda doc: prefix + ids[doc]
+        elif field == "_score":
+            return (lambda doc: -scores[doc]) if order == "desc" else scores.__getitem__
+
+        sign = -1.0 if order == "desc" else 1.0
+        values = self.numbers[field].values if field in self.numbers else None
+        if values is None:
+            raise ValueError("Unsupported sort field '%s'" % field)
+        return lambda doc: self.__number_key(sign * values[doc])
+
+    def __after_key(self, sort, search_after: list) -> tuple:
+        if sort is None or len(sort) != len(search_after):
+            raise ValueError("search_after needs one value per sort field")
+        return tuple(value if field in ("_uid", "_id") else self.__number_key((-1.0 if order == "desc" else 1.0) * float(value))
+                     for (field, order), value in zip(sort, search_after))
+
+    @staticmethod
+    def __number_key(value: float) -> float:
+        return math.inf if math.isnan(value) else value
+
+    def __sort_value(self, doc: int, field: str, scores: Counter):
+        if field == "_score":
+            return float(scores[doc])
+        elif field == "_uid":
+            return "%s#%s" % (self.doc_type, self.ids[doc])
+        elif field == "_id":
+            return self.ids[doc]
+        elif field in self.numbers:
+            return self.numbers[field].values[doc]
+        raise ValueError("Unsupported sort field '%s'" % field)
+
+    @staticmethod
+    def __source_filter(spec):
+        if spec is None or spec is True:
+            return None, None
+        elif spec is False:
+            return False, None
+        elif isinstance(spec, str):
+            return [spec], None
+        elif isinstance(spec, list):
+            return spec, None
+        return spec.get("includes"), spec.get("excludes")
+
+    @staticmethod
+    def __script_fields(source: dict, script_fields: dict) -> dict:
+        """Only list fields named after themselves are understood, answered with their first item as ProductService expects."""
+        fields = {}
+        for name in script_fields:
+            value = source.get(name)
+            if not isinstance(value, list):
+                raise ValueError("Unsupported script field '%s'" % name)
+            fields[name] = [value[0] if value else None]
+        return fields
+
+    def aggregations(self, aggs: dict, docs: List[int]) -> dict:
+        results = {}
+        for name, agg in aggs.items():
+            subaggs = agg.get("aggs") or agg.get("aggregations")
+            kind = (set(agg) - {"aggs", "aggregations", "meta"}).pop()
+            spec = agg[kind]
+            if kind == "filter":
+                matched = self.match(spec, docs=docs)
+                result = {"doc_count": len(matched)}
+            elif kind == "terms":
+                matched = docs
+                result = self.__terms(spec, docs)
+            elif kind in ("min", "max"):
+                matched = docs
+                result = {"value": self.__extreme(kind, spec["field"], docs)}
+            else:
+                raise ValueError("Unsupported aggregation '%s'" % kind)
+
+            if subaggs:
+                if kind == "terms":
+                    raise ValueError("Unsupported aggregation under terms '%s'" % name)
+                result.update(self.aggregations(subaggs, matched))
+            results[name] = result
+        return results
+
+    def __terms(self, spec: dict, docs: List[int]) -> dict:
+        name, _, subfield = spec["field"].partition(".")
+        column = self.keywords.get(name)
+        if column is None or subfield != "keyword":
+            raise ValueError("Unsupported terms field '%s'" % spec["field"])
+
+        counts = Counter(map(column.codes.__getitem__, docs))
+        ranked = sorted(((code, count) for code, count in counts.items() if column.values[code] is not None),
+                        key=lambda item: (-item[1], str(column.values[item[0]])))
+        size = spec.get("size", 10)
+        return {
+            "doc_count_error_upper_bound": 0,
+            "sum_other_doc_count": sum(count for _, count in ranked[size:]),
+            "buckets": [{"key": column.values[code], "doc_count": count} for code, count in ranked[:size]]
+        }
+
+    def __extreme(self, kind: str, field: str, docs: List[int]) -> Optional[float]:
+        column = self.numbers.get(field)
+        if column is None:
+            raise ValueError("Unsupported %s field '%s'" % (kind, field))
+        values = [value for value in map(column.values.__getitem__, docs) if not math.isnan(value)]
+        if not values:
+            return None
+        return min(values) if kind == "min" else max(values)
+
+
+class MemoryEngine(object):
+    """
+    Process-wide catalog loaded from a snapshot, for running without an Elasticsearch cluster:
+        The snapshot is the JSON lines file written by the export-snapshot command, one
+        {"_type", "_id", "_source"} hit per line. It is read when the app is created with
+        MEMORY_SNAPSHOT in config.py set and ES_CONNECTION_CLASS naming MemoryConnection, and
+        ignored with any other connection class.
+        gunicorn.conf.py preloads the app when MEMORY_SNAPSHOT is set, so the catalog is loaded once
+        in the master and the forked workers start with it, sharing its memory until they write to it.
+    """
+
+    PRODUCTS = {
+        "keywords": ["gender", "brand", "kind", "sessionid", "sessionname"],
+        "numbers": ["price.outlet", "price.retail", "price.discount"],
+        "texts": ["name"]
+    }
+    SESSIONS = {
+        "keywords": ["gender", "name"],
+        "numbers": ["pos"]
+    }
+
+    __lock = Lock()
+    __snapshot = None
+    __engine = None
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        with cls.__lock:
+            snapshot = app.config["MEMORY_SNAPSHOT"]
+            connection_class = app.config["ES_CONNECTION_CLASS"]
+            if connection_class is None or not issubclass(import_string(connection_class), MemoryConnection):
+                snapshot = None
+            if snapshot != cls.__snapshot:
+                cls.__snapshot = snapshot
+                cls.__engine = cls.load(cls.__snapshot) if cls.__snapshot is not None else None
+
+    @classmethod
+    def get(cls) -> "MemoryEngine":
+        with cls.__lock:
+            if cls.__engine is None:
+                if cls.__snapshot is None:
+                    raise ValueError("MEMORY_SNAPSHOT is not set or ES_CONNECTION_CLASS is not MemoryConnection")
+                cls.__engine = cls.load(cls.__snapshot)
+            return cls.__engine
+
+    @classmethod
+    def set(cls, engine: "MemoryEngine") -> None:
+        with cls.__lock:
+            cls.__engine = engine
+
+    @classmethod
+    def load(cls, path: str) -> "MemoryEngine":
+        with open(path, encoding="utf-8") as snapshot:
+            return cls((json.loads(line) for line in snapshot if line.strip()))
+
+    def __init__(self, hits: Iterable[dict]) -> None:
+        self.version = 0
+        self.indices = {
+            "products": MemoryIndex("products", **self.PRODUCTS),
+            "sessions": MemoryIndex("sessions", **self.SESSIONS)
+        }
+        for hit in hits:
+            if hit["_type"] == "catalog":
+                self.version = hit["_source"]["version"]
+            elif hit["_type"] in self.indices:
+                self.indices[hit["_type"]].add(hit["_id"], hit["_source"])
+        for index in self.indices.values():
+            index.seal()
+
+    def index(self, doc_type: str) -> MemoryIndex:
+        try:
+            return self.indices[doc_type]
+        except KeyError:
+            raise ValueError("Unknown doc type '%s'" % doc_type)
+
+
+class MemoryConnection(LocalConnection):
+    """
+    Elasticsearch connection served by the MemoryEngine, so ProductService and SessionService keep
+    building the same queries and the same parse functions read the responses:
+        Runs the bool, term, terms, match_phrase, range and most_fields multi_match queries, the
+        filter, terms, min and max aggregations, sorting, search_after, _source filtering and
+        the first image script field those services use. Scores follow BM25 without Lucene's
+        norms encoding, so ties and close scores may be ordered differently than on a cluster.
+    """
+
+    def search(self, doc_type: str, body: dict) -> dict:
+        return MemoryEngine.get().index(doc_type).search(body)
+
+    def mget(self, doc_type: str, body: dict, params: dict) -> dict:
+        ids = body["ids"] if "ids" in body else [doc["_id"] for doc in body["docs"]]
+        return {"docs": [self.get(doc_type, id_, params)[1] for id_ in ids]}
+
+    def get(self, doc_type: str, id_: str, params: dict) -> Tuple[int, dict]:
+        engine = MemoryEngine.get()
+        if doc_type == "catalog":
+            source = {"version": engine.version} if engine.version else None
+        else:
+            index = engine.index(doc_type)
+            doc = index.doc(id_)
+            source = index.source(doc) if doc is not None else None
+
+        if source is None:
+            return 404, {"_index": "store", "_type": doc_type, "_id": id_, "found": False}
+        source = project(source, param_list(params, "_source_include"), param_list(params, "_source_exclude"))
+        return 200, {"_index": "store", "_type": doc_type, "_id": id_, "_version": 1, "found": True, "_source": source}
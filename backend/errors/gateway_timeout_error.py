@@ -0,0 +1,9 @@
+from .error import Error
+
+
+class GatewayTimeoutError(Error):
+    def __init__(self, message):
+        self.__message = message
+
+    def __str__(self):
+        return self.__message
@@ -1,3 +1,4 @@
 from .price import Price
 from .product import Product
 from .session import Session
+from .catalog import Catalog
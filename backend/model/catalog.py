@@ -0,0 +1,17 @@
+from elasticsearch_dsl import DocType, Long
+
+
+class Catalog(DocType):
+    """
+    Catalog state, a single document bumped by every ingest:
+        id: Always Catalog.ID
+        version: Counter increased each time the catalog changes
+    """
+
+    ID = "catalog"
+
+    version = Long(required=True)
+
+    class Meta:
+        index = "store"
+        doc_type = "catalog"
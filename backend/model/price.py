@@ -6,11 +6,14 @@ class Price(InnerObjectWrapper):
     Price of a Product:
         outlet: Outlet price, discounted
         retail: Retail price, before discount
+        discount: Discount percentage over the retail price. Stored when the Product is saved, computed when missing
     """
 
-    @property
-    def discount(self) -> float:
-        return round((1.0 - (self.outlet / self.retail)) * 100.0, 2)
+    @staticmethod
+    def compute_discount(outlet, retail) -> float:
+        if retail <= 0.0:
+            return 0.0
+        return round((1.0 - (float(outlet) / float(retail))) * 100.0, 2)
 
     def get_dict(self) -> dict:
         return {
@@ -39,7 +39,8 @@ class Product(DocType):
         required=True,
         properties={
             "outlet": Float(required=True),
-            "retail": Float(required=True)
+            "retail": Float(required=True),
+            "discount": Float()
         }
     )
     sessionid = Text(fields={"keyword": Keyword()}, required=True)
@@ -51,6 +52,9 @@ class Product(DocType):
         type = "products"
         doc_type = "products"
 
+    def clean(self) -> None:
+        self.price.discount = Price.compute_discount(self.price.outlet, self.price.retail)
+
     def __get_main_image(self) -> str:
         return self.images[0]
 
@@ -71,11 +75,16 @@ class Product(DocType):
             "price": self.price.get_dict()
         }
 
+    def __get_discount(self) -> float:
+        if self.price.discount is None:
+            return Price.compute_discount(self.price.outlet, self.price.retail)
+        return self.price.discount
+
     def get_dict_min(self) -> dict:
         return {
             "id": self.meta["id"],
             "name": self.name,
             "image": self.__get_main_image(),
             "price": self.price.get_dict(),
-            "discount": self.price.discount
+            "discount": self.__get_discount()
         }
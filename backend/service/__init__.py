@@ -1,3 +1,4 @@
 from .jwt_service import JWTService
 from .product_service import ProductService
 from .session_service import SessionService
+from .catalog_service import CatalogService
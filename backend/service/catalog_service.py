@@ -0,0 +1,45 @@
+from hashlib import sha1
+from threading import Lock
+
+from backend.model import Catalog
+from backend.dao.es import ES
+from backend.util.cache import ServiceCache, MISSING
+from backend.util.singleflight import SingleFlight
+from backend.util.metrics import es_timer
+
+
+VERSION_KEY = ("CatalogService.version", ())
+
+
+class CatalogService(object):
+    __lock = Lock()
+    __seen = None
+
+    def __init__(self):
+        self.es = ES().connection
+
+    def version(self) -> int:
+        version = ServiceCache.get(VERSION_KEY)
+        if version is MISSING:
+            version = SingleFlight.do(VERSION_KEY, self.__fetch_version)
+        return version
+
+    def etag(self, *parts) -> str:
+        digest = sha1()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return "v%d-%s" % (self.version(), digest.hexdigest()[:20])
+
+    def __fetch_version(self) -> int:
+        with es_timer("CatalogService.version", "get"):
+            catalog = Catalog.get(id=Catalog.ID, using=self.es, ignore=404)
+        version = catalog.version if catalog is not None else 0
+        with CatalogService.__lock:
+            changed = CatalogService.__seen is not None and CatalogService.__seen != version
+            CatalogService.__seen = version
+
+        if changed:
+            ServiceCache.clear()
+        ServiceCache.set(VERSION_KEY, version)
+        return version
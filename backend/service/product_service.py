@@ -1,43 +1,94 @@
-from typing import List, Tuple
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Tuple
 from elasticsearch_dsl import Search, Q
 
 from backend.model import Product
 from backend.dao.es import ES
+from backend.dao.batch import DeferredSearch, deferrable
 from backend.errors.no_content_error import NoContentError
 from backend.errors.not_found_error import NotFoundError
 from backend.errors.request_error import ValidationError
+from backend.util.cursor import Cursor
+from backend.util.metrics import timed, es_timer
+
+
+CENTS = Decimal("0.01")
+
+MIN_FIELDS = ["name", "images", "price"]
+
+FIRST_IMAGE_SCRIPT = "def images = params['_source']['images']; return images == null || images.isEmpty() ? null : images[0]"
 
 
 class ProductService(object):
+    PAGESIZE = 10
+
     def __init__(self):
         self.es = ES().connection
 
-    def products_count(self) -> int:
+    @deferrable
+    def products_count(self) -> DeferredSearch:
         s = Product.search(using=self.es)
-        s = s.filter("match_all")[:0]
-        s = s.query({"range": {"price.retail": {"gt": 0.0}}}).query({"range": {"price.outlet": {"gt": 0.0}}})
-        results = s.execute()
-        return results.hits.total
+        s = s.filter(self.__price_query())[:0]
+
+        def parse(results) -> int:
+            return results.hits.total
+
+        return DeferredSearch(s, parse)
 
-    def super_discounts(self, gender=None, amount=10) -> List[Product]:
+    @deferrable
+    def count_by_session(self, sessionids) -> DeferredSearch:
         s = Product.search(using=self.es)
+        s = s.filter({"terms": {"sessionid.keyword": list(sessionids)}})
+        s = s[:0]
+        s.aggs.bucket("sessions", "terms", field="sessionid.keyword", size=len(sessionids))
+
+        def parse(results) -> Dict[str, int]:
+            return {bucket.key: bucket.doc_count for bucket in results.aggs.sessions.buckets}
+
+        return DeferredSearch(s, parse)
+
+    @deferrable
+    def super_discounts(self, gender=None, amount=10, projection="full") -> DeferredSearch:
+        s = self.__project(Product.search(using=self.es), projection)
         s = s[:amount]
         if gender is not None:
             s = s.filter("term", gender=gender.lower())
-        s = s.query({"range": {"price.retail": {"gt": 0.0}}}).query({"range": {"price.outlet": {"gt": 0.0}}})
-        s = s.sort({"_script": {"type": "number",
-                                "script": "(1.0 - (doc['price.outlet'].value / "
-                                          "doc['price.retail'].value)) * 100",
-                                "order": "desc"}})
-        results = s.execute()
-
-        if not results:
-            raise NoContentError()
+        s = s.filter(self.__price_query())
+        s = s.sort({"price.discount": {"order": "desc"}})
+
+        def parse(results) -> List[Product]:
+            if not results:
+                raise NoContentError()
+            else:
+                return results
+
+        return DeferredSearch(s, parse)
+
+    def __project(self, s: Search, projection: str) -> Search:
+        """
+        Limit the _source each hit brings back:
+            full: The whole document
+            min: Only the fields Product.get_dict_min uses
+            first_image: As min, with images holding only the first image, taken by a script field
+        """
+        if projection == "full":
+            return s
+        elif projection == "min":
+            return s.source(MIN_FIELDS)
+        elif projection == "first_image":
+            s = s.source([field for field in MIN_FIELDS if field != "images"])
+            return s.script_fields(images={"script": {"lang": "painless", "inline": FIRST_IMAGE_SCRIPT}})
         else:
-            return results
+            raise ValueError("Invalid projection '%s'" % projection)
 
-    def __search(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None,
-                kind=None, pricerange=None) -> Search:
+    def __price_query(self, pricerange=None) -> Q:
+        if pricerange is not None:
+            return Q({"range": {"price.outlet": {"gte": pricerange["min"], "lte": pricerange["max"]}}})
+        else:
+            return Q({"range": {"price.retail": {"gt": 0.0}}}) & Q({"range": {"price.outlet": {"gt": 0.0}}})
+
+    def __base_search(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None,
+                      kind=None) -> Search:
         s = Product.search(using=self.es)
         if query is not None:
             q = Q("multi_match", query=query, type="most_fields", fields=["kind", "brand", "gender", "name"])
@@ -47,102 +98,183 @@ class ProductService(object):
         if sessionid is not None:
             s = s.filter({"term": {"sessionid.keyword": sessionid}})
         if sessionname is not None:
-            s = s.query("match_phrase", sessionname="\"%s\"" % sessionname)
+            s = s.filter("match_phrase", sessionname="\"%s\"" % sessionname)
         if brand is not None:
-            s = s.query("match_phrase", brand="\"%s\"" % brand)
+            s = s.filter("match_phrase", brand="\"%s\"" % brand)
         if kind is not None:
-            s = s.query("match_phrase", kind="\"%s\"" % kind)
-        if pricerange is not None:
-            s = s.query({"range": {"price.outlet": {"gte": pricerange["min"], "lte": pricerange["max"]}}})
-        else:
-            s = s.query({"range": {"price.retail": {"gt": 0.0}}}).query({"range": {"price.outlet": {"gt": 0.0}}})
+            s = s.filter("match_phrase", kind="\"%s\"" % kind)
+        return s
+
+    def __search(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None,
+                kind=None, pricerange=None) -> Search:
+        s = self.__base_search(query=query, gender=gender, sessionid=sessionid, sessionname=sessionname, brand=brand, kind=kind)
+        s = s.filter(self.__price_query(pricerange))
         return s
 
+    @deferrable
+    def select_facets(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None, kind=None,
+                      pricerange=None) -> DeferredSearch:
+        s = self.__base_search(query=query, gender=gender, sessionid=sessionid, sessionname=sessionname, brand=brand, kind=kind)
+        s = s[:0]
+        s.aggs.bucket("pricerange", "filter", self.__price_query()) \
+            .metric("minprice", "min", field="price.outlet") \
+            .metric("maxprice", "max", field="price.outlet")
+        s.aggs.bucket("facets", "filter", self.__price_query(pricerange)) \
+            .bucket("brands", "terms", field="brand.keyword", size=2147483647)
+        s.aggs["facets"].bucket("kinds", "terms", field="kind.keyword", size=2147483647)
+
+        def parse(results) -> dict:
+            pricerange_aggs = results.aggs.pricerange
+            facets_aggs = results.aggs.facets
+            if not facets_aggs.brands.buckets or not facets_aggs.kinds.buckets or not pricerange_aggs.doc_count:
+                raise NoContentError()
+            else:
+                return {
+                    "total": facets_aggs.doc_count,
+                    "brands": [{"brand": hit.key, "amount": hit.doc_count} for hit in facets_aggs.brands.buckets],
+                    "kinds": [{"kind": hit.key, "amount": hit.doc_count} for hit in facets_aggs.kinds.buckets],
+                    "pricerange": {
+                        "min": round(pricerange_aggs.minprice.value, 2),
+                        "max": round(pricerange_aggs.maxprice.value, 2)
+                    }
+                }
+
+        return DeferredSearch(s, parse)
+
+    @deferrable
     def select_pricerange(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None,
-                       kind=None) -> dict:
+                       kind=None) -> DeferredSearch:
         s = self.__search(query=query, gender=gender, sessionid=sessionid, sessionname=sessionname, brand=brand, kind=kind)
         s = s[:1]
         s.aggs.metric("minprice", "min", field="price.outlet")
         s.aggs.metric("maxprice", "max", field="price.outlet")
-        results = s.execute()
 
-        if not results:
-            raise NoContentError()
-        else:
-            return {
-                "min": round(results.aggs.minprice.value, 2),
-                "max": round(results.aggs.maxprice.value, 2)
-            }
+        def parse(results) -> dict:
+            if not results:
+                raise NoContentError()
+            else:
+                return {
+                    "min": round(results.aggs.minprice.value, 2),
+                    "max": round(results.aggs.maxprice.value, 2)
+                }
+
+        return DeferredSearch(s, parse)
 
+    @deferrable
     def get_total(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None, kind=None,
-                    pricerange=None) -> int:
+                    pricerange=None) -> DeferredSearch:
         s = self.__search(query=query, gender=gender, sessionid=sessionid, sessionname=sessionname, brand=brand, kind=kind, pricerange=pricerange)
         s = s[:0]
-        results = s.execute()
-        total = results.hits.total
-        return total
 
+        def parse(results) -> int:
+            total = results.hits.total
+            return total
+
+        return DeferredSearch(s, parse)
+
+    @deferrable
     def select_brands(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None, kind=None,
-                   pricerange=None) -> List[dict]:
+                   pricerange=None) -> DeferredSearch:
         s = self.__search(query=query, gender=gender, sessionid=sessionid, sessionname=sessionname, brand=brand, kind=kind, pricerange=pricerange)
         s = s[:0]
         s.aggs.bucket("brands", "terms", field="brand.keyword", size=2147483647)
-        results = s.execute()
-        if not results.aggs.brands.buckets:
-            raise NoContentError()
-        else:
-            return [{"brand": hit.key, "amount": hit.doc_count} for hit in results.aggs.brands.buckets]
 
+        def parse(results) -> List[dict]:
+            if not results.aggs.brands.buckets:
+                raise NoContentError()
+            else:
+                return [{"brand": hit.key, "amount": hit.doc_count} for hit in results.aggs.brands.buckets]
+
+        return DeferredSearch(s, parse)
+
+    @deferrable
     def select_kinds(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None, kind=None,
-                   pricerange=None) -> List[dict]:
+                   pricerange=None) -> DeferredSearch:
         s = self.__search(query=query, gender=gender, sessionid=sessionid, sessionname=sessionname, brand=brand, kind=kind, pricerange=pricerange)
         s = s[:0]
         s.aggs.bucket("kinds", "terms", field="kind.keyword", size=2147483647)
-        results = s.execute()
-        if not results.aggs.kinds.buckets:
-            raise NoContentError()
-        else:
-            return [{"kind": hit.key, "amount": hit.doc_count} for hit in results.aggs.kinds.buckets]
 
+        def parse(results) -> List[dict]:
+            if not results.aggs.kinds.buckets:
+                raise NoContentError()
+            else:
+                return [{"kind": hit.key, "amount": hit.doc_count} for hit in results.aggs.kinds.buckets]
+
+        return DeferredSearch(s, parse)
+
+    @deferrable
     def select(self, query=None, gender=None, sessionid=None, sessionname=None, brand=None, kind=None,
-                   pricerange=None, page=1, pagesize=10) -> List[Product]:
+                   pricerange=None, page=1, pagesize=PAGESIZE, cursor=None, withcursor=False, projection="full") -> DeferredSearch:
         s = self.__search(query=query, gender=gender, sessionid=sessionid, sessionname=sessionname, brand=brand, kind=kind, pricerange=pricerange)
-        beginpage = (page - 1) * pagesize
-        endpage = page * pagesize
-        s = s[beginpage:endpage]
-        results = s.execute()
-        if not results:
-            raise NoContentError()
+        s = self.__project(s, projection)
+        if cursor is not None or withcursor:
+            s = s.sort({"_score": {"order": "desc"}}, {"_uid": {"order": "asc"}})
+        if cursor is not None:
+            s = s.extra(search_after=Cursor.decode(cursor))
+            s = s[:pagesize]
         else:
-            return results
+            beginpage = (page - 1) * pagesize
+            endpage = page * pagesize
+            s = s[beginpage:endpage]
+
+        def parse(results) -> List[Product]:
+            if not results:
+                raise NoContentError()
+            else:
+                return results
+
+        return DeferredSearch(s, parse)
 
+    @staticmethod
+    def next_cursor(products, pagesize=PAGESIZE, cursor=None, withcursor=False, **kwargs) -> Optional[str]:
+        """
+        Cursor of the page after products, a page returned by select with the same arguments. Only
+        cursor pages are sorted by the _uid tiebreaker, so page number requests get one only when
+        they set withcursor. A full page always gets one, which is why an exactly full last page is
+        followed by an empty (204) one.
+        """
+        if (cursor is None and not withcursor) or len(products) < pagesize:
+            return None
+        return Cursor.encode(products[-1].meta.sort)
+
+    @timed("get")
     def select_by_id(self, id_) -> Product:
-        s = Product.search(using=self.es)
-        s = s[:1]
-        s = s.filter("term", _id=id_)
-        results = s.execute()
-        if not results:
+        product = Product.get(id=id_, using=self.es, ignore=404, _source_exclude=["storename"])
+        if product is None:
             raise NotFoundError()
         else:
-            return results[0]
+            return product
 
-    def select_by_item_list(self, item_list) -> Tuple[List[Product], dict]:
-        item_id_list = [item["item_id"] for item in item_list]
-        s = Product.search(using=self.es)
-        s = s[:len(item_list)]
-        s = s.filter("terms", _id=item_id_list)
-        results = s.execute()
-        products_id = [product.meta["id"] for product in results]
+    def select_by_item_list(self, item_list, projection="full") -> Tuple[List[Product], dict]:
+        if not item_list:
+            raise ValidationError("item_list cannot be an empty list.")
+
+        if projection == "full":
+            source = {}
+        elif projection == "min":
+            source = {"_source_include": MIN_FIELDS}
+        else:
+            raise ValueError("Invalid projection '%s' for an id lookup" % projection)
+
+        item_id_list = list(dict.fromkeys(item["item_id"] for item in item_list))
+        with es_timer("ProductService.select_by_item_list", "mget"):
+            results = Product.mget(item_id_list, using=self.es, missing="skip", **source)
+        products = {product.meta["id"]: product for product in results}
         for p_id in item_id_list:
-            if p_id not in products_id:
+            if p_id not in products:
                 raise ValidationError("Product id '%s' not registered." % p_id)
 
-        total = {"outlet": 0.0, "retail": 0.0, "symbol": results[0].price.get_dict()["symbol"]}
-
+        outlet, retail = Decimal(0), Decimal(0)
         for item in item_list:
-            product = next(p for p in results if p.meta["id"] == item["item_id"])
+            price = products[item["item_id"]].price
             amount = item["amount"]
-            total["outlet"] += round(product.price.outlet * amount, 2)
-            total["retail"] += round(product.price.retail * amount, 2)
+            outlet += Decimal(str(price.outlet)) * amount
+            retail += Decimal(str(price.retail)) * amount
+
+        total = {
+            "outlet": float(outlet.quantize(CENTS, rounding=ROUND_HALF_UP)),
+            "retail": float(retail.quantize(CENTS, rounding=ROUND_HALF_UP)),
+            "symbol": results[0].price.get_dict()["symbol"]
+        }
 
         return results, total
@@ -27,17 +27,18 @@ def flask_app():
     return app
 
 
-@pytest.fixture(scope="session")
-def es_object():
-    es = ES()
-    yield es
-
-
 @pytest.fixture(scope="session", autouse=True)
-def setup_teardown(es_url, es_object):
+def setup_teardown(es_url):
     os.environ["ES_URL"] = es_url
     yield
-    Index("store", using=es_object.connection).delete()
+
+
+@pytest.fixture(scope="session")
+def es_object(setup_teardown):
+    es = ES()
+    es.init_index()
+    yield es
+    Index("store", using=es.connection).delete()
 
 
 @pytest.fixture(scope="session")
@@ -8,6 +8,7 @@ from backend.tests.factories import ProductFactory
 from backend.errors.no_content_error import NoContentError
 from backend.errors.not_found_error import NotFoundError
 from backend.errors.request_error import ValidationError
+from backend.util.cursor import Cursor
 
 
 @pytest.fixture(scope="session")
@@ -25,6 +26,17 @@ def test_product_service_products_count(service, es_object):
     assert result > 0
 
 
+def test_product_service_count_by_session(service, es_object):
+    session_id = str(uuid4())
+    other_id = str(uuid4())
+    prod_list = ProductFactory.create_batch(2, sessionid=session_id) + ProductFactory.create_batch(3, sessionid=other_id)
+    [prod_obj.save(using=es_object.connection) for prod_obj in prod_list]
+    Index("store", using=es_object.connection).refresh()
+
+    result = service.count_by_session([session_id, other_id, str(uuid4())])
+    assert result == {session_id: 2, other_id: 3}
+
+
 def test_product_service_super_discounts(service, es_object):
     prod_list = ProductFactory.create_batch(2)
     [prod_obj.save(using=es_object.connection) for prod_obj in prod_list]
@@ -136,6 +148,32 @@ def test_product_service_select_pricerange(service, es_object):
         service.select_pricerange(query=str(uuid4()))
 
 
+def test_product_service_select_facets(service, es_object):
+    test_id = str(uuid4())
+
+    ProductFactory.create(brand=test_id, price={"outlet": 10.0, "retail": 100.0}).save(using=es_object.connection)
+    ProductFactory.create(brand=test_id, price={"outlet": 20.0, "retail": 120.0}).save(using=es_object.connection)
+    Index("store", using=es_object.connection).refresh()
+
+    results = service.select_facets(brand=test_id)
+    assert results["total"] == service.get_total(brand=test_id)
+    assert results["brands"] == service.select_brands(brand=test_id)
+    assert results["kinds"] == service.select_kinds(brand=test_id)
+    assert results["pricerange"] == service.select_pricerange(brand=test_id)
+
+    results = service.select_facets(brand=test_id, pricerange={"min": 15.0, "max": 100.0})
+    assert results["total"] == 1
+    assert len(results["kinds"]) == 1
+    assert results["pricerange"]["min"] == 10.0
+    assert results["pricerange"]["max"] == 20.0
+
+    with pytest.raises(NoContentError):
+        service.select_facets(brand=test_id, pricerange={"min": 10000.0, "max": 20000.0})
+
+    with pytest.raises(NoContentError):
+        service.select_facets(brand=str(uuid4()))
+
+
 def test_product_service_get_total(service, es_object):
     ProductFactory.create().save(using=es_object.connection)
     Index("store", using=es_object.connection).refresh()
@@ -456,6 +494,44 @@ def test_product_service_select(service, es_object):
         service.select(query=str(uuid4()))
 
 
+def test_product_service_select_cursor(service, es_object):
+    test_id = str(uuid4())
+    for i in range(5):
+        ProductFactory.create(sessionid=test_id).save(using=es_object.connection)
+    Index("store", using=es_object.connection).refresh()
+
+    paged = [p.meta["id"] for page in (1, 2, 3) for p in service.select(sessionid=test_id, page=page, pagesize=2)]
+
+    results = service.select(sessionid=test_id, pagesize=2)
+    cursored = [p.meta["id"] for p in results]
+    while len(cursored) < 5:
+        results = service.select(sessionid=test_id, pagesize=2, cursor=Cursor.encode(results[-1].meta["sort"]))
+        cursored += [p.meta["id"] for p in results]
+
+    assert cursored == paged
+    assert len(set(cursored)) == 5
+
+    with pytest.raises(NoContentError):
+        service.select(sessionid=test_id, pagesize=2, cursor=Cursor.encode(results[-1].meta["sort"]))
+
+
+def test_product_service_select_projection(service, es_object):
+    test_id = str(uuid4())
+    obj = ProductFactory.create(sessionid=test_id, images=["first", "second"])
+    obj.save(using=es_object.connection)
+    Index("store", using=es_object.connection).refresh()
+
+    product = service.select(sessionid=test_id, projection="min")[0]
+    assert list(product.images) == ["first", "second"]
+    assert "about" not in product
+    assert product.get_dict_min() == obj.get_dict_min()
+
+    product = service.select(sessionid=test_id, projection="first_image")[0]
+    assert list(product.images) == ["first"]
+    assert "about" not in product
+    assert product.get_dict_min() == obj.get_dict_min()
+
+
 def test_product_service_select_by_id(service, es_object):
     obj = ProductFactory.create()
     obj.save(using=es_object.connection)
@@ -493,6 +569,11 @@ def test_product_service_select_by_item_list(service, es_object):
     assert total["outlet"] == 60.0
     assert total["retail"] == 120.0
 
+    results, total = service.select_by_item_list(item_list + item_list[:1])
+    assert len(results) == len(item_list)
+    assert total["outlet"] == 70.0
+    assert total["retail"] == 140.0
+
     fake_item_list = [{"item_id": str(uuid4()), "amount": 2} for x in range(2)]
     over_item_list = item_list + fake_item_list
 
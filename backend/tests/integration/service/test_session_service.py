@@ -15,16 +15,6 @@ def service():
     return service
 
 
-def test_count_products(service, es_object):
-    session_id = str(uuid4())
-    prod_list = ProductFactory.create_batch(2, sessionid=session_id)
-    [prod_obj.save(using=es_object.connection) for prod_obj in prod_list]
-    Index("store", using=es_object.connection).refresh()
-
-    result = service._SessionService__count_products(session_id)
-    assert result == 2
-
-
 def test_session_service_select(service, es_object):
     session_obj = SessionFactory.create()
     session_obj.save(using=es_object.connection)
@@ -1,16 +1,142 @@
+import json
 import pytest
 from elasticsearch.exceptions import ConnectionError
+from elasticsearch_dsl import Index
 
 from backend.dao.es import ES
+from backend.dao.batch import SearchBatch
+from backend.dao.ingest import Ingestion
+from backend.model import Product, Price, Catalog, Session
+from backend.service import ProductService, CatalogService
+from backend.tests.factories import ProductFactory, SessionFactory
 
 
 def test_es():
     ES().connection
 
 
+def test_es_init_index():
+    ES().init_index()
+    ES().init_index()
+
+
 def test_es_endpoint_connection_error(monkeypatch):
     with monkeypatch.context() as m:
         m.setenv("ES_URL", "https://notaserver.com")
 
         with pytest.raises(ConnectionError):
-            ES().connection
+            ES().init_index()
+
+
+def test_es_shared_connection():
+    assert ES().connection is ES().connection
+
+
+def test_es_connection_rebuilt_after_fork(monkeypatch):
+    parent_conn = ES().connection
+
+    with monkeypatch.context() as m:
+        m.setattr("os.getpid", lambda: -1)
+        child_conn = ES().connection
+
+    assert child_conn is not parent_conn
+
+
+def test_search_batch(es_object):
+    ProductFactory.create(gender="I_test_search_batch").save(using=es_object.connection)
+    Index("store", using=es_object.connection).refresh()
+
+    service = ProductService()
+    batch = SearchBatch()
+    batch.submit(service.get_total, gender="I_test_search_batch")
+    batch.submit(service.select_brands, gender="I_test_search_batch")
+    batch.submit(service.select_kinds, gender="I_test_search_batch")
+    total, brands, kinds = batch.join()
+
+    assert total == service.get_total(gender="I_test_search_batch")
+    assert brands == service.select_brands(gender="I_test_search_batch")
+    assert kinds == service.select_kinds(gender="I_test_search_batch")
+
+
+def test_es_backfill_discount(es_object):
+    obj = ProductFactory.create()
+    obj.save(using=es_object.connection, validate=False)
+    Index("store", using=es_object.connection).refresh()
+
+    assert es_object.backfill_discount() > 0
+
+    res = Product.get(using=es_object.connection, id=obj.meta["id"])
+    assert res.price.discount == Price.compute_discount(res.price.outlet, res.price.retail)
+
+
+def test_es_backfill_discount_integer_prices(es_object):
+    obj = ProductFactory.create(price={"outlet": 100, "retail": 150})
+    obj.save(using=es_object.connection, validate=False)
+    Index("store", using=es_object.connection).refresh()
+
+    es_object.backfill_discount()
+
+    res = Product.get(using=es_object.connection, id=obj.meta["id"])
+    assert res.price.discount == 33.33
+
+
+def test_es_bump_catalog_version(es_object):
+    version = es_object.bump_catalog_version()
+    assert version > 0
+    assert es_object.bump_catalog_version() == version + 1
+
+    res = Catalog.get(using=es_object.connection, id=Catalog.ID)
+    assert res.version == version + 1
+
+
+def test_es_ingest(es_object):
+    lines = []
+    for _ in range(3):
+        source = ProductFactory.build(gender="I_test_es_ingest").to_dict()
+        source["price"] = {"outlet": 10.0, "retail": 20.0}
+        lines.append(json.dumps(source))
+
+    result = Ingestion(es_object.connection, chunk_size=2, thread_count=2).run(lines)
+
+    assert (result["indexed"], result["failed"], result["invalid"]) == (3, 0, 0)
+    assert ProductService().get_total(gender="I_test_es_ingest") == 3
+
+
+def test_es_rebuild_index(es_object):
+    ProductFactory.create(gender="I_test_es_rebuild_index").save(using=es_object.connection)
+    Index("store", using=es_object.connection).refresh()
+    version = CatalogService().version()
+
+    name, previous = es_object.rebuild_index(delete_previous=True)
+
+    assert es_object.aliased_indices() == [name]
+    assert name not in previous
+    assert ProductService().get_total(gender="I_test_es_rebuild_index") == 1
+    res = Catalog.get(using=es_object.connection, id=Catalog.ID)
+    assert res.version == version + 1
+
+
+def test_es_rebuild_index_keeps_other_types(es_object):
+    session = SessionFactory.create(gender="I_test_es_rebuild_index_keeps_other_types")
+    session.save(using=es_object.connection)
+    Index("store", using=es_object.connection).refresh()
+    source = ProductFactory.build(gender="I_test_es_rebuild_index_keeps_other_types").to_dict()
+    source["price"] = {"outlet": 10.0, "retail": 20.0}
+
+    def load(index):
+        Ingestion(es_object.connection, index=index).run([json.dumps(source)])
+
+    es_object.rebuild_index(load, copy_types=["sessions"], delete_previous=True)
+
+    assert Session.get(using=es_object.connection, id=session.meta["id"]).gender == session.gender
+    assert ProductService().get_total(gender="I_test_es_rebuild_index_keeps_other_types") == 1
+
+
+def test_es_create_index(es_object):
+    name = es_object.create_index(bulk=True)
+
+    settings = es_object.connection.indices.get_settings(index=name)[name]["settings"]["index"]
+    assert settings["number_of_replicas"] == "0"
+    assert settings["refresh_interval"] == "-1"
+    assert es_object.connection.indices.get_mapping(index=name)[name]["mappings"].keys() >= {"products", "sessions", "catalog"}
+    es_object.connection.indices.delete(index=name)
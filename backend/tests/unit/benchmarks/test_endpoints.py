@@ -0,0 +1,32 @@
+import pytest
+
+from backend import create_app
+from backend.benchmarks.endpoints import run, requests
+from backend.benchmarks.fake_es import FakeConnection, SyntheticCatalog
+
+
+@pytest.fixture(scope="module")
+def restore_test_app():
+    yield
+    create_app(flask_env="test")
+
+
+def test_synthetic_catalog():
+    catalog = SyntheticCatalog(100000, sample=20)
+
+    assert len(catalog.products) == 20
+    assert len(catalog.brands) == 1000
+    assert catalog.product_by_id("product99999") == catalog.products[99999 % 20]
+    assert catalog.product_by_id("product100000") is None
+    assert catalog.product_by_id("session1") is None
+    assert sum(bucket["doc_count"] for bucket in catalog.buckets(catalog.kinds)) == 100000
+
+
+def test_run(restore_test_app):
+    results = run(sizes=(1000,), number=2, warmup=1)
+
+    assert [result["name"] for result in results] == [name for name, _, _, _ in requests(FakeConnection.catalog)]
+    for result in results:
+        assert result["size"] == 1000
+        assert result["throughput"] > 0
+        assert 0 < result["p50_ms"] <= result["p99_ms"]
@@ -55,32 +55,30 @@ def controller_mocker(mocker):
 
 
 def test_brand_controller(mocker, login_disabled_app, request_json, brands_response_json, kinds_response_json, pricerange_response_json):
-    with mocker.patch.object(ProductService, "get_total", return_value=10):
-        with mocker.patch.object(ProductService, "select_brands", return_value=brands_response_json):
-            with mocker.patch.object(ProductService, "select_kinds", return_value=kinds_response_json):
-                with mocker.patch.object(ProductService, "select_pricerange", return_value=pricerange_response_json):
-                    with login_disabled_app.test_client() as client:
-                        response = client.post(
-                            "api/brand/test"
-                        )
-
-                    data = json.loads(response.data)
-                    SearchResultsSchema().load(data)
-                    assert response.status_code == 200
-                    assert data["total"] == 10
-                    assert data["pricerange"] == pricerange_response_json
-
-                    with login_disabled_app.test_client() as client:
-                        response = client.post(
-                            "api/brand/test",
-                            json=request_json
-                        )
-
-                    data = json.loads(response.data)
-                    SearchResultsSchema().load(data)
-                    assert response.status_code == 200
-                    assert data["total"] == 10
-                    assert data["pricerange"] == pricerange_response_json
+    facets = {"total": 10, "brands": brands_response_json, "kinds": kinds_response_json, "pricerange": pricerange_response_json}
+    with mocker.patch.object(ProductService, "select_facets", return_value=facets):
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/brand/test"
+            )
+
+        data = json.loads(response.data)
+        SearchResultsSchema().load(data)
+        assert response.status_code == 200
+        assert data["total"] == 10
+        assert data["pricerange"] == pricerange_response_json
+
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/brand/test",
+                json=request_json
+            )
+
+        data = json.loads(response.data)
+        SearchResultsSchema().load(data)
+        assert response.status_code == 200
+        assert data["total"] == 10
+        assert data["pricerange"] == pricerange_response_json
 
 
 def test_brand_controller_invalid_json(mocker, login_disabled_app, request_json):
@@ -137,10 +135,10 @@ def test_brand_controller_invalid_json(mocker, login_disabled_app, request_json)
 @pytest.mark.parametrize(
     "method,http_method,test_url,error,status_code",
     [
-        ("get_total", "POST", "/api/brand/test", NoContentError(), 204),
-        ("get_total", "POST", "/api/brand/test", ElasticsearchException(), 504),
-        ("get_total", "POST", "/api/brand/test", ElasticsearchDslException(), 504),
-        ("get_total", "POST", "/api/brand/test", Exception(), 500)
+        ("select_facets", "POST", "/api/brand/test", NoContentError(), 204),
+        ("select_facets", "POST", "/api/brand/test", ElasticsearchException(), 504),
+        ("select_facets", "POST", "/api/brand/test", ElasticsearchDslException(), 504),
+        ("select_facets", "POST", "/api/brand/test", Exception(), 500)
     ]
 )
 def test_brand_controller_error(mocker, get_request_function, method, http_method, test_url, error, status_code):
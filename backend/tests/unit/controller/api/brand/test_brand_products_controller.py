@@ -9,6 +9,7 @@ from json.decoder import JSONDecodeError
 from backend.service import ProductService
 from backend.util.response.search_products_results import SearchProductsResultsSchema
 from backend.util.response.error import ErrorSchema
+from backend.util.cursor import Cursor
 from backend.errors.no_content_error import NoContentError
 
 
@@ -69,6 +70,45 @@ def test_brand_controller(mocker, login_disabled_app, request_json, product_resp
         assert len(data["products"]) == 1
 
 
+def test_brand_controller_next(mocker, login_disabled_app, request_json, product_response_json):
+    mock_product = MagicMock()
+    mock_product.get_dict_min.return_value = product_response_json
+    mock_product.meta.sort = [1.0, "product#id"]
+    with mocker.patch.object(ProductService, "select", return_value=[mock_product] * request_json["pagesize"]):
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/brand/test/1",
+                json={**request_json, "withcursor": True}
+            )
+
+        data = json.loads(response.data)
+        SearchProductsResultsSchema().load(data)
+        assert response.status_code == 200
+        assert data["next"] == Cursor.encode([1.0, "product#id"])
+
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/brand/test/1",
+                json={**request_json, "pagesize": request_json["pagesize"] + 1, "withcursor": True}
+            )
+
+        data = json.loads(response.data)
+        SearchProductsResultsSchema().load(data)
+        assert response.status_code == 200
+        assert "next" not in data
+
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/brand/test/1",
+                json=request_json
+            )
+
+        data = json.loads(response.data)
+        SearchProductsResultsSchema().load(data)
+        assert response.status_code == 200
+        assert "next" not in data
+
+
 def test_brand_controller_invalid_json(mocker, login_disabled_app, request_json):
     with login_disabled_app.test_client() as client:
         response = client.post(
@@ -1,3 +1,4 @@
+import gzip
 import pytest
 from flask import json
 from unittest.mock import MagicMock
@@ -6,10 +7,11 @@ from elasticsearch import ElasticsearchException
 from elasticsearch_dsl.exceptions import ElasticsearchDslException
 from json.decoder import JSONDecodeError
 
-from backend.service import ProductService, SessionService
+from backend.service import ProductService, SessionService, CatalogService
 from backend.util.response.gender_results import GenderResultsSchema
 from backend.util.response.error import ErrorSchema
 from backend.errors.no_content_error import NoContentError
+from backend.errors.gateway_timeout_error import GatewayTimeoutError
 
 
 @pytest.fixture(scope="module")
@@ -71,6 +73,8 @@ def kinds_response_json():
 def controller_mocker(mocker):
     mocker.patch.object(ProductService, "__init__", return_value=None)
     mocker.patch.object(SessionService, "__init__", return_value=None)
+    mocker.patch.object(CatalogService, "__init__", return_value=None)
+    mocker.patch.object(CatalogService, "version", return_value=1)
 
 
 def test_gender_controller(mocker, login_disabled_app, request_json, discount_response_json, sessions_response_json, brands_response_json, kinds_response_json):
@@ -102,6 +106,92 @@ def test_gender_controller(mocker, login_disabled_app, request_json, discount_re
                     assert len(data["discounts"]) == 1
 
 
+def test_gender_controller_not_modified(mocker, login_disabled_app, request_json, discount_response_json, sessions_response_json, brands_response_json, kinds_response_json):
+    mock_discount = MagicMock()
+    mock_discount.get_dict_min.return_value = discount_response_json
+    mocker.patch.object(ProductService, "super_discounts", return_value=[mock_discount])
+    mocker.patch.object(SessionService, "select", return_value=sessions_response_json)
+    mocker.patch.object(ProductService, "select_brands", return_value=brands_response_json)
+    mock_calls = mocker.patch.object(ProductService, "select_kinds", return_value=kinds_response_json)
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/gender/test",
+            json=request_json
+        )
+
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert mock_calls.call_count == 1
+
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/gender/test",
+            json=request_json,
+            headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.data == b""
+    assert mock_calls.call_count == 1
+
+    mocker.patch.object(CatalogService, "version", return_value=2)
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/gender/test",
+            json=request_json,
+            headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert mock_calls.call_count == 2
+
+
+def test_gender_controller_compressed(mocker, login_disabled_app, request_json, discount_response_json, sessions_response_json, brands_response_json, kinds_response_json):
+    mock_discount = MagicMock()
+    mock_discount.get_dict_min.return_value = discount_response_json
+    mocker.patch.object(ProductService, "super_discounts", return_value=[mock_discount] * 10)
+    mocker.patch.object(SessionService, "select", return_value=sessions_response_json)
+    mocker.patch.object(ProductService, "select_brands", return_value=brands_response_json)
+    mock_calls = mocker.patch.object(ProductService, "select_kinds", return_value=kinds_response_json)
+    mocker.patch.object(CatalogService, "version", return_value=10)
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/gender/test",
+            json=request_json,
+            headers={"Accept-Encoding": "gzip"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    data = json.loads(gzip.decompress(response.data))
+    GenderResultsSchema().load(data)
+    etag = response.headers["ETag"]
+
+    with login_disabled_app.test_client() as client:
+        cached = client.post(
+            "api/gender/test",
+            json=request_json,
+            headers={"Accept-Encoding": "gzip"}
+        )
+
+    assert cached.status_code == 200
+    assert cached.data == response.data
+    assert cached.headers["ETag"] == etag
+    assert mock_calls.call_count == 1
+
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/gender/test",
+            json=request_json,
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert mock_calls.call_count == 1
+
+
 def test_gender_controller_invalid_json(mocker, login_disabled_app, request_json):
     with login_disabled_app.test_client() as client:
         response = client.post(
@@ -133,6 +223,7 @@ def test_gender_controller_invalid_json(mocker, login_disabled_app, request_json
         ("super_discounts", "POST", "/api/gender/test", NoContentError(), 204),
         ("super_discounts", "POST", "/api/gender/test", ElasticsearchException(), 504),
         ("super_discounts", "POST", "/api/gender/test", ElasticsearchDslException(), 504),
+        ("super_discounts", "POST", "/api/gender/test", GatewayTimeoutError("timeout"), 504),
         ("super_discounts", "POST", "/api/gender/test", Exception(), 500)
     ]
 )
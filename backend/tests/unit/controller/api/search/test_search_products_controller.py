@@ -9,6 +9,7 @@ from json.decoder import JSONDecodeError
 from backend.service import ProductService
 from backend.util.response.search_products_results import SearchProductsResultsSchema
 from backend.util.response.error import ErrorSchema
+from backend.util.cursor import Cursor
 from backend.errors.no_content_error import NoContentError
 
 
@@ -46,6 +47,7 @@ def controller_mocker(mocker):
 def test_search_products_controller(mocker, login_disabled_app, request_json, product_response_json):
     mock_product = MagicMock()
     mock_product.get_dict_min.return_value = product_response_json
+    mock_product.meta.sort = [1.0, "product#id"]
     with mocker.patch.object(ProductService, "select", return_value=[mock_product]):
         with login_disabled_app.test_client() as client:
             response = client.post(
@@ -67,6 +69,65 @@ def test_search_products_controller(mocker, login_disabled_app, request_json, pr
         SearchProductsResultsSchema().load(data)
         assert response.status_code == 200
         assert len(data["products"]) == 1
+        assert "next" not in data
+
+
+def test_search_products_controller_next(mocker, login_disabled_app, request_json, product_response_json):
+    mock_product = MagicMock()
+    mock_product.get_dict_min.return_value = product_response_json
+    mock_product.meta.sort = [1.0, "product#id"]
+    with mocker.patch.object(ProductService, "select", return_value=[mock_product] * request_json["pagesize"]):
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/search/test/1",
+                json={**request_json, "withcursor": True}
+            )
+
+        data = json.loads(response.data)
+        SearchProductsResultsSchema().load(data)
+        assert response.status_code == 200
+        assert data["next"] == Cursor.encode([1.0, "product#id"])
+
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/search/test/1",
+                json={**request_json, "pagesize": request_json["pagesize"] + 1, "withcursor": True}
+            )
+
+        data = json.loads(response.data)
+        SearchProductsResultsSchema().load(data)
+        assert response.status_code == 200
+        assert "next" not in data
+
+        with login_disabled_app.test_client() as client:
+            response = client.post(
+                "api/search/test/1",
+                json=request_json
+            )
+
+        data = json.loads(response.data)
+        SearchProductsResultsSchema().load(data)
+        assert response.status_code == 200
+        assert "next" not in data
+
+
+def test_search_products_controller_cursor(mocker, login_disabled_app, request_json, product_response_json):
+    mock_product = MagicMock()
+    mock_product.get_dict_min.return_value = product_response_json
+    mock_product.meta.sort = [0.5, "product#last"]
+    mock_select = mocker.patch.object(ProductService, "select", return_value=[mock_product] * request_json["pagesize"])
+    cursor = Cursor.encode([1.0, "product#id"])
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/search/test/1",
+            json={**request_json, "cursor": cursor}
+        )
+
+    data = json.loads(response.data)
+    SearchProductsResultsSchema().load(data)
+    assert response.status_code == 200
+    assert data["next"] == Cursor.encode([0.5, "product#last"])
+    assert mock_select.call_args[1]["cursor"] == cursor
 
 
 def test_search_products_controller_invalid_json(mocker, login_disabled_app, request_json):
@@ -132,6 +193,19 @@ def test_search_products_controller_invalid_json(mocker, login_disabled_app, req
     ErrorSchema().load(data)
     assert response.status_code == 400
 
+    invalid_cursor = deepcopy(request_json)
+    invalid_cursor.update(cursor="notacursor")
+
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/search/test/1",
+            json=invalid_cursor
+        )
+
+    data = json.loads(response.data)
+    ErrorSchema().load(data)
+    assert response.status_code == 400
+
 
 @pytest.mark.parametrize(
     "method,http_method,test_url,error,status_code",
@@ -6,7 +6,7 @@ from elasticsearch import ElasticsearchException
 from elasticsearch_dsl.exceptions import ElasticsearchDslException
 from json.decoder import JSONDecodeError
 
-from backend.service import ProductService, SessionService
+from backend.service import ProductService, SessionService, CatalogService
 from backend.util.response.session_results import SessionResultsSchema
 from backend.util.response.error import ErrorSchema
 from backend.errors.no_content_error import NoContentError
@@ -68,37 +68,77 @@ def kinds_response_json():
 def controller_mocker(mocker):
     mocker.patch.object(ProductService, "__init__", return_value=None)
     mocker.patch.object(SessionService, "__init__", return_value=None)
+    mocker.patch.object(CatalogService, "__init__", return_value=None)
+    mocker.patch.object(CatalogService, "version", return_value=1)
 
 
 def test_session_controller(mocker, login_disabled_app, request_json, sessions_response_json, brands_response_json, kinds_response_json, pricerange_response_json):
     with mocker.patch.object(SessionService, "select_by_id", return_value=MagicMock(gender="test")):
         with mocker.patch.object(SessionService, "select", return_value=sessions_response_json):
-            with mocker.patch.object(ProductService, "get_total", return_value=10):
-                with mocker.patch.object(ProductService, "select_brands", return_value=brands_response_json):
-                    with mocker.patch.object(ProductService, "select_kinds", return_value=kinds_response_json):
-                        with mocker.patch.object(ProductService, "select_pricerange", return_value=pricerange_response_json):
-                            with login_disabled_app.test_client() as client:
-                                response = client.post(
-                                    "api/session/test"
-                                )
-
-                            data = json.loads(response.data)
-                            SessionResultsSchema().load(data)
-                            assert response.status_code == 200
-                            assert data["total"] == 10
-                            assert data["pricerange"] == pricerange_response_json
-
-                            with login_disabled_app.test_client() as client:
-                                response = client.post(
-                                    "api/session/test",
-                                    json=request_json
-                                )
-
-                            data = json.loads(response.data)
-                            SessionResultsSchema().load(data)
-                            assert response.status_code == 200
-                            assert data["total"] == 10
-                            assert data["pricerange"] == pricerange_response_json
+            facets = {"total": 10, "brands": brands_response_json, "kinds": kinds_response_json, "pricerange": pricerange_response_json}
+            with mocker.patch.object(ProductService, "select_facets", return_value=facets):
+                with login_disabled_app.test_client() as client:
+                    response = client.post(
+                        "api/session/test"
+                    )
+
+                data = json.loads(response.data)
+                SessionResultsSchema().load(data)
+                assert response.status_code == 200
+                assert data["total"] == 10
+                assert data["pricerange"] == pricerange_response_json
+
+                with login_disabled_app.test_client() as client:
+                    response = client.post(
+                        "api/session/test",
+                        json=request_json
+                    )
+
+                data = json.loads(response.data)
+                SessionResultsSchema().load(data)
+                assert response.status_code == 200
+                assert data["total"] == 10
+                assert data["pricerange"] == pricerange_response_json
+
+
+def test_session_controller_not_modified(mocker, login_disabled_app, request_json, sessions_response_json, brands_response_json, kinds_response_json, pricerange_response_json):
+    mocker.patch.object(SessionService, "select_by_id", return_value=MagicMock(gender="test"))
+    mocker.patch.object(SessionService, "select", return_value=sessions_response_json)
+    facets = {"total": 10, "brands": brands_response_json, "kinds": kinds_response_json, "pricerange": pricerange_response_json}
+    mock_calls = mocker.patch.object(ProductService, "select_facets", return_value=facets)
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/session/test",
+            json=request_json
+        )
+
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert mock_calls.call_count == 1
+
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/session/test",
+            json=request_json,
+            headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.data == b""
+    assert mock_calls.call_count == 1
+
+    mocker.patch.object(CatalogService, "version", return_value=2)
+    with login_disabled_app.test_client() as client:
+        response = client.post(
+            "api/session/test",
+            json=request_json,
+            headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert mock_calls.call_count == 2
 
 
 def test_session_controller_invalid_json(mocker, login_disabled_app, request_json):
@@ -0,0 +1,118 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from elasticsearch_dsl import Search, MultiSearch
+
+from backend.model import Product
+from backend.dao.batch import DeferredSearch, SearchBatch, deferrable
+from backend.errors.no_content_error import NoContentError
+from backend.errors.not_found_error import NotFoundError
+from backend.errors.gateway_timeout_error import GatewayTimeoutError
+
+
+class DummyService(object):
+    def __init__(self):
+        self.es = MagicMock()
+
+    @deferrable
+    def total(self, gender=None) -> DeferredSearch:
+        s = Product.search(using=self.es)
+        if gender is not None:
+            s = s.filter("term", gender=gender)
+
+        def parse(results) -> int:
+            if not results.hits.total:
+                raise NoContentError()
+            return results.hits.total
+
+        return DeferredSearch(s, parse)
+
+    def eager(self, value):
+        return value
+
+
+@pytest.fixture(scope="function")
+def service():
+    return DummyService()
+
+
+def test_deferrable_call(mocker, service):
+    mock_execute = MagicMock()
+    mock_execute.hits.total = 10
+    with mocker.patch.object(Search, "execute", return_value=mock_execute):
+        assert service.total() == 10
+
+
+def test_deferrable_defer(service):
+    deferred = service.total.defer(gender="gender")
+    assert type(deferred) is DeferredSearch
+    assert type(deferred.search) is Search
+    assert deferred.name == "DummyService.total"
+
+
+def test_search_batch_join(mocker, service):
+    responses = [MagicMock(), MagicMock()]
+    responses[0].hits.total = 10
+    responses[1].hits.total = 20
+    mock_msearch = mocker.patch.object(MultiSearch, "execute", return_value=responses)
+    mock_execute = mocker.patch.object(Search, "execute")
+    batch = SearchBatch()
+    batch.submit(service.total)
+    batch.submit(service.eager, "eager")
+    batch.submit(service.total, gender="gender")
+    assert batch.join() == [10, "eager", 20]
+    assert mock_msearch.call_count == 1
+    assert mock_execute.call_count == 0
+
+
+def test_search_batch_join_single_search(mocker, service):
+    response = MagicMock()
+    response.hits.total = 10
+    mock_msearch = mocker.patch.object(MultiSearch, "execute")
+    mocker.patch.object(Search, "execute", return_value=response)
+    batch = SearchBatch()
+    batch.submit(service.total)
+    assert batch.join() == [10]
+    assert mock_msearch.call_count == 0
+
+
+def test_search_batch_join_error_order(mocker, service):
+    responses = [MagicMock(), MagicMock()]
+    responses[0].hits.total = 0
+    responses[1].hits.total = 20
+    with mocker.patch.object(MultiSearch, "execute", return_value=responses):
+        batch = SearchBatch()
+        batch.submit(MagicMock(side_effect=NotFoundError()))
+        batch.submit(service.total)
+        batch.submit(service.total)
+        with pytest.raises(NotFoundError):
+            batch.join()
+
+    with mocker.patch.object(MultiSearch, "execute", return_value=responses):
+        batch = SearchBatch()
+        batch.submit(service.total)
+        batch.submit(MagicMock(side_effect=NotFoundError()))
+        batch.submit(service.total)
+        with pytest.raises(NoContentError):
+            batch.join()
+
+
+def test_search_batch_submit_eager(mocker, service):
+    response = MagicMock()
+    response.hits.total = 10
+    mocker.patch.object(Search, "execute", return_value=response)
+    mock_msearch = mocker.patch.object(MultiSearch, "execute")
+    batch = SearchBatch()
+    batch.submit_eager(service.total)
+    batch.submit(service.total, gender="gender")
+    assert batch.join() == [10, 10]
+    assert mock_msearch.call_count == 0
+
+
+def test_search_batch_join_timeout(mocker, service):
+    mocker.patch.object(MultiSearch, "execute", side_effect=lambda: time.sleep(0.2))
+    batch = SearchBatch(timeout=0.01)
+    batch.submit(service.total)
+    batch.submit(service.total, gender="gender")
+    with pytest.raises(GatewayTimeoutError):
+        batch.join()
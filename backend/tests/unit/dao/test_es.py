@@ -0,0 +1,122 @@
+import pytest
+from elasticsearch import ElasticsearchException
+
+from backend.dao.es import ES
+
+
+@pytest.fixture
+def client(mocker):
+    client = mocker.MagicMock()
+    mocker.patch.object(ES, "connection", new_callable=mocker.PropertyMock, return_value=client)
+    return client
+
+
+def aliased(client, *indices):
+    client.indices.exists_alias.return_value = bool(indices)
+    client.indices.exists.return_value = bool(indices)
+    client.indices.get_alias.return_value = {index: {"aliases": {"store": {}}} for index in indices}
+    client.indices.get_settings.side_effect = lambda index, name: {index: {"settings": {"index": {"number_of_replicas": "2"}}}}
+    client.get.return_value = {"_id": "catalog", "found": True, "_source": {"version": 4}}
+    client.cluster.health.return_value = {"status": "green", "timed_out": False}
+
+
+def test_publish_index(client):
+    aliased(client, "store-1", "store-2")
+
+    assert ES().publish_index("store-3") == ["store-1", "store-2"]
+
+    client.index.assert_called_once_with(index="store-3", doc_type="catalog", id="catalog", body={"version": 5})
+    client.indices.put_settings.assert_called_once_with(index="store-3", body={"index": {"number_of_replicas": "2", "refresh_interval": None}})
+    client.indices.update_aliases.assert_called_once_with(body={"actions": [
+        {"remove": {"index": "store-1", "alias": "store"}},
+        {"remove": {"index": "store-2", "alias": "store"}},
+        {"add": {"index": "store-3", "alias": "store"}}
+    ]})
+    client.indices.delete.assert_not_called()
+
+
+def test_publish_index_delete_previous(client):
+    aliased(client, "store-1")
+
+    ES().publish_index("store-2", delete_previous=True)
+
+    client.indices.delete.assert_called_once_with(index="store-1", ignore=404)
+
+
+def test_publish_first_index(client):
+    aliased(client)
+
+    assert ES().publish_index("store-1") == []
+
+    client.index.assert_called_once_with(index="store-1", doc_type="catalog", id="catalog", body={"version": 1})
+    client.indices.update_aliases.assert_called_once_with(body={"actions": [{"add": {"index": "store-1", "alias": "store"}}]})
+
+
+def test_publish_index_replaces_legacy_index(client):
+    aliased(client, "store")
+    client.indices.exists_alias.return_value = False
+
+    assert ES().publish_index("store-1") == ["store"]
+
+    client.indices.update_aliases.assert_called_once_with(body={"actions": [
+        {"remove_index": {"index": "store"}},
+        {"add": {"index": "store-1", "alias": "store"}}
+    ]})
+    client.indices.delete.assert_not_called()
+
+
+@pytest.mark.parametrize("health", [{"status": "red", "timed_out": False}, {"status": "yellow", "timed_out": True}])
+def test_publish_index_unhealthy(client, health):
+    aliased(client, "store-1")
+    client.cluster.health.return_value = health
+
+    with pytest.raises(ElasticsearchException):
+        ES().publish_index("store-2", delete_previous=True)
+
+    client.indices.update_aliases.assert_not_called()
+    client.indices.delete.assert_not_called()
+
+
+def test_rebuild_index(client, mocker):
+    mocker.patch.object(ES, "create_index", return_value="store-2")
+    publish = mocker.patch.object(ES, "publish_index", return_value=["store-1"])
+    load = mocker.MagicMock()
+
+    assert ES().rebuild_index(load, delete_previous=True) == ("store-2", ["store-1"])
+
+    load.assert_called_once_with("store-2")
+    publish.assert_called_once_with("store-2", delete_previous=True)
+
+
+def test_rebuild_index_copies_current_catalog(client, mocker):
+    mocker.patch.object(ES, "create_index", return_value="store-2")
+    mocker.patch.object(ES, "publish_index", return_value=["store-1"])
+    copy = mocker.patch("backend.dao.es.reindex")
+
+    ES().rebuild_index()
+
+    copy.assert_called_once_with(client, "store", "store-2")
+
+
+def test_rebuild_index_copies_other_types(client, mocker):
+    aliased(client, "store-1")
+    mocker.patch.object(ES, "create_index", return_value="store-2")
+    mocker.patch.object(ES, "publish_index", return_value=["store-1"])
+    copy = mocker.patch("backend.dao.es.reindex")
+    load = mocker.MagicMock(side_effect=lambda name: copy.assert_called_once())
+
+    ES().rebuild_index(load, copy_types=["sessions"])
+
+    copy.assert_called_once_with(client, "store", "store-2", query={"query": {"terms": {"_type": ["sessions"]}}})
+    load.assert_called_once_with("store-2")
+
+
+def test_rebuild_index_failed_load(client, mocker):
+    mocker.patch.object(ES, "create_index", return_value="store-2")
+    publish = mocker.patch.object(ES, "publish_index")
+
+    with pytest.raises(ValueError):
+        ES().rebuild_index(mocker.MagicMock(side_effect=ValueError()))
+
+    client.indices.delete.assert_called_once_with(index="store-2", ignore=404)
+    publish.assert_not_called()
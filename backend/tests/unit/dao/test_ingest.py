@@ -0,0 +1,67 @@
+import json
+import pytest
+
+from backend.dao.ingest import Ingestion
+from backend.tests.factories import ProductFactory, SessionFactory
+
+
+def product_line(**price):
+    source = ProductFactory.build().to_dict()
+    source["price"] = price
+    return json.dumps(source)
+
+
+def test_ingestion_invalid_doc_type():
+    with pytest.raises(ValueError):
+        Ingestion(None, doc_type="catalog")
+
+
+def test_ingestion_actions():
+    ingestion = Ingestion(None, index="store-test")
+    session = {"_type": "sessions", "_id": "s1", "_source": SessionFactory.build().to_dict()}
+    lines = [
+        product_line(outlet=50.0, retail=100.0),
+        "",
+        "not json",
+        product_line(outlet=50.0),
+        json.dumps(session),
+        json.dumps({"_type": "catalog", "_id": "catalog", "_source": {"version": 1}})
+    ]
+
+    actions = list(ingestion.actions(lines))
+
+    assert ingestion.invalid == 2
+    assert [(a["_index"], a["_type"], a.get("_id")) for a in actions] == [("store-test", "products", None), ("store-test", "sessions", "s1")]
+    assert actions[0]["_source"]["price"] == {"outlet": 50.0, "retail": 100.0, "discount": 50.0}
+
+
+def test_ingestion_sessions_doc_type():
+    actions = list(Ingestion(None, doc_type="sessions").actions([json.dumps(SessionFactory.build().to_dict())]))
+
+    assert actions[0]["_type"] == "sessions"
+
+
+def test_ingestion_run(mocker):
+    es = mocker.MagicMock()
+    es.indices.get_settings.return_value = {"store": {"settings": {"index": {"refresh_interval": "30s"}}}}
+    bulk = mocker.patch("backend.dao.ingest.parallel_bulk", return_value=iter([(True, {}), (False, {"index": {}}), (True, {})]))
+
+    result = Ingestion(es, chunk_size=100, thread_count=2).run([product_line(outlet=1.0, retail=2.0)])
+
+    assert bulk.call_args[1]["chunk_size"] == 100
+    assert bulk.call_args[1]["thread_count"] == 2
+    assert [call[1]["body"]["index"]["refresh_interval"] for call in es.indices.put_settings.call_args_list] == ["-1", "30s"]
+    es.indices.refresh.assert_called_once_with(index="store")
+    assert (result["indexed"], result["failed"], result["invalid"]) == (2, 1, 0)
+    assert result["docs_per_second"] > 0
+
+
+def test_ingestion_run_restores_refresh_on_error(mocker):
+    es = mocker.MagicMock()
+    es.indices.get_settings.return_value = {}
+    mocker.patch("backend.dao.ingest.parallel_bulk", side_effect=ConnectionError())
+
+    with pytest.raises(ConnectionError):
+        Ingestion(es).run([])
+
+    assert es.indices.put_settings.call_args[1]["body"] == {"index": {"refresh_interval": None}}
@@ -0,0 +1,191 @@
+import json
+import pytest
+from elasticsearch.exceptions import RequestError
+
+from backend import create_app
+from backend.model import Price
+from backend.dao.es import ES
+from backend.dao.local import LocalConnection
+from backend.dao.memory import MemoryEngine, analyze, contains_phrase
+from backend.service import ProductService, SessionService, CatalogService
+from backend.errors.not_found_error import NotFoundError
+from backend.errors.no_content_error import NoContentError
+from backend.tests.factories import ProductFactory, SessionFactory
+
+
+PRODUCTS = [
+    ("p1", "Blue Summer Dress", "London Rebel", "Dress", "Women", "s1", 50.0, 100.0),
+    ("p2", "Red Dress", "London Rebel", "Dress", "Women", "s1", 80.0, 100.0),
+    ("p3", "Leather Boots", "Dr Martens", "Boots", "Men", "s2", 120.0, 150.0),
+    ("p4", "Denim Jacket", "Levis", "Jacket", "Men", "s2", 60.0, 200.0),
+    ("p5", "Old Shirt", "Levis", "Shirt", "Men", "s2", 0.0, 0.0)
+]
+
+
+def snapshot_hits():
+    hits = [{"_type": "catalog", "_id": "catalog", "_source": {"version": 3}}]
+    for id_, name, gender in [("s1", "DRESSES", "Women"), ("s2", "MENSWEAR", "Men")]:
+        hits.append({"_type": "sessions", "_id": id_, "_source": SessionFactory.build(name=name, gender=gender).to_dict()})
+    for id_, name, brand, kind, gender, sessionid, outlet, retail in PRODUCTS:
+        source = ProductFactory.build(name=name, brand=brand, kind=kind, gender=gender, sessionid=sessionid,
+                                      price={"outlet": outlet, "retail": retail}).to_dict()
+        source["price"]["discount"] = Price.compute_discount(outlet, retail)
+        hits.append({"_type": "products", "_id": id_, "_source": source})
+    return hits
+
+
+@pytest.fixture(scope="module")
+def memory_engine():
+    app = create_app(flask_env="test")
+    app.config["ES_CONNECTION_CLASS"] = "backend.dao.memory.MemoryConnection"
+    ES.init_app(app)
+    engine = MemoryEngine(snapshot_hits())
+    MemoryEngine.set(engine)
+    yield engine
+    MemoryEngine.set(None)
+    create_app(flask_env="test")
+
+
+def test_analyze():
+    assert analyze("\"London Rebel\"") == ("london", "rebel")
+    assert analyze(["Blue", "Dress"]) == ("blue", "dress")
+    assert contains_phrase(("london", "rebel", "shoes"), ("rebel", "shoes")) is True
+    assert contains_phrase(("london", "rebel"), ("rebel", "london")) is False
+
+
+def test_local_connection_abstract():
+    with pytest.raises(TypeError):
+        LocalConnection()
+
+
+def test_load(tmpdir):
+    path = tmpdir.join("snapshot.jsonl")
+    path.write("\n".join(json.dumps(hit) for hit in snapshot_hits()))
+
+    engine = MemoryEngine.load(str(path))
+
+    assert engine.version == 3
+    assert len(engine.index("products")) == 5
+    assert len(engine.index("sessions")) == 2
+
+
+def test_init_app(mocker, tmpdir):
+    path = tmpdir.join("snapshot.jsonl")
+    path.write("\n".join(json.dumps(hit) for hit in snapshot_hits()))
+    load = mocker.spy(MemoryEngine, "load")
+    app = create_app(flask_env="test")
+
+    app.config["MEMORY_SNAPSHOT"] = str(path)
+    MemoryEngine.init_app(app)
+    assert load.call_count == 0
+    with pytest.raises(ValueError):
+        MemoryEngine.get()
+
+    app.config["ES_CONNECTION_CLASS"] = "backend.benchmarks.fake_es.FakeConnection"
+    MemoryEngine.init_app(app)
+    assert load.call_count == 0
+
+    app.config["ES_CONNECTION_CLASS"] = "backend.dao.memory.MemoryConnection"
+    MemoryEngine.init_app(app)
+    assert load.call_count == 1
+    assert MemoryEngine.get().version == 3
+    assert load.call_count == 1
+
+    app.config["MEMORY_SNAPSHOT"] = None
+    MemoryEngine.init_app(app)
+    with pytest.raises(ValueError):
+        MemoryEngine.get()
+
+
+def test_products_count(memory_engine):
+    assert ProductService().products_count() == 4
+
+
+def test_select_brands_kinds(memory_engine):
+    service = ProductService()
+
+    assert service.select_brands(gender="Men") == [{"brand": "Dr Martens", "amount": 1}, {"brand": "Levis", "amount": 1}]
+    assert service.select_kinds()[0] == {"kind": "Dress", "amount": 2}
+    assert service.select_kinds(pricerange={"min": 100.0, "max": 200.0}) == [{"kind": "Boots", "amount": 1}]
+
+    with pytest.raises(NoContentError):
+        service.select_brands(query="nothing")
+
+
+def test_select_pricerange(memory_engine):
+    assert ProductService().select_pricerange(gender="Women") == {"min": 50.0, "max": 80.0}
+
+
+def test_super_discounts(memory_engine):
+    service = ProductService()
+
+    assert [p.meta["id"] for p in service.super_discounts()] == ["p4", "p1", "p2", "p3"]
+
+    discounts = service.super_discounts(gender="Women", projection="first_image")
+    assert [p.meta["id"] for p in discounts] == ["p1", "p2"]
+    assert discounts[0].get_dict_min()["image"] == memory_engine.index("products").source(0)["images"][0]
+
+
+def test_select(memory_engine):
+    service = ProductService()
+
+    assert [p.meta["id"] for p in service.select(query="dress")] == ["p2", "p1"]
+    assert [p.meta["id"] for p in service.select(brand="Levis")] == ["p4"]
+    assert [p.meta["id"] for p in service.select(sessionid="s2", page=2, pagesize=1)] == ["p4"]
+
+
+def test_select_cursor(memory_engine):
+    from backend.util.cursor import Cursor
+    service = ProductService()
+
+    first = service.select(sessionid="s2", pagesize=1, withcursor=True)
+    second = service.select(sessionid="s2", pagesize=1, cursor=Cursor.encode(first[-1].meta.sort))
+
+    assert [p.meta["id"] for p in first] == ["p3"]
+    assert [p.meta["id"] for p in second] == ["p4"]
+
+
+def test_select_facets(memory_engine):
+    facets = ProductService().select_facets(brand="London Rebel", pricerange={"min": 60.0, "max": 100.0})
+
+    assert facets == {
+        "total": 1,
+        "brands": [{"brand": "London Rebel", "amount": 1}],
+        "kinds": [{"kind": "Dress", "amount": 1}],
+        "pricerange": {"min": 50.0, "max": 80.0}
+    }
+
+
+def test_select_by_id(memory_engine):
+    service = ProductService()
+
+    product = service.select_by_id("p3")
+    assert product.name == "Leather Boots"
+    assert "storename" not in product.to_dict()
+
+    with pytest.raises(NotFoundError):
+        service.select_by_id("missing")
+
+
+def test_select_by_item_list(memory_engine):
+    _, total = ProductService().select_by_item_list([{"item_id": "p1", "amount": 2}, {"item_id": "p3", "amount": 1}], projection="min")
+
+    assert total["outlet"] == 220.0
+    assert total["retail"] == 350.0
+
+
+def test_sessions(memory_engine):
+    service = SessionService()
+
+    sessions = service.select(gender="Men")
+    assert [(s["id"], s["total"]) for s in sessions] == [("s2", 3)]
+    assert service.select_by_id("s1").name == "DRESSES"
+
+
+def test_catalog_version(memory_engine):
+    assert CatalogService().version() == 3
+
+
+def test_unsupported_query(memory_engine):
+    with pytest.raises(RequestError):
+        ES().connection.search(index="store", doc_type="products", body={"query": {"fuzzy": {"name": "dres"}}})
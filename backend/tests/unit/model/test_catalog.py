@@ -0,0 +1,14 @@
+from backend.model import Catalog
+
+
+def test_catalog_get(es_object):
+    obj = Catalog(meta={"id": Catalog.ID}, version=1)
+    obj.save(using=es_object.connection)
+
+    res = Catalog.get(using=es_object.connection, id=Catalog.ID)
+
+    assert res is not None
+    assert type(res) is Catalog
+    assert res.version == 1
+    assert res.meta["index"] == "store"
+    assert res.meta["doc_type"] == "catalog"
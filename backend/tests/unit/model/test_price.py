@@ -0,0 +1,7 @@
+from backend.model import Price
+
+
+def test_price_compute_discount():
+    assert Price.compute_discount(25.0, 100.0) == 75.0
+    assert Price.compute_discount(10.0, 30.0) == 66.67
+    assert Price.compute_discount(10.0, 0.0) == 0.0
@@ -45,3 +45,21 @@ def test_product_dict_min(es_object):
         for pkey in ["outlet", "retail", "symbol"]:
             assert pkey in obj_dict_min["price"]
             assert len(obj_dict_min["price"].keys()) == 3
+
+
+def test_product_stored_discount(es_object):
+    obj = ProductFactory.create(price={"outlet": 25.0, "retail": 100.0})
+    obj.save(using=es_object.connection)
+
+    res = Product.get(using=es_object.connection, id=obj.meta["id"])
+
+    assert res.price.discount == 75.0
+    assert res.get_dict_min()["discount"] == 75.0
+
+
+def test_product_missing_discount():
+    obj = ProductFactory.build(price={"outlet": 25.0, "retail": 100.0})
+    obj.meta["id"] = "product_id"
+
+    assert obj.price.discount is None
+    assert obj.get_dict_min()["discount"] == 75.0
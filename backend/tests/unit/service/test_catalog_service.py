@@ -0,0 +1,69 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from backend.service import CatalogService
+from backend.model import Catalog
+from backend.util.cache import ServiceCache, MISSING
+
+
+@pytest.fixture(scope="function", autouse=True)
+def service_mocker(mocker, service_init_mock):
+    mocker.patch("backend.service.CatalogService.__init__", new=service_init_mock)
+
+
+@pytest.fixture(scope="function")
+def service():
+    service = CatalogService()
+    return service
+
+
+@pytest.fixture(scope="function")
+def service_cache(flask_app):
+    ServiceCache.init_app(SimpleNamespace(config={**flask_app.config, "CACHE_ENABLED": True}))
+    ServiceCache.clear()
+    yield ServiceCache
+    ServiceCache.init_app(flask_app)
+    ServiceCache.clear()
+
+
+def test_catalog_service_version(mocker, service):
+    mocker.patch.object(Catalog, "get", return_value=MagicMock(version=3))
+    assert service.version() == 3
+
+    mocker.patch.object(Catalog, "get", return_value=None)
+    assert service.version() == 0
+
+
+def test_catalog_service_version_cached(mocker, service, service_cache):
+    mock_get = mocker.patch.object(Catalog, "get", return_value=MagicMock(version=3))
+    assert service.version() == 3
+    assert service.version() == 3
+    assert mock_get.call_count == 1
+
+
+def test_catalog_service_version_change_clears_cache(mocker, service, service_cache, flask_app):
+    config = {**flask_app.config, "CACHE_ENABLED": True, "CACHE_TTL": {"CatalogService.version": 0.0}}
+    service_cache.init_app(SimpleNamespace(config=config))
+    mocker.patch.object(Catalog, "get", return_value=MagicMock(version=3))
+    service.version()
+    service_cache.set(("ProductService.select_kinds", ()), ["kind"])
+
+    assert service.version() == 3
+    assert service_cache.get(("ProductService.select_kinds", ())) == ["kind"]
+
+    mocker.patch.object(Catalog, "get", return_value=MagicMock(version=4))
+    assert service.version() == 4
+    assert service_cache.get(("ProductService.select_kinds", ())) is MISSING
+
+
+def test_catalog_service_etag(mocker, service):
+    mocker.patch.object(Catalog, "get", return_value=MagicMock(version=3))
+    etag = service.etag("POST", "/api/gender/Women", b'{"amount": 5}')
+    assert etag.startswith("v3-")
+    assert etag == service.etag("POST", "/api/gender/Women", b'{"amount": 5}')
+    assert etag != service.etag("POST", "/api/gender/Men", b'{"amount": 5}')
+    assert etag != service.etag("POST", "/api/gender/Women", b"")
+
+    mocker.patch.object(Catalog, "get", return_value=MagicMock(version=4))
+    assert etag != service.etag("POST", "/api/gender/Women", b'{"amount": 5}')
@@ -3,9 +3,11 @@ from unittest.mock import MagicMock
 from elasticsearch_dsl import Search
 
 from backend.service import ProductService
+from backend.model import Product
 from backend.errors.no_content_error import NoContentError
 from backend.errors.not_found_error import NotFoundError
 from backend.errors.request_error import ValidationError
+from backend.util.cursor import Cursor
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -27,6 +29,14 @@ def test_product_service_products_count(mocker, service):
         assert result == 15
 
 
+def test_product_service_count_by_session(mocker, service):
+    mock_execute = MagicMock()
+    mock_execute.aggs.sessions.buckets = [MagicMock(key="session_id", doc_count=10), MagicMock(key="other_id", doc_count=5)]
+    with mocker.patch.object(Search, "execute", return_value=mock_execute):
+        result = service.count_by_session(["session_id", "other_id"])
+        assert result == {"session_id": 10, "other_id": 5}
+
+
 def test_product_service_super_discounts(mocker, service):
     with mocker.patch.object(Search, "execute", return_value=[MagicMock(autospec=True) for i in range(3)]):
         results = service.super_discounts()
@@ -64,6 +74,30 @@ def test_product_service_select_pricerange(mocker, service):
             service.select_pricerange()
 
 
+def test_product_service_select_facets(mocker, service):
+    mock_execute = MagicMock()
+    mock_execute.aggs.pricerange.doc_count = 15
+    mock_execute.aggs.pricerange.minprice.value = 100
+    mock_execute.aggs.pricerange.maxprice.value = 200
+    mock_execute.aggs.facets.doc_count = 10
+    mock_execute.aggs.facets.brands.buckets = [MagicMock(key="A", doc_count=6), MagicMock(key="B", doc_count=4)]
+    mock_execute.aggs.facets.kinds.buckets = [MagicMock(key="C", doc_count=10)]
+    with mocker.patch.object(Search, "execute", return_value=mock_execute):
+        results = service.select_facets()
+        assert results["total"] == 10
+        assert len(results["brands"]) == 2
+        assert len(results["kinds"]) == 1
+        assert results["pricerange"] == {"min": 100, "max": 200}
+
+        results = service.select_facets(query="query", gender="gender", sessionid="sessionid", sessionname="sessionname", brand="brand", kind="kind", pricerange={"min": 1.0, "max": 100.0})
+        assert results["total"] == 10
+
+    mock_execute.aggs.facets.brands.buckets = []
+    with mocker.patch.object(Search, "execute", return_value=mock_execute):
+        with pytest.raises(NoContentError):
+            service.select_facets()
+
+
 def test_product_service_get_total(mocker, service):
     mock_execute = MagicMock()
     mock_execute.hits.total = 10
@@ -130,29 +164,104 @@ def test_product_service_select(mocker, service):
             service.select()
 
 
-def test_product_service_select_by_id(mocker, service):
-    with mocker.patch.object(Search, "execute", return_value=[MagicMock(autospec=True)]):
-        service.select_by_id("id")
+def test_product_service_select_cursor(mocker, service):
+    s = service.select.defer(pagesize=5).search.to_dict()
+    assert "sort" not in s
+    assert "search_after" not in s
 
-    with mocker.patch.object(Search, "execute", return_value=[]):
-        with pytest.raises(NotFoundError):
-            service.select_by_id("id")
+    s = service.select.defer(page=2, pagesize=5, withcursor=True).search.to_dict()
+    assert s["sort"] == [{"_score": {"order": "desc"}}, {"_uid": {"order": "asc"}}]
+    assert s["from"] == 5
+    assert "search_after" not in s
 
+    s = service.select.defer(page=3, pagesize=5, cursor=Cursor.encode([1.0, "product#id"])).search.to_dict()
+    assert s["search_after"] == [1.0, "product#id"]
+    assert s["from"] == 0
+    assert s["size"] == 5
 
-def test_product_service_select_by_item_list(mocker, service):
-    mock_execute = MagicMock()
-    mock_execute.meta = {"id": "id"}
-    mock_execute.price = MagicMock(outlet=10.0, retail=20.0)
-    mock_execute.price.get_dict.return_value = {"outlet": 10.0, "retail": 20.0, "symbol": "£"}
-    with mocker.patch.object(Search, "execute", return_value=[mock_execute for i in range(2)]):
-        results, total = service.select_by_item_list([{"item_id": "id", "amount": 2}, {"item_id": "id", "amount": 3}])
-        assert len(results) == 2
-        assert total["outlet"] == 50.0
-        assert total["retail"] == 100.0
+    with pytest.raises(ValidationError):
+        service.select.defer(cursor="notacursor")
 
-        results = service.select_by_item_list([])
-        assert len(results) == 2
 
-    with mocker.patch.object(Search, "execute", return_value=[mock_execute for i in range(2)]):
-        with pytest.raises(ValidationError):
-            service.select_by_item_list([{"item_id": "notid", "amount": 2}, {"item_id": "notid", "amount": 3}])
+def test_product_service_next_cursor():
+    product = MagicMock()
+    product.meta.sort = [1.0, "product#id"]
+    cursor = Cursor.encode([1.0, "product#id"])
+    assert ProductService.next_cursor([product] * 5, pagesize=5, withcursor=True) == cursor
+    assert ProductService.next_cursor([product] * 5, pagesize=5, cursor=cursor, pricerange={"min": 1.0}) == cursor
+    assert ProductService.next_cursor([product] * 4, pagesize=5, cursor=cursor) is None
+    assert ProductService.next_cursor([product] * 5, pagesize=5) is None
+    assert ProductService.next_cursor([product] * ProductService.PAGESIZE, withcursor=True) == cursor
+
+
+def test_product_service_projection(mocker, service):
+    s = service.select.defer().search.to_dict()
+    assert "_source" not in s
+    assert "script_fields" not in s
+
+    s = service.select.defer(projection="min").search.to_dict()
+    assert s["_source"] == ["name", "images", "price"]
+
+    s = service.super_discounts.defer(projection="first_image").search.to_dict()
+    assert s["_source"] == ["name", "price"]
+    assert "images" in s["script_fields"]
+
+    with pytest.raises(ValueError):
+        service.select.defer(projection="invalid")
+
+    mock_mget = mocker.patch.object(Product, "mget", return_value=[])
+    with pytest.raises(ValidationError):
+        service.select_by_item_list([{"item_id": "id", "amount": 1}], projection="min")
+    assert mock_mget.call_args[1]["_source_include"] == ["name", "images", "price"]
+
+    with pytest.raises(ValueError):
+        service.select_by_item_list([{"item_id": "id", "amount": 1}], projection="first_image")
+
+
+def test_product_service_select_by_id(mocker, service):
+    mock_get = mocker.patch.object(Product, "get", return_value=MagicMock(autospec=True))
+    service.select_by_id("id")
+    assert mock_get.call_args[1]["id"] == "id"
+    assert mock_get.call_args[1]["ignore"] == 404
+
+    mocker.patch.object(Product, "get", return_value=None)
+    with pytest.raises(NotFoundError):
+        service.select_by_id("id")
+
+
+def test_product_service_select_by_item_list(mocker, service):
+    mock_product = MagicMock()
+    mock_product.meta = {"id": "id"}
+    mock_product.price = MagicMock(outlet=10.0, retail=20.0)
+    mock_product.price.get_dict.return_value = {"outlet": 10.0, "retail": 20.0, "symbol": "£"}
+    mock_mget = mocker.patch.object(Product, "mget", return_value=[mock_product])
+    results, total = service.select_by_item_list([{"item_id": "id", "amount": 2}, {"item_id": "id", "amount": 3}])
+    assert len(results) == 1
+    assert total["outlet"] == 50.0
+    assert total["retail"] == 100.0
+    assert mock_mget.call_args[0][0] == ["id"]
+    assert mock_mget.call_args[1]["missing"] == "skip"
+
+    with pytest.raises(ValidationError):
+        service.select_by_item_list([])
+
+    with pytest.raises(ValidationError):
+        service.select_by_item_list([{"item_id": "id", "amount": 2}, {"item_id": "notid", "amount": 3}])
+
+
+def test_product_service_select_by_item_list_exact_total(mocker, service):
+    products = []
+    for i in range(1000):
+        mock_product = MagicMock()
+        mock_product.meta = {"id": "id%d" % i}
+        mock_product.price = MagicMock(outlet=0.1, retail=0.7)
+        mock_product.price.get_dict.return_value = {"outlet": 0.1, "retail": 0.7, "symbol": "£"}
+        products.append(mock_product)
+
+    item_list = [{"item_id": "id%d" % i, "amount": 3} for i in reversed(range(1000))]
+    mocker.patch.object(Product, "mget", return_value=products)
+    results, total = service.select_by_item_list(item_list)
+    assert len(results) == 1000
+    assert total["outlet"] == 300.0
+    assert total["retail"] == 2100.0
+    assert total["symbol"] == "£"
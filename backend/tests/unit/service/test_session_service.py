@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import MagicMock
 from elasticsearch_dsl.search import Search
 
-from backend.service import SessionService
+from backend.service import SessionService, ProductService
 from backend.model import Session, Product
 from backend.tests.factories import SessionFactory, ProductFactory
 from backend.errors.no_content_error import NoContentError
@@ -20,19 +20,12 @@ def service():
     return service
 
 
-def test_count_products(mocker, service):
-    mock_execute = MagicMock()
-    mock_execute.hits.total = 10
-    with mocker.patch.object(Search, "execute", return_value=mock_execute):
-        result = service._SessionService__count_products("session_id")
-        assert result == 10
-
-
 def test_sessions_select(mocker, service):
     mock_execute = MagicMock(autospec=True)
+    mock_execute.meta = {"id": "session_id"}
     mock_execute.get_dict.return_value = {"name": "Session"}
     with mocker.patch.object(Search, "execute", return_value=[mock_execute for i in range(3)]):
-        with mocker.patch.object(SessionService, "_SessionService__count_products", return_value=2):
+        with mocker.patch.object(ProductService, "count_by_session", return_value={"session_id": 2}):
             results = service.select()
             assert len(results) == 3
             assert results[0]["total"] == 2
@@ -50,7 +43,7 @@ def test_sessions_select(mocker, service):
             service.select()
 
 
-def test_sessions_select_by_id(mocker, service, es_object):
+def test_sessions_select_by_id(mocker, service):
     mock_execute = MagicMock()
     mock_execute.hits = [MagicMock(autospec=True)]
     with mocker.patch.object(Search, "execute", return_value=mock_execute):
@@ -0,0 +1,155 @@
+import pytest
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from elasticsearch_dsl import Search, MultiSearch
+
+from backend.model import Product, Catalog
+from backend.service import CatalogService
+from backend.dao.batch import DeferredSearch, SearchBatch, deferrable
+from backend.util.cache import TTLCache, ServiceCache, MISSING, normalize
+
+
+class DummyService(object):
+    def __init__(self):
+        self.es = MagicMock()
+
+    @deferrable
+    def total(self, gender=None, pricerange=None, page=1) -> DeferredSearch:
+        s = Product.search(using=self.es)
+        if gender is not None:
+            s = s.filter("term", gender=gender)
+
+        def parse(results) -> int:
+            return results.hits.total
+
+        return DeferredSearch(s, parse)
+
+
+def config(**kwargs):
+    values = {
+        "CACHE_ENABLED": True,
+        "CACHE_MAXSIZE": 16,
+        "CACHE_DEFAULT_TTL": 60.0,
+        "CACHE_TTL": {"DummyService.total": 0.05}
+    }
+    values.update(kwargs)
+    return SimpleNamespace(config=values)
+
+
+@pytest.fixture(scope="function")
+def catalog_get(mocker):
+    return mocker.patch.object(Catalog, "get", return_value=MagicMock(version=1))
+
+
+@pytest.fixture(scope="function")
+def service_cache(catalog_get):
+    ServiceCache.init_app(config())
+    CatalogService().version()
+    ServiceCache.clear()
+    yield ServiceCache
+    ServiceCache.init_app(config(CACHE_ENABLED=False))
+    ServiceCache.clear()
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    assert cache.get("a") == 1
+    cache.set("c", 3, 60)
+    assert len(cache) == 2
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expiry():
+    cache = TTLCache()
+    cache.set("a", 1, 0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+
+def test_ttl_cache_counters():
+    cache = TTLCache()
+    cache.set("a", None, 60)
+    assert cache.get("a") is None
+    assert cache.get("b") is MISSING
+    assert cache.hits == 1
+    assert cache.misses == 1
+    cache.clear()
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_normalize():
+    assert normalize({"b": [1, 2], "a": {"max": 10, "min": 0}}) == normalize({"a": {"min": 0, "max": 10}, "b": (1, 2)})
+    assert normalize({"x", "y"}) == ("x", "y")
+    assert hash(normalize({"pricerange": {"min": 0, "max": 10}}))
+
+
+def test_service_cache_disabled():
+    ServiceCache.set(("DummyService.total", ()), 10)
+    assert ServiceCache.get(("DummyService.total", ())) is MISSING
+
+
+def test_deferrable_key(service_cache):
+    service = DummyService()
+    assert service.total.defer("gender").key == service.total.defer(gender="gender", page=1).key
+    assert service.total.defer(page=1).key != service.total.defer(page=2).key
+    assert service.total.defer(pricerange={"min": 0, "max": 10}).key == \
+        service.total.defer(pricerange={"max": 10, "min": 0}).key
+
+
+def test_deferrable_call_cached(mocker, service_cache):
+    service = DummyService()
+    mock_execute = MagicMock()
+    mock_execute.hits.total = 10
+    mock_search = mocker.patch.object(Search, "execute", return_value=mock_execute)
+    assert service.total(gender="gender") == 10
+    assert service.total(gender="gender") == 10
+    assert service.total(gender="other") == 10
+    assert mock_search.call_count == 2
+    # The catalog version lookups go through the same cache: 1 miss, then 2 hits
+    assert service_cache.stats()["hits"] == 1 + 2
+    assert service_cache.stats()["misses"] == 2 + 1
+
+    time.sleep(0.06)
+    assert service.total(gender="gender") == 10
+    assert mock_search.call_count == 3
+
+
+def test_search_batch_join_cached(mocker, service_cache):
+    service = DummyService()
+    cached = MagicMock()
+    cached.hits.total = 10
+    mocker.patch.object(Search, "execute", return_value=cached)
+    service.total()
+
+    response = MagicMock()
+    response.hits.total = 20
+    mock_msearch = mocker.patch.object(MultiSearch, "execute")
+    mock_execute = mocker.patch.object(Search, "execute", return_value=response)
+    batch = SearchBatch()
+    batch.submit(service.total)
+    batch.submit(service.total, gender="gender")
+    assert batch.join() == [10, 20]
+    assert mock_execute.call_count == 1
+    assert mock_msearch.call_count == 0
+
+
+def test_deferred_search_cached_catalog_version(mocker, service_cache, catalog_get):
+    service_cache.init_app(config(CACHE_TTL={"CatalogService.version": 0.0}))
+    service = DummyService()
+    mock_execute = MagicMock()
+    mock_execute.hits.total = 10
+    mock_search = mocker.patch.object(Search, "execute", return_value=mock_execute)
+    assert service.total() == 10
+    assert service.total() == 10
+    assert mock_search.call_count == 1
+
+    catalog_get.return_value = MagicMock(version=2)
+    assert service.total() == 10
+    assert mock_search.call_count == 2
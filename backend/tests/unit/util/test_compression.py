@@ -0,0 +1,84 @@
+import gzip
+import pytest
+from flask import json
+
+from backend import create_app
+from backend.util.compression import Compression
+
+
+@pytest.fixture(scope="module")
+def compression_app():
+    app = create_app(flask_env="test")
+    calls = []
+
+    @app.route("/large")
+    def large():
+        calls.append(1)
+        response = app.response_class(json.dumps({"brands": ["brand%d" % i for i in range(200)]}), mimetype="application/json")
+        response.set_etag("v1-large")
+        return response
+
+    @app.route("/small")
+    def small():
+        return app.response_class(json.dumps({"brands": []}), mimetype="application/json")
+
+    @app.route("/text")
+    def text():
+        return "text " * 500
+
+    app.calls = calls
+    return app
+
+
+def test_compression_gzip(compression_app):
+    with compression_app.test_client() as client:
+        response = client.get("/large", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.get_etag() == ("v1-large-gzip", False)
+    assert json.loads(gzip.decompress(response.data))["brands"][199] == "brand199"
+    assert int(response.headers["Content-Length"]) == len(response.data)
+
+
+def test_compression_identity(compression_app):
+    with compression_app.test_client() as client:
+        response = client.get("/large")
+        assert "Content-Encoding" not in response.headers
+        assert response.get_etag() == ("v1-large", False)
+        assert "Accept-Encoding" in response.headers["Vary"]
+
+        response = client.get("/large", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "Content-Encoding" not in response.headers
+
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+        response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+
+def test_compression_cache(mocker, compression_app):
+    mock_compress = mocker.patch.object(Compression, "compress", wraps=Compression.compress)
+    Compression.get_cache().clear()
+    with compression_app.test_client() as client:
+        first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert first.data == second.data
+    assert mock_compress.call_count == 1
+
+    with compression_app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = Compression.cached_response("v1-large")
+        assert response.data == first.data
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.get_etag() == ("v1-large-gzip", False)
+
+    with compression_app.test_request_context():
+        assert Compression.cached_response("v1-large") is None
+
+
+def test_compression_etags():
+    assert Compression.etags("v1-tag")[0] == "v1-tag"
+    assert "v1-tag-gzip" in Compression.etags("v1-tag")
@@ -0,0 +1,25 @@
+import pytest
+
+from backend.util.cursor import Cursor
+from backend.errors.request_error import ValidationError
+
+
+def test_cursor_round_trip():
+    sort_values = [1.2345, "product#AWx-_id"]
+    cursor = Cursor.encode(sort_values)
+    assert type(cursor) is str
+    assert Cursor.decode(cursor) == sort_values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "notacursor",
+        Cursor.encode([]),
+        "eyJub3QiOiJhIGxpc3QifQ==",
+        "////"
+    ]
+)
+def test_cursor_decode_invalid(cursor):
+    with pytest.raises(ValidationError):
+        Cursor.decode(cursor)
@@ -0,0 +1,78 @@
+import pytest
+import time
+import threading
+
+from backend.util.fanout import FanOut
+from backend.errors.gateway_timeout_error import GatewayTimeoutError
+from backend.errors.no_content_error import NoContentError
+
+
+def test_fanout_join_positional():
+    def slow(value, delay=0.0):
+        time.sleep(delay)
+        return value
+
+    fanout = FanOut()
+    fanout.submit(slow, 1, delay=0.05)
+    fanout.submit(slow, 2)
+    fanout.submit(slow, 3, delay=0.01)
+    assert fanout.join() == [1, 2, 3]
+
+
+def test_fanout_join_concurrent():
+    fanout = FanOut()
+    for i in range(4):
+        fanout.submit(time.sleep, 0.1)
+
+    start = time.monotonic()
+    fanout.join()
+    assert time.monotonic() - start < 0.3
+
+
+def test_fanout_join_error_unchanged():
+    error = NoContentError()
+
+    def fail():
+        raise error
+
+    fanout = FanOut()
+    fanout.submit(lambda: 1)
+    fanout.submit(fail)
+    fanout.submit(lambda: 1 / 0)
+    with pytest.raises(NoContentError) as excinfo:
+        fanout.join()
+
+    assert excinfo.value is error
+
+
+def test_fanout_join_timeout():
+    fanout = FanOut(timeout=0.01)
+    fanout.submit(time.sleep, 0.2)
+    with pytest.raises(GatewayTimeoutError):
+        fanout.join()
+
+
+def test_fanout_executor_rebuilt_after_fork(monkeypatch):
+    executor = FanOut.get_executor()
+    assert FanOut.get_executor() is executor
+
+    with monkeypatch.context() as m:
+        m.setattr("os.getpid", lambda: -1)
+        assert FanOut.get_executor() is not executor
+
+
+def test_fanout_run_inline(flask_app):
+    with flask_app.test_request_context():
+        assert FanOut.inline() is False
+        FanOut.run_inline()
+
+        fanout = FanOut()
+        fanout.submit(threading.get_ident)
+        fanout.submit(threading.get_ident)
+        assert fanout.join() == [threading.get_ident()] * 2
+
+        fanout.submit(lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            fanout.join()
+
+    assert FanOut.inline() is False
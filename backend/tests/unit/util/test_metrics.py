@@ -0,0 +1,93 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from backend import create_app
+from backend.service import ProductService
+from backend.util.metrics import es_timer, timed
+from backend.util.cache import TTLCache
+from backend.dao.es import ES
+
+
+@pytest.fixture(scope="module")
+def login_disabled_app():
+    app = create_app(flask_env="test")
+    app.config["LOGIN_DISABLED"] = True
+    return app
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_requests(mocker, login_disabled_app):
+    mocker.patch.object(ProductService, "__init__", return_value=None)
+    mocker.patch.object(ProductService, "products_count", return_value=10)
+    labels = {"namespace": "Start", "route": "/api/start", "method": "GET"}
+    requests = sample("willstores_http_requests_total", status="200", **labels)
+    latency = sample("willstores_http_request_duration_seconds_count", **labels)
+    with login_disabled_app.test_client() as client:
+        client.get("api/start")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert b"willstores_http_requests_total" in response.data
+    assert sample("willstores_http_requests_total", status="200", **labels) == requests + 1
+    assert sample("willstores_http_request_duration_seconds_count", **labels) == latency + 1
+
+
+def test_metrics_auth(monkeypatch):
+    monkeypatch.setenv("ACCESS_TOKEN", "token")
+    app = create_app(flask_env="test")
+    with app.test_client() as client:
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer token"}).status_code == 200
+
+
+def test_metrics_unmatched(login_disabled_app):
+    labels = {"namespace": "none", "route": "unmatched", "method": "GET", "status": "404"}
+    before = sample("willstores_http_requests_total", **labels)
+    with login_disabled_app.test_client() as client:
+        client.get("/notfound")
+
+    assert sample("willstores_http_requests_total", **labels) == before + 1
+
+
+def test_metrics_es_timer():
+    labels = {"method": "Dummy.method", "request": "search"}
+    before = sample("willstores_es_query_duration_seconds_count", **labels)
+    with es_timer("Dummy.method"):
+        pass
+
+    assert sample("willstores_es_query_duration_seconds_count", **labels) == before + 1
+
+
+def test_metrics_timed():
+    class Dummy(object):
+        @timed("get")
+        def select(self):
+            return "result"
+
+    labels = {"method": "test_metrics_timed.<locals>.Dummy.select", "request": "get"}
+    before = sample("willstores_es_query_duration_seconds_count", **labels)
+    assert Dummy().select() == "result"
+    assert sample("willstores_es_query_duration_seconds_count", **labels) == before + 1
+
+
+def test_metrics_cache():
+    hits = sample("willstores_cache_requests_total", cache="test", result="hit")
+    misses = sample("willstores_cache_requests_total", cache="test", result="miss")
+    cache = TTLCache(name="test")
+    cache.set("key", "value", 60)
+    cache.get("key")
+    cache.get("other")
+    assert sample("willstores_cache_requests_total", cache="test", result="hit") == hits + 1
+    assert sample("willstores_cache_requests_total", cache="test", result="miss") == misses + 1
+
+
+def test_metrics_pool_stats():
+    ES().connection
+    stats = ES.pool_stats()
+    assert stats["maxsize"] > 0
+    assert 0 <= stats["in_use"] <= stats["maxsize"]
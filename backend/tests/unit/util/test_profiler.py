@@ -0,0 +1,73 @@
+import os
+import pstats
+import tempfile
+import pytest
+from cProfile import Profile
+from unittest.mock import MagicMock
+
+from backend import create_app
+from backend.service import ProductService
+from backend.util.profiler import Profiler
+
+
+@pytest.fixture(scope="module")
+def profiler_app():
+    app = create_app(flask_env="test")
+    app.config["LOGIN_DISABLED"] = True
+    return app
+
+
+@pytest.fixture(scope="function", autouse=True)
+def controller_mocker(mocker):
+    mocker.patch.object(ProductService, "__init__", return_value=None)
+    mocker.patch.object(ProductService, "products_count", return_value=10)
+
+
+def test_profiler(profiler_app, jwt_test_token):
+    with profiler_app.test_client() as client:
+        response = client.get(
+            "api/start",
+            headers={"Authorization": "Bearer %s" % jwt_test_token, "X-Profile": "1"}
+        )
+
+    assert response.status_code == 200
+    summary = dict(item.split("=") for item in response.headers["X-Profile-Summary"].split("; "))
+    for key in ["total", "elasticsearch", "marshmallow", "serializer", "get_dict"]:
+        assert summary[key].endswith("ms")
+
+    directory = profiler_app.config["PROFILER_DIR"] or os.path.join(tempfile.gettempdir(), "willstores-profiles")
+    path = os.path.join(directory, "%s.prof" % response.headers["X-Profile-Id"])
+    assert os.path.isfile(path)
+    pstats.Stats(path)
+    os.remove(path)
+
+
+def test_profiler_not_requested(profiler_app, jwt_test_token):
+    with profiler_app.test_client() as client:
+        response = client.get(
+            "api/start",
+            headers={"Authorization": "Bearer %s" % jwt_test_token}
+        )
+        assert "X-Profile-Summary" not in response.headers
+
+        response = client.get(
+            "api/start",
+            headers={"Authorization": "Bearer invalid", "X-Profile": "1"}
+        )
+        assert "X-Profile-Summary" not in response.headers
+
+        response = client.get(
+            "api/start",
+            headers={"X-Profile": "1"}
+        )
+        assert "X-Profile-Summary" not in response.headers
+
+
+def test_profiler_summarize():
+    profile = Profile()
+    profile.enable()
+    MagicMock()()
+    profile.disable()
+    summary = Profiler.summarize(pstats.Stats(profile))
+    assert summary["total"] > 0
+    assert summary["elasticsearch"] == 0
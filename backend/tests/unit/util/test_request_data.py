@@ -0,0 +1,59 @@
+import pytest
+from flask import json
+
+from backend.util.request.request_data import RequestData
+from backend.util.request.search_products_request import SearchProductsRequest
+from backend.util.request.product_list_request import ProductListRequest
+from backend.util.cache import normalize
+
+
+def test_request_data():
+    data = RequestData({"pagesize": 5, "pricerange": {"min": 1.0, "max": 2.0}, "tags": ["a", "b"]})
+    assert data == {"pagesize": 5, "pricerange": {"min": 1.0, "max": 2.0}, "tags": ("a", "b")}
+    assert data.pagesize == 5
+    assert data["pricerange"]["min"] == 1.0
+    assert type(data.pricerange) is RequestData
+    assert dict(**data)["pagesize"] == 5
+
+    with pytest.raises(AttributeError):
+        data.cursor
+
+    with pytest.raises(AttributeError):
+        data.pagesize = 10
+
+    with pytest.raises(TypeError):
+        data["pagesize"] = 10
+
+
+def test_request_data_hashable():
+    first = RequestData({"pagesize": 5, "pricerange": {"min": 1.0, "max": 2.0}})
+    second = RequestData({"pricerange": {"max": 2.0, "min": 1.0}, "pagesize": 5})
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second}) == 1
+    assert normalize(first) == normalize({"pagesize": 5, "pricerange": {"min": 1.0, "max": 2.0}})
+
+
+def test_request_data_shallow():
+    lines = [{"item_id": "id", "amount": 2}]
+    data = RequestData({"item_list": lines}, deep=False)
+    assert data.item_list == tuple(lines)
+    assert type(data.item_list[0]) is dict
+    assert hash(data) == hash(RequestData({"item_list": lines}))
+
+
+def test_request_parse_json(flask_app):
+    payload = {"pagesize": 5, "pricerange": {"min": 1.0, "max": 2.0}}
+    with flask_app.test_request_context(data=json.dumps(payload), content_type="application/json"):
+        in_data = SearchProductsRequest.parse_json()
+        assert type(in_data) is RequestData
+        assert in_data == payload
+
+    with flask_app.test_request_context():
+        assert SearchProductsRequest.parse_json() == {}
+
+    payload = {"item_list": [{"item_id": "id", "amount": 2}]}
+    with flask_app.test_request_context(data=json.dumps(payload), content_type="application/json"):
+        in_data = ProductListRequest.parse_json()
+        assert in_data.item_list == ({"item_id": "id", "amount": 2},)
+        hash(in_data)
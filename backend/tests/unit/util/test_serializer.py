@@ -0,0 +1,82 @@
+import pytest
+from flask import json
+from types import SimpleNamespace
+from marshmallow import ValidationError as MarshmallowError
+
+from backend.util.response.serializer import Serializer
+from backend.util.response.search_products_results import SearchProductsResultsSchema
+from backend.util.response.product_results import ProductResultsSchema
+
+
+@pytest.fixture(scope="function")
+def strict(flask_app):
+    Serializer.init_app(SimpleNamespace(config={"RESPONSE_STRICT": True}))
+    yield
+    Serializer.init_app(flask_app)
+
+
+@pytest.fixture(scope="module")
+def product_json():
+    return {
+        "id": "id",
+        "name": "name",
+        "image": "image",
+        "price": {"outlet": 10, "retail": 20.9, "symbol": "£"},
+        "discount": 52.15
+    }
+
+
+def test_serializer_dump(product_json):
+    serializer = Serializer(SearchProductsResultsSchema)
+    data = {"products": [product_json] * 3, "next": "cursor"}
+    payload = serializer.dump(data)
+    assert payload == SearchProductsResultsSchema().load(data)
+    assert type(payload["products"][0]["price"]["outlet"]) is float
+    assert type(payload["products"][0]["discount"]) is int
+
+
+def test_serializer_dump_exclude():
+    serializer = Serializer(ProductResultsSchema)
+    data = {
+        "id": "id",
+        "name": "name",
+        "kind": "kind",
+        "brand": "brand",
+        "details": ["detail"],
+        "care": "care",
+        "about": "about",
+        "images": ["image"],
+        "gender": "gender",
+        "price": {"outlet": 10.0, "retail": 20.0, "symbol": "£"},
+        "link": "link"
+    }
+    payload = serializer.dump(data)
+    assert payload == ProductResultsSchema().load(data)
+    assert "link" not in payload
+
+
+def test_serializer_dumps(product_json):
+    serializer = Serializer(SearchProductsResultsSchema)
+    data = {"products": [product_json]}
+    assert json.loads(serializer.dumps(data)) == SearchProductsResultsSchema().load(data)
+
+
+def test_serializer_strict(strict, product_json):
+    serializer = Serializer(SearchProductsResultsSchema)
+    serializer.dump({"products": [product_json]})
+
+    with pytest.raises(MarshmallowError):
+        serializer.dump({"products": [{**product_json, "unknown": "field"}]})
+
+    with pytest.raises(MarshmallowError):
+        serializer.dump({"next": "cursor"})
+
+
+def test_serializer_response(flask_app, product_json):
+    serializer = Serializer(SearchProductsResultsSchema)
+    with flask_app.app_context():
+        response = serializer.response({"products": [product_json]})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert json.loads(response.data)["products"][0]["id"] == "id"
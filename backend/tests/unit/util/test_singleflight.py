@@ -0,0 +1,101 @@
+import time
+from threading import Thread, Barrier
+from unittest.mock import MagicMock
+from elasticsearch_dsl import Search
+
+from backend.model import Product
+from backend.dao.batch import DeferredSearch, deferrable
+from backend.util.singleflight import SingleFlight
+from backend.errors.no_content_error import NoContentError
+
+
+class DummyService(object):
+    def __init__(self):
+        self.es = MagicMock()
+
+    @deferrable
+    def total(self, gender=None) -> DeferredSearch:
+        s = Product.search(using=self.es)
+
+        def parse(results) -> int:
+            return results.hits.total
+
+        return DeferredSearch(s, parse)
+
+
+def run_concurrently(func, amount=8):
+    barrier = Barrier(amount)
+    outcomes = [None] * amount
+
+    def target(i):
+        barrier.wait()
+        try:
+            outcomes[i] = (func(), None)
+        except Exception as error:
+            outcomes[i] = (None, error)
+
+    threads = [Thread(target=target, args=(i,)) for i in range(amount)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_single_flight_shared_result():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "result"
+
+    outcomes = run_concurrently(lambda: SingleFlight.do(("key",), slow))
+    assert outcomes == [("result", None)] * 8
+    assert len(calls) == 1
+    assert SingleFlight.in_flight() == 0
+
+
+def test_single_flight_shared_error():
+    error = NoContentError()
+
+    def fail():
+        time.sleep(0.1)
+        raise error
+
+    outcomes = run_concurrently(lambda: SingleFlight.do(("key",), fail))
+    assert all(outcome == (None, error) for outcome in outcomes)
+    assert SingleFlight.in_flight() == 0
+
+
+def test_single_flight_sequential_calls():
+    calls = []
+    SingleFlight.do(("key",), lambda: calls.append(1))
+    SingleFlight.do(("key",), lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_single_flight_no_key():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+
+    run_concurrently(lambda: SingleFlight.do(None, slow), amount=4)
+    assert len(calls) == 4
+
+
+def test_deferrable_call_coalesced(mocker):
+    service = DummyService()
+    mock_execute = MagicMock()
+    mock_execute.hits.total = 10
+
+    def slow_execute(*args, **kwargs):
+        time.sleep(0.1)
+        return mock_execute
+
+    mock_search = mocker.patch.object(Search, "execute", side_effect=slow_execute)
+    outcomes = run_concurrently(lambda: service.total(gender="gender"))
+    assert outcomes == [(10, None)] * 8
+    assert mock_search.call_count == 1
@@ -0,0 +1,78 @@
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from elasticsearch_dsl import Search
+
+from backend.model import Product
+from backend.dao.batch import DeferredSearch, deferrable
+from backend.util.slowlog import SlowLog
+
+
+class DummyService(object):
+    def __init__(self):
+        self.es = MagicMock()
+
+    @deferrable
+    def total(self, gender=None) -> DeferredSearch:
+        s = Product.search(using=self.es)
+        s = s.filter("term", gender=gender)
+
+        def parse(results) -> int:
+            return results.hits.total
+
+        return DeferredSearch(s, parse)
+
+
+def config(threshold):
+    return SimpleNamespace(config={"SLOWLOG_ENABLED": True, "SLOWLOG_THRESHOLD_MS": threshold, "SLOWLOG_FILE": None})
+
+
+@pytest.fixture(scope="function")
+def slowlog(mocker, flask_app):
+    mock_warning = mocker.patch.object(SlowLog.logger, "warning")
+    yield mock_warning
+    SlowLog.init_app(flask_app)
+
+
+def test_slowlog_observe(slowlog):
+    SlowLog.init_app(config(100.0))
+    search = Search().filter("term", gender="women")
+    response = MagicMock(took=20)
+    response.hits.total = 7
+
+    SlowLog.observe("Service.method", search, response, 50.0)
+    assert slowlog.call_count == 0
+
+    SlowLog.observe("Service.method", search, response, 150.0)
+    assert slowlog.call_count == 1
+    line = json.loads(slowlog.call_args[0][0])
+    assert line["method"] == "Service.method"
+    assert line["request"] == "search"
+    assert line["wall_ms"] == 150.0
+    assert line["took_ms"] == 20
+    assert line["hits"] == 7
+    assert line["query"] == search.to_dict()
+
+    response.took = 120
+    SlowLog.observe("Service.method", search, response, 50.0, "msearch")
+    assert slowlog.call_count == 2
+    assert json.loads(slowlog.call_args[0][0])["request"] == "msearch"
+
+
+def test_slowlog_disabled(slowlog):
+    SlowLog.init_app(SimpleNamespace(config={"SLOWLOG_ENABLED": False, "SLOWLOG_THRESHOLD_MS": 0.0, "SLOWLOG_FILE": None}))
+    SlowLog.observe("Service.method", Search(), MagicMock(took=1000), 1000.0)
+    assert slowlog.call_count == 0
+
+
+def test_slowlog_deferrable(mocker, slowlog):
+    SlowLog.init_app(config(0.0))
+    response = MagicMock(took=3)
+    response.hits.total = 10
+    mocker.patch.object(Search, "execute", return_value=response)
+    assert DummyService().total(gender="men") == 10
+
+    line = json.loads(slowlog.call_args[0][0])
+    assert line["method"] == "DummyService.total"
+    assert line["query"]["query"]["bool"]["filter"] == [{"term": {"gender": "men"}}]
@@ -0,0 +1,136 @@
+import os
+import time
+from threading import Lock
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Hashable
+
+from backend.util.metrics import count_cache
+
+
+MISSING = object()
+
+
+def normalize(value) -> Hashable:
+    """Turn call arguments into a hashable value, so equal arguments make equal cache keys."""
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, normalize(item)) for key, item in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    elif isinstance(value, set):
+        return tuple(sorted(normalize(item) for item in value))
+    else:
+        return value
+
+
+class TTLCache(object):
+    """
+    Bounded mapping with least recently used eviction, whose entries expire after their own ttl:
+        maxsize: Maximum amount of entries kept
+        name: Cache label of the hit/miss metrics, none are counted when unset
+        hits: Amount of lookups answered by the cache
+        misses: Amount of lookups not found or expired
+    """
+
+    def __init__(self, maxsize=1024, name=None) -> None:
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.__lock = Lock()
+        self.__data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__data)
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.__data[key]
+                self.misses += 1
+                hit, value = False, MISSING
+            else:
+                self.__data.move_to_end(key)
+                self.hits += 1
+                hit, value = True, entry[1]
+
+        if self.name is not None:
+            count_cache(self.name, hit)
+        return value
+
+    def set(self, key, value, ttl) -> None:
+        with self.__lock:
+            self.__data[key] = (time.monotonic() + ttl, value)
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class ServiceCache(object):
+    """
+    Process-wide cache of service method results, keyed by the method qualified name and its
+    normalized arguments. Each method has its own ttl, taken from CACHE_TTL in config.py, and
+    falls back to CACHE_DEFAULT_TTL. Disabled until enabled by init_app.
+    """
+
+    __lock = Lock()
+    __cache = TTLCache(name="service")
+    __pid = None
+    __enabled = False
+    __default_ttl = 60.0
+    __ttl = {}
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        with cls.__lock:
+            cls.__enabled = app.config["CACHE_ENABLED"]
+            cls.__default_ttl = app.config["CACHE_DEFAULT_TTL"]
+            cls.__ttl = dict(app.config["CACHE_TTL"])
+            if app.config["CACHE_MAXSIZE"] != cls.__cache.maxsize:
+                cls.__cache = TTLCache(app.config["CACHE_MAXSIZE"], name="service")
+
+    @classmethod
+    def get_cache(cls) -> TTLCache:
+        with cls.__lock:
+            if cls.__pid != os.getpid():
+                cls.__pid = os.getpid()
+                cls.__cache = TTLCache(cls.__cache.maxsize, name="service")
+            return cls.__cache
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls.__enabled
+
+    @classmethod
+    def get(cls, key):
+        if not cls.__enabled or key is None:
+            return MISSING
+        return cls.get_cache().get(key)
+
+    @classmethod
+    def set(cls, key, value) -> None:
+        if not cls.__enabled or key is None:
+            return
+        cls.get_cache().set(key, value, cls.__ttl.get(key[0], cls.__default_ttl))
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.get_cache().clear()
+
+    @classmethod
+    def stats(cls) -> dict:
+        cache = cls.get_cache()
+        return {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "size": len(cache),
+            "maxsize": cache.maxsize
+        }
@@ -0,0 +1,122 @@
+import os
+import zlib
+from threading import Lock
+from typing import List
+from flask import request, current_app
+
+from backend.util.cache import TTLCache, MISSING
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Compression(object):
+    """
+    Negotiates gzip, or brotli when installed, through Accept-Encoding for every JSON response:
+        Responses carrying a strong ETag are compressed once, and the compressed body is kept in an
+        LRU cache keyed by ETag and encoding, so hot pages are served without being rebuilt or
+        recompressed. Each encoding gets its own ETag, made of the identity ETag and the encoding.
+        Levels, the minimum size and the cache size come from config.py.
+    """
+
+    __lock = Lock()
+    __cache = TTLCache(256, name="compression")
+    __pid = None
+    __enabled = False
+    __level = 6
+    __brotli_quality = 5
+    __min_size = 500
+    __cache_ttl = 3600.0
+    __mimetypes = ["application/json"]
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        with cls.__lock:
+            cls.__enabled = app.config["COMPRESS_ENABLED"]
+            cls.__level = app.config["COMPRESS_LEVEL"]
+            cls.__brotli_quality = app.config["COMPRESS_BROTLI_QUALITY"]
+            cls.__min_size = app.config["COMPRESS_MIN_SIZE"]
+            cls.__cache_ttl = app.config["COMPRESS_CACHE_TTL"]
+            cls.__mimetypes = list(app.config["COMPRESS_MIMETYPES"])
+            if app.config["COMPRESS_CACHE_MAXSIZE"] != cls.__cache.maxsize:
+                cls.__cache = TTLCache(app.config["COMPRESS_CACHE_MAXSIZE"], name="compression")
+        app.after_request(cls.after_request)
+
+    @classmethod
+    def get_cache(cls) -> TTLCache:
+        with cls.__lock:
+            if cls.__pid != os.getpid():
+                cls.__pid = os.getpid()
+                cls.__cache = TTLCache(cls.__cache.maxsize, name="compression")
+            return cls.__cache
+
+    @classmethod
+    def encodings(cls) -> List[str]:
+        return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    @classmethod
+    def etags(cls, etag: str) -> List[str]:
+        """Every ETag a representation of this identity ETag may have been sent with."""
+        return [etag] + ["%s-%s" % (etag, encoding) for encoding in cls.encodings()]
+
+    @classmethod
+    def negotiate(cls):
+        if not cls.__enabled:
+            return None
+        return request.accept_encodings.best_match(cls.encodings())
+
+    @classmethod
+    def compress(cls, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=cls.__brotli_quality)
+        compressor = zlib.compressobj(cls.__level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    @classmethod
+    def cached_response(cls, etag: str):
+        """The compressed response stored for this ETag in the negotiated encoding, or None."""
+        encoding = cls.negotiate()
+        if encoding is None:
+            return None
+
+        data = cls.get_cache().get((etag, encoding))
+        if data is MISSING:
+            return None
+
+        response = current_app.response_class(data, mimetype="application/json")
+        cls.__set_encoding(response, etag, encoding)
+        return response
+
+    @classmethod
+    def after_request(cls, response):
+        if (not cls.__enabled or response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers or response.mimetype not in cls.__mimetypes):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = cls.negotiate()
+        if encoding is None or len(response.get_data()) < cls.__min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            key = (etag, encoding)
+            data = cls.get_cache().get(key)
+            if data is MISSING:
+                data = cls.compress(response.get_data(), encoding)
+                cls.get_cache().set(key, data, cls.__cache_ttl)
+        else:
+            data = cls.compress(response.get_data(), encoding)
+
+        response.set_data(data)
+        cls.__set_encoding(response, etag if not weak else None, encoding)
+        return response
+
+    @classmethod
+    def __set_encoding(cls, response, etag, encoding) -> None:
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        if etag is not None:
+            response.set_etag("%s-%s" % (etag, encoding))
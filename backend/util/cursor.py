@@ -0,0 +1,29 @@
+import json
+import binascii
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from typing import List
+
+from backend.errors.request_error import ValidationError
+
+
+class Cursor(object):
+    """
+    Opaque pagination cursor holding the sort values of the last product of a page, which are
+    sent back to Elasticsearch as search_after to fetch the page after it.
+    """
+
+    @staticmethod
+    def encode(sort_values) -> str:
+        data = json.dumps(list(sort_values), separators=(",", ":"))
+        return urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode(cursor: str) -> List:
+        try:
+            sort_values = json.loads(urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        except (ValueError, UnicodeError, binascii.Error):
+            raise ValidationError("Invalid cursor '%s'" % cursor)
+
+        if not isinstance(sort_values, list) or not sort_values:
+            raise ValidationError("Invalid cursor '%s'" % cursor)
+        return sort_values
@@ -0,0 +1,75 @@
+import os
+import time
+from threading import Lock
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Callable, List
+from flask import g, has_request_context
+
+from backend.errors.gateway_timeout_error import GatewayTimeoutError
+
+
+class FanOut(object):
+    """
+    Runs independent service calls concurrently on a bounded thread pool shared per worker process:
+        Calls are joined in submission order, so the first failing call has its exception re-raised
+        unchanged, exactly as if the calls had been made one after another. Each call has its own
+        deadline, counted from its submission. Submitted calls must not fan out themselves.
+        After run_inline, the calls of the current request run one after another in the request
+        thread instead, without deadline.
+    """
+
+    __lock = Lock()
+    __executor = None
+    __pid = None
+    __max_workers = 8
+    __default_timeout = 10.0
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        with cls.__lock:
+            cls.__default_timeout = app.config["FANOUT_TIMEOUT"]
+            if app.config["FANOUT_MAX_WORKERS"] != cls.__max_workers:
+                cls.__max_workers = app.config["FANOUT_MAX_WORKERS"]
+                cls.__executor = None
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        with cls.__lock:
+            if cls.__executor is None or cls.__pid != os.getpid():
+                cls.__pid = os.getpid()
+                cls.__executor = ThreadPoolExecutor(max_workers=cls.__max_workers, thread_name_prefix="fanout")
+            return cls.__executor
+
+    @staticmethod
+    def run_inline() -> None:
+        g.fanout_inline = True
+
+    @staticmethod
+    def inline() -> bool:
+        return has_request_context() and g.get("fanout_inline", False)
+
+    def __init__(self, timeout=None) -> None:
+        self.__timeout = timeout if timeout is not None else FanOut.__default_timeout
+        self.__calls = []
+
+    def submit(self, func: Callable, *args, **kwargs) -> None:
+        if FanOut.inline():
+            future = Future()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as error:
+                future.set_exception(error)
+        else:
+            future = FanOut.get_executor().submit(func, *args, **kwargs)
+        self.__calls.append((future, time.monotonic() + self.__timeout, getattr(func, "__name__", repr(func))))
+
+    def join(self) -> List:
+        results = []
+        for future, deadline, name in self.__calls:
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except TimeoutError:
+                future.cancel()
+                raise GatewayTimeoutError("Call '%s' exceeded %s seconds." % (name, self.__timeout))
+        self.__calls = []
+        return results
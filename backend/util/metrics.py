@@ -0,0 +1,121 @@
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable
+from flask import request, g, current_app
+from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+
+
+REQUESTS = Counter(
+    "willstores_http_requests_total",
+    "HTTP requests served, per namespace, route, method and status code.",
+    ["namespace", "route", "method", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "willstores_http_request_duration_seconds",
+    "HTTP request latency, per namespace, route and method.",
+    ["namespace", "route", "method"]
+)
+ES_LATENCY = Histogram(
+    "willstores_es_query_duration_seconds",
+    "Elasticsearch call latency, per service method and request type (search, msearch, get or mget).",
+    ["method", "request"]
+)
+CACHE_REQUESTS = Counter(
+    "willstores_cache_requests_total",
+    "Cache lookups, per cache and result (hit or miss).",
+    ["cache", "result"]
+)
+ES_POOL = Gauge(
+    "willstores_es_pool_connections",
+    "Elasticsearch connection pool usage, per state (in_use or maxsize).",
+    ["state"],
+    multiprocess_mode="livesum"
+)
+
+
+@contextmanager
+def es_timer(method: str, request_type="search"):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ES_LATENCY.labels(method, request_type).observe(time.perf_counter() - start)
+
+
+def timed(request_type: str) -> Callable:
+    """Decorates a service method that calls Elasticsearch directly, observing it as method qualified name."""
+    def decorator(func):
+        @wraps(func)
+        def decorated(*args, **kwargs):
+            with es_timer(func.__qualname__, request_type):
+                return func(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def count_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class Metrics(object):
+    """
+    Prometheus metrics of the web service, exposed at /metrics:
+        Request count, latency and status per flask-restplus namespace and route, Elasticsearch
+        latency per service method, cache lookups and connection pool usage. When the
+        prometheus_multiproc_dir environment variable is set, as for gunicorn -w 4, every worker
+        writes its samples there and /metrics aggregates all of them. /metrics asks for the same
+        bearer token as the API.
+    """
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        if not app.config["METRICS_ENABLED"]:
+            return
+
+        from backend.controller import auth_required
+        app.before_request(cls.before_request)
+        app.after_request(cls.after_request)
+        app.add_url_rule("/metrics", "metrics", auth_required()(cls.metrics))
+
+    @staticmethod
+    def labels():
+        if request.url_rule is None:
+            return "none", "unmatched"
+
+        endpoint = request.url_rule.endpoint.split(".")[-1]
+        namespace = endpoint.split("_")[0] if request.blueprint is not None else endpoint
+        return namespace, request.url_rule.rule
+
+    @staticmethod
+    def before_request() -> None:
+        g.metrics_start = time.perf_counter()
+
+    @classmethod
+    def after_request(cls, response):
+        start = g.pop("metrics_start", None)
+        if start is not None and request.endpoint != "metrics":
+            namespace, route = cls.labels()
+            REQUEST_LATENCY.labels(namespace, route, request.method).observe(time.perf_counter() - start)
+            REQUESTS.labels(namespace, route, request.method, str(response.status_code)).inc()
+            cls.observe_pool()
+        return response
+
+    @staticmethod
+    def observe_pool() -> None:
+        from backend.dao.es import ES
+        stats = ES.pool_stats()
+        ES_POOL.labels("in_use").set(stats["in_use"])
+        ES_POOL.labels("maxsize").set(stats["maxsize"])
+
+    @classmethod
+    def metrics(cls):
+        cls.observe_pool()
+        if "prometheus_multiproc_dir" in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return current_app.response_class(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,86 @@
+import os
+import pstats
+import tempfile
+from uuid import uuid4
+from cProfile import Profile
+from flask import request, g
+
+from backend.service import JWTService
+from backend.errors.access_error import AccessError
+from backend.util.fanout import FanOut
+
+
+BREAKDOWN = {
+    "elasticsearch": lambda filename, function: filename.endswith(os.path.join("elasticsearch", "transport.py")) and function == "perform_request",
+    "marshmallow": lambda filename, function: filename.endswith(os.path.join("marshmallow", "schema.py")) and function == "load",
+    "serializer": lambda filename, function: filename.endswith(os.path.join("response", "serializer.py")) and function == "dump",
+    "get_dict": lambda filename, function: filename.endswith(os.path.join("backend", "model", "product.py")) and function in ("get_dict", "get_dict_min")
+}
+
+
+class Profiler(object):
+    """
+    Opt-in cProfile run around a single request:
+        Active only when the request has the PROFILER_HEADER header and a valid ACCESS_TOKEN in
+        Authorization. The response gets X-Profile-Summary, with total time and the time spent in
+        Elasticsearch, marshmallow, the response serializer and get_dict/get_dict_min, and X-Profile-Id,
+        naming the pstats file stored in PROFILER_DIR. cProfile only sees the request thread, so
+        FanOut calls of a profiled request run inline in it, one after another.
+    """
+
+    __header = "X-Profile"
+    __directory = None
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        if not app.config["PROFILER_ENABLED"]:
+            return
+
+        cls.__header = app.config["PROFILER_HEADER"]
+        cls.__directory = app.config["PROFILER_DIR"] or os.path.join(tempfile.gettempdir(), "willstores-profiles")
+        app.before_request(cls.before_request)
+        app.after_request(cls.after_request)
+
+    @classmethod
+    def requested(cls) -> bool:
+        auth_header = request.headers.get("Authorization")
+        if request.headers.get(cls.__header) is None or auth_header is None:
+            return False
+
+        try:
+            return JWTService().verify_header(auth_header)
+        except AccessError:
+            return False
+
+    @classmethod
+    def before_request(cls) -> None:
+        if cls.requested():
+            FanOut.run_inline()
+            g.profiler = Profile()
+            g.profiler.enable()
+
+    @classmethod
+    def after_request(cls, response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+
+        profiler.disable()
+        profile_id = uuid4().hex
+        os.makedirs(cls.__directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(cls.__directory, "%s.prof" % profile_id))
+
+        summary = cls.summarize(pstats.Stats(profiler))
+        response.headers["X-Profile-Summary"] = "; ".join("%s=%.3fms" % (name, value) for name, value in summary.items())
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @staticmethod
+    def summarize(stats: pstats.Stats) -> dict:
+        summary = {"total": stats.total_tt * 1000}
+        for name, matches in BREAKDOWN.items():
+            summary[name] = 1000 * sum(
+                cumulative for (filename, _, function), (_, _, _, cumulative, _) in stats.stats.items()
+                if matches(filename, function)
+            )
+        return summary
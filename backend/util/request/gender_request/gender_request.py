@@ -2,6 +2,11 @@ from flask import request
 from flask_restplus import fields
 
 from .gender_schema import GenderSchema
+from ..request_data import RequestData
+
+
+SCHEMA = GenderSchema()
+EMPTY = RequestData()
 
 
 class GenderRequest(object):
@@ -18,8 +23,6 @@ class GenderRequest(object):
     def parse_json():
         jsonrecv = request.get_json()
         if jsonrecv is not None:
-            schema = GenderSchema()
-            in_data = schema.load(jsonrecv)
-            return in_data
+            return RequestData(SCHEMA.load(jsonrecv))
         else:
-            return {}
+            return EMPTY
@@ -3,6 +3,10 @@ from flask_restplus import fields
 
 from ..models.product_item import ProductItemRequest
 from .product_list_schema import ProductListSchema
+from ..request_data import RequestData
+
+
+SCHEMA = ProductListSchema()
 
 
 class ProductListRequest(object):
@@ -18,6 +22,4 @@ class ProductListRequest(object):
     @staticmethod
     def parse_json():
         jsonrecv = request.get_json()
-        schema = ProductListSchema()
-        in_data = schema.load(jsonrecv)
-        return in_data
+        return RequestData(SCHEMA.load(jsonrecv), deep=False)
@@ -0,0 +1,62 @@
+from collections.abc import Mapping
+
+from backend.util.cache import normalize
+
+
+def freeze(value):
+    if isinstance(value, Mapping):
+        return RequestData(value)
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    else:
+        return value
+
+
+def freeze_shallow(value):
+    if isinstance(value, list):
+        return tuple(value)
+    else:
+        return value
+
+
+class RequestData(Mapping):
+    """
+    Immutable, hashable result of a request schema:
+        Works as the service keyword arguments (**in_data), reads fields as attributes (in_data.pagesize)
+        and, being hashable, serves directly as a cache key. Nested objects are frozen as RequestData
+        and lists as tuples. With deep=False, lists become tuples but their items are kept as they
+        are, which is much cheaper for long lists of plain objects such as cart lines.
+    """
+
+    __slots__ = ("_data", "_hash")
+
+    def __init__(self, data=None, deep=True) -> None:
+        convert = freeze if deep else freeze_shallow
+        object.__setattr__(self, "_data", {key: convert(value) for key, value in (data or {}).items()})
+        object.__setattr__(self, "_hash", None)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%r object is immutable" % self.__class__.__name__)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(normalize(self._data)))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return "%s(%r)" % (self.__class__.__name__, self._data)
@@ -3,6 +3,11 @@ from flask_restplus import fields
 
 from ..models.price_range import PriceRangeRequest
 from .search_products_schema import SearchProductsSchema
+from ..request_data import RequestData
+
+
+SCHEMA = SearchProductsSchema()
+EMPTY = RequestData()
 
 
 class SearchProductsRequest(object):
@@ -12,7 +17,9 @@ class SearchProductsRequest(object):
             name,
             {
                 "pagesize": fields.Integer(example=20),
-                "pricerange": fields.Nested(PriceRangeRequest.get_model(api, "PriceRangeIn"))
+                "pricerange": fields.Nested(PriceRangeRequest.get_model(api, "PriceRangeIn")),
+                "cursor": fields.String(description="The next cursor of the previous page, replaces the page number"),
+                "withcursor": fields.Boolean(description="Return the next cursor of a page number request", default=False)
             }
         )
 
@@ -20,8 +27,6 @@ class SearchProductsRequest(object):
     def parse_json():
         jsonrecv = request.get_json()
         if jsonrecv is not None:
-            schema = SearchProductsSchema()
-            in_data = schema.load(jsonrecv)
-            return in_data
+            return RequestData(SCHEMA.load(jsonrecv))
         else:
-            return {}
+            return EMPTY
@@ -1,14 +1,21 @@
 from marshmallow import Schema, fields, validates
 
 from ..models.price_range import PriceRangeSchema
+from backend.util.cursor import Cursor
 from backend.errors.request_error import ValidationError
 
 
 class SearchProductsSchema(Schema):
     pagesize = fields.Integer()
     pricerange = fields.Nested(PriceRangeSchema)
+    cursor = fields.String()
+    withcursor = fields.Boolean()
 
     @validates("pagesize")
     def validate_pagesize(self, value):
         if value <= 0:
             raise ValidationError("Invalid pagesize '%s', must be positive" % value)
+
+    @validates("cursor")
+    def validate_cursor(self, value):
+        Cursor.decode(value)
@@ -3,6 +3,11 @@ from flask_restplus import fields
 
 from ..models.price_range import PriceRangeRequest
 from .search_schema import SearchSchema
+from ..request_data import RequestData
+
+
+SCHEMA = SearchSchema()
+EMPTY = RequestData()
 
 
 class SearchRequest(object):
@@ -19,8 +24,6 @@ class SearchRequest(object):
     def parse_json():
         jsonrecv = request.get_json()
         if jsonrecv is not None:
-            schema = SearchSchema()
-            in_data = schema.load(jsonrecv)
-            return in_data
+            return RequestData(SCHEMA.load(jsonrecv))
         else:
-            return {}
+            return EMPTY
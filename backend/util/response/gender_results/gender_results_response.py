@@ -5,6 +5,10 @@ from ..models.discount import DiscountResponse
 from ..models.kind import KindResponse
 from ..models.session import SessionResponse
 from .gender_results_schema import GenderResultsSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(GenderResultsSchema)
 
 
 class GenderResultsResponse(object):
@@ -22,6 +26,4 @@ class GenderResultsResponse(object):
 
     @staticmethod
     def marshall_json(data_out):
-        schema = GenderResultsSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
@@ -2,6 +2,10 @@ from flask_restplus import fields
 
 from ..models.price import PriceResponse
 from .product_results_schema import ProductResultsSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(ProductResultsSchema)
 
 
 class ProductResultsResponse(object):
@@ -25,6 +29,4 @@ class ProductResultsResponse(object):
 
     @staticmethod
     def marshall_json(data_out):
-        schema = ProductResultsSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
@@ -1,6 +1,10 @@
 from flask_restplus import fields
 
 from .products_count_schema import ProductsCountSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(ProductsCountSchema)
 
 
 class ProductsCountResponse(object):
@@ -15,6 +19,4 @@ class ProductsCountResponse(object):
 
     @staticmethod
     def marshall_json(data_out):
-        schema = ProductsCountSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
@@ -3,6 +3,10 @@ from flask_restplus import fields
 from ..models.product import ProductResponse
 from ..models.price import PriceResponse
 from .products_list_schema import ProductsListSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(ProductsListSchema)
 
 
 class ProductsListResponse(object):
@@ -18,6 +22,4 @@ class ProductsListResponse(object):
 
     @staticmethod
     def marshall_json(data_out):
-        schema = ProductsListSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
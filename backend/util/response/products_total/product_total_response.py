@@ -2,6 +2,10 @@ from flask_restplus import fields
 
 from ..models.price import PriceResponse
 from .product_total_schema import ProductTotalSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(ProductTotalSchema)
 
 
 class ProductTotalResponse(object):
@@ -16,6 +20,4 @@ class ProductTotalResponse(object):
 
     @staticmethod
     def marshall_json(data_out):
-        schema = ProductTotalSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
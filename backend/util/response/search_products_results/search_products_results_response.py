@@ -2,6 +2,10 @@ from flask_restplus import fields
 
 from ..models.product import ProductResponse
 from .search_products_results_schema import SearchProductsResultsSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(SearchProductsResultsSchema)
 
 
 class SearchProductsResultsResponse(object):
@@ -10,12 +14,11 @@ class SearchProductsResultsResponse(object):
         return api.model(
             name,
             {
-                "products": fields.List(fields.Nested(ProductResponse.get_model(api, "ProductOut")))
+                "products": fields.List(fields.Nested(ProductResponse.get_model(api, "ProductOut"))),
+                "next": fields.String(description="Cursor of the next page, sent for full cursor pages, so an exactly full last page is followed by a 204")
             }
         )
 
     @staticmethod
     def marshall_json(data_out):
-        schema = SearchProductsResultsSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
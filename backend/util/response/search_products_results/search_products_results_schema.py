@@ -5,3 +5,4 @@ from ..models.product import ProductSchema
 
 class SearchProductsResultsSchema(Schema):
     products = fields.Nested(ProductSchema, required=True, many=True)
+    next = fields.String()
@@ -4,6 +4,10 @@ from ..models.brand import BrandResponse
 from ..models.kind import KindResponse
 from ..models.price_range import PriceRangeResponse
 from .search_results_schema import SearchResultsSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(SearchResultsSchema)
 
 
 class SearchResultsResponse(object):
@@ -21,6 +25,4 @@ class SearchResultsResponse(object):
 
     @staticmethod
     def marshall_json(data_out):
-        schema = SearchResultsSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
@@ -0,0 +1,71 @@
+import json
+from typing import Callable
+from flask import current_app
+from marshmallow import Schema, fields
+
+
+def compile_field(field: fields.Field) -> Callable:
+    if isinstance(field, fields.Nested):
+        convert = compile_schema(field.schema)
+        if field.many:
+            return lambda value: [convert(item) for item in value]
+        return convert
+    elif isinstance(field, fields.List):
+        convert = compile_field(field.inner)
+        if convert is None:
+            return list
+        return lambda value: [convert(item) for item in value]
+    elif isinstance(field, fields.Integer):
+        return int
+    elif isinstance(field, fields.Float):
+        return float
+    else:
+        return None
+
+
+def compile_schema(schema: Schema) -> Callable:
+    """Build a function that converts a dict the way schema.load does for valid data, without validating it."""
+    compiled = [(name, field.data_key or name, compile_field(field)) for name, field in schema.fields.items()]
+
+    def convert(data: dict) -> dict:
+        out = {}
+        for name, key, convert_field in compiled:
+            if key in data:
+                value = data[key]
+                out[name] = value if convert_field is None or value is None else convert_field(value)
+        return out
+
+    return convert
+
+
+class Serializer(object):
+    """
+    Precompiled serializer of outgoing payloads, built once from a response Schema:
+        The fields are walked when the Serializer is created, so a request only converts the values
+        and dumps them to JSON bytes. In strict mode, enabled by RESPONSE_STRICT in config.py, the payload
+        is also validated by schema.load and both conversions must match.
+    """
+
+    __strict = False
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        cls.__strict = app.config["RESPONSE_STRICT"]
+
+    def __init__(self, schema_class) -> None:
+        self.__schema_class = schema_class
+        self.__convert = compile_schema(schema_class())
+
+    def dump(self, data_out: dict) -> dict:
+        payload = self.__convert(data_out)
+        if Serializer.__strict:
+            loaded = self.__schema_class().load(data_out)
+            if payload != loaded:
+                raise ValueError("%s serialization differs from its schema: %s" % (self.__schema_class.__name__, payload))
+        return payload
+
+    def dumps(self, data_out: dict) -> bytes:
+        return json.dumps(self.dump(data_out), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def response(self, data_out: dict):
+        return current_app.response_class(self.dumps(data_out), mimetype="application/json")
@@ -5,6 +5,10 @@ from ..models.kind import KindResponse
 from ..models.price_range import PriceRangeResponse
 from ..models.session import SessionResponse
 from .session_results_schema import SessionResultsSchema
+from ..serializer import Serializer
+
+
+SERIALIZER = Serializer(SessionResultsSchema)
 
 
 class SessionResultsResponse(object):
@@ -23,6 +27,4 @@ class SessionResultsResponse(object):
 
     @staticmethod
     def marshall_json(data_out):
-        schema = SessionResultsSchema()
-        jsonsend = schema.load(data_out)
-        return jsonsend
+        return SERIALIZER.response(data_out)
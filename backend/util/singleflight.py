@@ -0,0 +1,71 @@
+import os
+from threading import Lock, Event
+from typing import Callable, Hashable
+
+
+class Flight(object):
+    """
+    A call in progress, waited on by every caller that asked for the same key:
+        result: Value returned by the call, once done
+        error: Exception raised by the call, once done
+    """
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical concurrent calls within a worker process:
+        The first caller of a key runs the call, and every caller arriving while it is in flight
+        waits for it and shares its result, or has its exception re-raised. Keys are the same
+        normalized ones used by ServiceCache, so the calls coalesced are the ones it would cache.
+    """
+
+    __lock = Lock()
+    __flights = {}
+    __pid = None
+
+    @classmethod
+    def do(cls, key: Hashable, func: Callable):
+        if key is None:
+            return func()
+
+        with cls.__lock:
+            if cls.__pid != os.getpid():
+                cls.__pid = os.getpid()
+                cls.__flights = {}
+
+            flight = cls.__flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Flight()
+                cls.__flights[key] = flight
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            flight.result = func()
+        except Exception as error:
+            flight.error = error
+        finally:
+            with cls.__lock:
+                if cls.__flights.get(key) is flight:
+                    del cls.__flights[key]
+            flight.done.set()
+
+        return flight.wait()
+
+    @classmethod
+    def in_flight(cls) -> int:
+        with cls.__lock:
+            return len(cls.__flights)
@@ -0,0 +1,62 @@
+import sys
+import json
+import logging
+from datetime import datetime, timezone
+from elasticsearch_dsl import Search
+
+
+class SlowLog(object):
+    """
+    Logs every service search slower than SLOWLOG_THRESHOLD_MS as one JSON line:
+        method: Qualified name of the service method that built the search
+        request: How it was sent, search or msearch
+        wall_ms: Time seen by the service, for msearch the time of the whole batch
+        took_ms: Time reported by Elasticsearch for this search
+        hits: Total hits of the search
+        query: The generated DSL, from Search.to_dict()
+    Lines go to SLOWLOG_FILE, or to stderr when it is unset.
+    """
+
+    logger = logging.getLogger("willstores.slowlog")
+    __enabled = False
+    __threshold_ms = 500.0
+
+    @classmethod
+    def init_app(cls, app) -> None:
+        cls.__enabled = app.config["SLOWLOG_ENABLED"]
+        cls.__threshold_ms = app.config["SLOWLOG_THRESHOLD_MS"]
+        if not cls.__enabled or cls.logger.handlers:
+            return
+
+        filename = app.config["SLOWLOG_FILE"]
+        handler = logging.FileHandler(filename) if filename else logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        cls.logger.addHandler(handler)
+        cls.logger.setLevel(logging.WARNING)
+        cls.logger.propagate = False
+
+    @classmethod
+    def observe(cls, method: str, search: Search, response, wall_ms: float, request="search") -> None:
+        if not cls.__enabled:
+            return
+
+        took_ms = getattr(response, "took", None)
+        took_ms = took_ms if isinstance(took_ms, (int, float)) else None
+        if wall_ms < cls.__threshold_ms and (took_ms is None or took_ms < cls.__threshold_ms):
+            return
+
+        try:
+            hits = response.hits.total
+        except AttributeError:
+            hits = None
+
+        cls.logger.warning(json.dumps({
+            "time": datetime.now(timezone.utc).isoformat(),
+            "method": method,
+            "request": request,
+            "wall_ms": round(wall_ms, 3),
+            "took_ms": took_ms,
+            "hits": hits if isinstance(hits, int) else None,
+            "threshold_ms": cls.__threshold_ms,
+            "query": search.to_dict()
+        }, default=str))
@@ -1,6 +1,7 @@
+import os
 import sys
 import click
-import pytest
+from dotenv import load_dotenv, find_dotenv
 
 
 @click.group()
@@ -12,6 +13,7 @@ def cli():
 def test():
     """Run tests"""
     print("RUN TESTS")
+    import pytest
     sys.exit(pytest.main(["backend/tests/", "-v", "--tb", "short", "-m", "dev", "--disable-warnings"]))
 
 
@@ -19,6 +21,7 @@ def test():
 def test_cov():
     """Run tests with coverage"""
     print("RUN TESTS WITH COVERAGE")
+    import pytest
     sys.exit(pytest.main(["backend/tests/", "-v", "--tb", "short", "--cov-report", "term:skip-covered", "--cov=backend", "--disable-warnings"]))
 
 
@@ -26,8 +29,128 @@ def test_cov():
 def test_cov_html():
     """Run tests"""
     print("RUN TESTS WITH COVERAGE ON HTML INTERFACE")
+    import pytest
     sys.exit(pytest.main(["backend/tests/", "-v", "--tb", "short", "--cov-report", "html:cov_html", "--cov=backend"]))
 
 
+@cli.command()
+def init_index():
+    """Create the store index or validate its mappings"""
+    print("INIT INDEX")
+    load_dotenv(find_dotenv())
+    from backend.dao.es import ES
+    ES().init_index()
+
+
+@cli.command()
+def backfill_discount():
+    """Store price.discount on products indexed before it was mapped"""
+    print("BACKFILL DISCOUNT")
+    load_dotenv(find_dotenv())
+    from backend.dao.es import ES
+    es = ES()
+    es.init_index()
+    print("%s products updated" % es.backfill_discount())
+
+
+@cli.command()
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--doc-type", type=click.Choice(["products", "sessions"]), default="products", help="Type of the plain documents")
+@click.option("--chunk-size", default=500, help="Documents per bulk request")
+@click.option("--thread-count", default=4, help="Bulk requests sent at the same time")
+def ingest(source, doc_type, chunk_size, thread_count):
+    """Load newline delimited products or sessions, - for stdin, into the store index"""
+    print("INGEST")
+    load_dotenv(find_dotenv())
+    from backend.dao.es import ES
+    from backend.dao.ingest import Ingestion
+    es = ES()
+    es.init_index()
+    result = Ingestion(es.connection, doc_type=doc_type, chunk_size=chunk_size, thread_count=thread_count).run(source)
+    print("%(indexed)s indexed, %(failed)s failed, %(invalid)s invalid in %(seconds).1fs, %(docs_per_second).0f docs/s" % result)
+    print("Catalog version %s" % es.bump_catalog_version())
+
+
+@cli.command()
+@click.argument("source", type=click.File("r", encoding="utf-8"), required=False)
+@click.option("--doc-type", type=click.Choice(["products", "sessions"]), default="products", help="Type of the plain documents")
+@click.option("--chunk-size", default=500, help="Documents per bulk request")
+@click.option("--thread-count", default=4, help="Bulk requests sent at the same time")
+@click.option("--delete-previous", is_flag=True, help="Delete the indices the alias pointed to")
+@click.option("--strict", is_flag=True, help="Abort on invalid lines too, not only on rejected documents")
+@click.option("--source-only", is_flag=True, help="Do not copy the other doc types from the current catalog")
+def reindex(source, doc_type, chunk_size, thread_count, delete_previous, strict, source_only):
+    """Build a new index from SOURCE, or from the current catalog, then swap the store alias to it"""
+    print("REINDEX")
+    load_dotenv(find_dotenv())
+    from backend.dao.es import ES
+    from backend.dao.ingest import Ingestion
+    es = ES()
+    es.init_index()
+
+    def load(index):
+        result = Ingestion(es.connection, index=index, doc_type=doc_type, chunk_size=chunk_size, thread_count=thread_count).run(source)
+        print("%(indexed)s indexed, %(failed)s failed, %(invalid)s invalid in %(seconds).1fs, %(docs_per_second).0f docs/s" % result)
+        if result["failed"] or (strict and result["invalid"]):
+            raise click.ClickException("Incomplete build, %s deleted and the alias left untouched" % index)
+
+    copy_types = [] if source_only else [other for other in Ingestion.DOC_TYPES if other != doc_type]
+    name, previous = es.rebuild_index(load if source is not None else None, copy_types=copy_types, delete_previous=delete_previous)
+    print("Alias moved to %s from %s" % (name, ", ".join(previous) or "nothing"))
+
+
+@cli.command()
+@click.argument("path")
+def export_snapshot(path):
+    """Write the catalog to a snapshot file for MEMORY_SNAPSHOT"""
+    print("EXPORT SNAPSHOT")
+    load_dotenv(find_dotenv())
+    from backend.dao.es import ES
+    print("%s documents written to %s" % (ES().export_snapshot(path), path))
+
+
+@cli.command()
+def bump_catalog_version():
+    """Increase the catalog version after changing the catalog"""
+    print("BUMP CATALOG VERSION")
+    load_dotenv(find_dotenv())
+    from backend.dao.es import ES
+    print("Catalog version %s" % ES().bump_catalog_version())
+
+
+@cli.command()
+@click.option("--amount", default=100, help="Products per payload")
+@click.option("--number", default=200, help="Runs per measurement")
+def benchmark_serialization(amount, number):
+    """Compare schema.load with the precompiled response Serializer"""
+    print("BENCHMARK SERIALIZATION")
+    from backend.benchmarks.serialization import run
+    for result in run(amount=amount, number=number):
+        print("%(name)s: schema.load %(schema_ms).3fms, Serializer %(serializer_ms).3fms, %(speedup).1fx" % result)
+
+
+@cli.command()
+@click.option("--amount", default=100, help="Cart lines in the product list payload")
+@click.option("--number", default=1000, help="Runs per measurement")
+def benchmark_parsing(amount, number):
+    """Compare a new request Schema per request with the module-level ones"""
+    print("BENCHMARK PARSING")
+    from backend.benchmarks.parsing import run
+    for result in run(amount=amount, number=number):
+        print("%(name)s: new Schema %(per_request_ms).3fms, module-level Schema %(reused_ms).3fms, %(speedup).1fx" % result)
+
+
+@cli.command()
+@click.option("--sizes", default="1000,100000,1000000", help="Comma separated catalog sizes")
+@click.option("--number", default=200, help="Requests per endpoint and size")
+def benchmark_endpoints(sizes, number):
+    """Time every endpoint against an in-memory Elasticsearch stand-in"""
+    print("BENCHMARK ENDPOINTS")
+    os.environ["FLASK_ENV"] = "benchmark"
+    from backend.benchmarks.endpoints import run
+    for result in run(sizes=[int(size) for size in sizes.split(",")], number=number):
+        print("%(size)s products, %(name)s: %(throughput).1f req/s, p50 %(p50_ms).3fms, p99 %(p99_ms).3fms" % result)
+
+
 if __name__ == "__main__":
     cli()
@@ -8,6 +8,43 @@ class BaseConfig(object):
     ERROR_404_HELP = False
     ERROR_INCLUDE_MESSAGE = False
     TEST_DOMAIN_IP = os.getenv("TEST_DOMAIN_IP")
+    ES_MAXSIZE = int(os.getenv("ES_MAXSIZE", default=10))
+    ES_TIMEOUT = float(os.getenv("ES_TIMEOUT", default=10.0))
+    ES_MAX_RETRIES = int(os.getenv("ES_MAX_RETRIES", default=3))
+    ES_RETRY_ON_TIMEOUT = os.getenv("ES_RETRY_ON_TIMEOUT", default="true").lower() == "true"
+    ES_CONNECTION_CLASS = os.getenv("ES_CONNECTION_CLASS")
+    MEMORY_SNAPSHOT = os.getenv("MEMORY_SNAPSHOT")
+    FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", default=8))
+    FANOUT_TIMEOUT = float(os.getenv("FANOUT_TIMEOUT", default=10.0))
+    CACHE_ENABLED = True
+    CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", default=1024))
+    CACHE_DEFAULT_TTL = 60.0
+    CACHE_TTL = {
+        "ProductService.products_count": 300.0,
+        "ProductService.super_discounts": 120.0,
+        "ProductService.select_facets": 120.0,
+        "ProductService.select_brands": 300.0,
+        "ProductService.select_kinds": 300.0,
+        "ProductService.select": 60.0,
+        "SessionService.select": 300.0,
+        "SessionService.select_by_id": 300.0,
+        "CatalogService.version": 5.0
+    }
+    RESPONSE_STRICT = False
+    SLOWLOG_ENABLED = os.getenv("SLOWLOG_ENABLED", default="true").lower() == "true"
+    SLOWLOG_THRESHOLD_MS = float(os.getenv("SLOWLOG_THRESHOLD_MS", default=500.0))
+    SLOWLOG_FILE = os.getenv("SLOWLOG_FILE")
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", default="true").lower() == "true"
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", default="true").lower() == "true"
+    PROFILER_HEADER = "X-Profile"
+    PROFILER_DIR = os.getenv("PROFILER_DIR")
+    COMPRESS_ENABLED = True
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", default=6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", default=5))
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", default=500))
+    COMPRESS_MIMETYPES = ["application/json"]
+    COMPRESS_CACHE_MAXSIZE = int(os.getenv("COMPRESS_CACHE_MAXSIZE", default=256))
+    COMPRESS_CACHE_TTL = 3600.0
 
 
 class DevelopmentConfig(BaseConfig):
@@ -17,9 +54,19 @@ class DevelopmentConfig(BaseConfig):
 class TestConfig(BaseConfig):
     DEBUG = True
     TESTING = True
+    CACHE_ENABLED = False
+    RESPONSE_STRICT = True
     SECRET_KEY = os.getenv("SECRET_KEY", default=BaseConfig.SECRET_KEY)
 
 
+class BenchmarkConfig(BaseConfig):
+    LOGIN_DISABLED = True
+    ES_CONNECTION_CLASS = "backend.benchmarks.fake_es.FakeConnection"
+    CACHE_ENABLED = False
+    SLOWLOG_ENABLED = False
+    PROFILER_ENABLED = False
+
+
 class ProductionConfig(BaseConfig):
     DEBUG = False
     SECRET_KEY = os.getenv("SECRET_KEY")
@@ -0,0 +1,20 @@
+import os
+import shutil
+
+
+# Load the in-memory catalog once in the master, instead of once per worker
+preload_app = bool(os.getenv("MEMORY_SNAPSHOT"))
+
+
+def on_starting(server):
+    """Start from an empty prometheus_multiproc_dir, so samples of a previous run are not aggregated."""
+    path = os.getenv("prometheus_multiproc_dir")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv("prometheus_multiproc_dir"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
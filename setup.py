@@ -13,6 +13,7 @@ setup(
        "Flask",
        "flask-restplus",
        "marshmallow",
+       "prometheus-client",
        "python-dotenv",
        "requests",
        "Werkzeug"